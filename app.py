@@ -11,6 +11,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 import sentry_sdk
 
+from data.analyse import MONTHLY_GRID_PYRAMID, monthly_avg_file_name
 from data.conf import get_app_settings
 from data.loaders.s3_parquet_loader import S3ParquetLoader
 
@@ -116,7 +117,35 @@ mlo_since_1976 = px.line(
 )
 
 # Global monthly average per whole latitude and longitude
-df_avg_per_month_lat_lon = loader.retrieve_dataframe("monthly_avg_per_lat_lon.gzip")
+df_avg_per_month_lat_lon = loader.retrieve_dataframe(monthly_avg_file_name())
+
+# Coarser grids of the same averages, fewer cells to render.
+dfs_avg_per_month_lat_lon = {1.0: df_avg_per_month_lat_lon}
+for _cell_size in MONTHLY_GRID_PYRAMID:
+    try:
+        dfs_avg_per_month_lat_lon[_cell_size] = loader.retrieve_dataframe(monthly_avg_file_name(_cell_size))
+    except Exception as exc:
+        logger.warning(f"Monthly averages per {_cell_size:g} degrees are not available: {exc}")
+
+# Base grid with empty cells filled by interpolation.
+try:
+    df_avg_per_month_lat_lon_filled = loader.retrieve_dataframe("monthly_avg_per_lat_lon_filled.gzip")
+except Exception as exc:
+    logger.warning(f"Gap filled monthly averages are not available: {exc}")
+    df_avg_per_month_lat_lon_filled = None
+
+
+def filled_options(cell_size: float) -> list[dict]:
+    """
+    Options of the filled checklist, gap filled averages are available in the base 1° grid only.
+    """
+    return [{
+        "label": "Doplniť chýbajúce bunky interpoláciou (1°)",
+        "value": "filled",
+        "disabled": df_avg_per_month_lat_lon_filled is None or cell_size != 1.0,
+    }]
+
+
 _min = df_avg_per_month_lat_lon["xco2"].min()
 _max = df_avg_per_month_lat_lon["xco2"].max()
 
@@ -170,6 +199,21 @@ app.layout = dash.html.Div(
                             marks={_y: str(_y) for _y in range(_min_year, _max_year + 1)},
                             id="year-slider"
                         ),
+                        dash.dcc.RadioItems(
+                            className="col-12",
+                            options=[{"label": f"{_c:g}°", "value": _c} for _c in dfs_avg_per_month_lat_lon],
+                            value=max(dfs_avg_per_month_lat_lon),
+                            inline=True,
+                            inputStyle={"margin": "0 0.25rem 0 1rem"},
+                            id="resolution-radio"
+                        ),
+                        dash.dcc.Checklist(
+                            className="col-12",
+                            options=filled_options(max(dfs_avg_per_month_lat_lon)),
+                            value=[],
+                            inputStyle={"margin": "0 0.25rem 0 1rem"},
+                            id="filled-checklist"
+                        ),
                     ],
                 ),
             ],
@@ -197,21 +241,40 @@ app.layout = dash.html.Div(
 # endregion
 
 
+@dash.callback(
+    dash.Output(component_id="filled-checklist", component_property="options"),
+    dash.Output(component_id="filled-checklist", component_property="value"),
+    dash.Input(component_id="resolution-radio", component_property="value"),
+    dash.State(component_id="filled-checklist", component_property="value"),
+)
+def update_filled_checklist(cell_size: float, filled: list[str]) -> tuple[list[dict], list[str]]:
+    # Filled cells would silently replace the selected resolution, so they are offered for 1° only.
+    return filled_options(cell_size), filled if cell_size == 1.0 else []
+
+
 @dash.callback(
     dash.Output(component_id="avg-per-month-lat-lon-surface", component_property="figure"),
     dash.Output(component_id="avg-per-month-lat-lon-globe", component_property="figure"),
     dash.Input(component_id="year-slider", component_property="value"),
     dash.Input(component_id="month-slider", component_property="value"),
+    dash.Input(component_id="resolution-radio", component_property="value"),
+    dash.Input(component_id="filled-checklist", component_property="value"),
     background=True,
     running=[
         (dash.Output(component_id="year-slider", component_property="disabled"), True, False),
         (dash.Output(component_id="month-slider", component_property="disabled"), True, False),
+        (dash.Output(component_id="resolution-radio", component_property="disabled"), True, False),
+        (dash.Output(component_id="filled-checklist", component_property="disabled"), True, False),
     ]
 )
-def update_graph(year: int, month: int) -> tuple[go.Figure, go.Figure]:
-    df_ = df_avg_per_month_lat_lon.loc[
-        (df_avg_per_month_lat_lon["year"] == year) &
-        (df_avg_per_month_lat_lon["month"] == month)
+def update_graph(year: int, month: int, cell_size: float, filled: list[str]) -> tuple[go.Figure, go.Figure]:
+    if "filled" in filled and cell_size == 1.0 and df_avg_per_month_lat_lon_filled is not None:
+        df_avg = df_avg_per_month_lat_lon_filled
+    else:
+        df_avg = dfs_avg_per_month_lat_lon.get(cell_size, df_avg_per_month_lat_lon)
+    df_ = df_avg.loc[
+        (df_avg["year"] == year) &
+        (df_avg["month"] == month)
     ]
 
     _title = f"Priemerná mesačná hodnota XCO2 za mesiac {year}-{month:02d}"
@@ -0,0 +1,59 @@
+"""
+Benchmark of gridding soundings by pandas round and groupby against `GridAggregator`.
+Reports time of the mean (as in the original monthly averages) and of all statistics per cell size.
+
+Run:
+    python -m benchmarks.gridding --soundings 3000000
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import typer
+from typing_extensions import Annotated
+
+from data.utils.gridding import GridAggregator
+
+CELL_SIZES = [0.25, 0.5, 1.0, 2.0]
+
+
+def groupby_grid(df: pd.DataFrame, cell_size: float, statistics: list[str]) -> pd.DataFrame:
+    df = df.copy()
+    df["latitude"] = (df["latitude"] / cell_size).round() * cell_size
+    df["longitude"] = (df["longitude"] / cell_size).round() * cell_size
+    return df.groupby(["latitude", "longitude"]).agg(statistics).reset_index()
+
+
+def main(
+        soundings: Annotated[int, typer.Option(help="Number of synthetic soundings (points)")] = 3_000_000,
+        repeat: int = 3,
+) -> None:
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({
+        "latitude": rng.uniform(-90, 90, soundings),
+        "longitude": rng.uniform(-180, 180, soundings),
+        "xco2": rng.normal(420, 2, soundings),
+    })
+    typer.echo(f"{len(df):,} rows")
+    typer.echo(f"{'cell':>5} {'statistics':<10} {'groupby s':>10} {'bincount s':>11} {'speedup':>8}")
+
+    for cell_size in CELL_SIZES:
+        for statistics in (["mean"], ["mean", "std", "min", "max"]):
+            groupby, bincount = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                groupby_grid(df, cell_size, statistics)
+                groupby.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                GridAggregator(["xco2"], cell_size=cell_size).update(df).to_dataframe(statistics=statistics)
+                bincount.append(time.perf_counter() - start)
+
+            typer.echo(
+                f"{cell_size:>5} {'all' if len(statistics) > 1 else 'mean':<10} "
+                f"{min(groupby):>10.3f} {min(bincount):>11.3f} {min(groupby) / min(bincount):>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,71 @@
+"""
+Benchmark of `InfluxDBLoader.save_dataframe` throughput against a local InfluxDB.
+
+Start InfluxDB first, e.g.:
+    docker run --rm -p 8086:8086 \
+        -e DOCKER_INFLUXDB_INIT_MODE=setup -e DOCKER_INFLUXDB_INIT_USERNAME=bench-user \
+        -e DOCKER_INFLUXDB_INIT_PASSWORD=bench-password -e DOCKER_INFLUXDB_INIT_ORG=bench-org \
+        -e DOCKER_INFLUXDB_INIT_BUCKET=bench-bucket -e DOCKER_INFLUXDB_INIT_ADMIN_TOKEN=bench-token \
+        influxdb:2.7.4-alpine
+
+Run:
+    python -m benchmarks.influxdb_write --soundings 150000
+"""
+import time
+
+import numpy as np
+import pandas as pd
+import typer
+from typing_extensions import Annotated
+
+from data.loaders.influxdb_loader import InfluxDBLoader
+from data.settings import Settings
+
+
+def day_of_soundings(n: int, date: str = "2024-01-01") -> pd.DataFrame:
+    """
+    Synthetic day of OCO-2 soundings with realistic column types.
+    """
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "_time": pd.Timestamp(date, tz="UTC") + pd.to_timedelta(np.sort(rng.uniform(0, 86_400, n)), unit="s"),
+        "latitude": rng.uniform(-90, 90, n).astype(np.float32),
+        "longitude": rng.uniform(-180, 180, n).astype(np.float32),
+        "xco2": rng.normal(420, 2, n).astype(np.float32),
+    })
+
+
+def main(
+        soundings: Annotated[int, typer.Option(help="Number of soundings (points) per day")] = 150_000,
+        url: str = "http://localhost:8086",
+        token: str = "bench-token",
+        org: str = "bench-org",
+        bucket: str = "bench-bucket",
+        batch_size: int = 5_000,
+) -> None:
+    settings = Settings(
+        earthdata_base_url="", earthdata_username="", earthdata_password="",
+        celery_enabled=False, celery_broker_url="", celery_result_backend="",
+        influxdb_url=url, influxdb_token=token, influxdb_org=org, influxdb_bucket=bucket,
+        sentry_dsn="",
+        aws_access_key_id="", aws_secret_access_key="", aws_region="", aws_s3_bucket_name="",
+    )
+    df = day_of_soundings(soundings)
+
+    variants = {
+        "synchronous": {},
+        "synchronous+gzip": {"enable_gzip": True},
+        f"batching({batch_size})": {"batching": True, "batch_size": batch_size},
+        f"batching({batch_size})+gzip": {"batching": True, "batch_size": batch_size, "enable_gzip": True},
+    }
+    for i, (name, kwargs) in enumerate(variants.items()):
+        with InfluxDBLoader(settings, **kwargs) as loader:
+            start = time.perf_counter()
+            loader.save_dataframe(df, file_name=f"bench-{i}")
+            loader.flush()
+            elapsed = time.perf_counter() - start
+        typer.echo(f"{name:<28} {len(df) / elapsed:>12,.0f} points/s  ({elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,53 @@
+"""
+Benchmark of the vectorized line protocol encoder against the influxdb-client dataframe serializer.
+No InfluxDB instance is needed, only the encoding is measured.
+
+Run:
+    python -m benchmarks.line_protocol --soundings 150000
+"""
+import time
+
+import typer
+from influxdb_client.client.write.dataframe_serializer import data_frame_to_list_of_points
+from influxdb_client.client.write_api import PointSettings
+from typing_extensions import Annotated
+
+from benchmarks.influxdb_write import day_of_soundings
+from data.utils.line_protocol import encode_line_protocol
+
+
+def main(
+        soundings: Annotated[int, typer.Option(help="Number of soundings (points) per day")] = 150_000,
+        repeat: int = 3,
+) -> None:
+    df = day_of_soundings(soundings)
+    file_name = "2024-01-01.gzip"
+
+    def influxdb_client_serializer() -> bytes:
+        _df = df.set_index("_time")
+        _df["file_name"] = file_name
+        lines = data_frame_to_list_of_points(
+            _df,
+            PointSettings(),
+            data_frame_measurement_name="xco2",
+            data_frame_tag_columns=["file_name"],
+        )
+        return "\n".join(lines).encode()
+
+    def vectorized_encoder() -> bytes:
+        return b"\n".join(encode_line_protocol(df, "xco2", tags={"file_name": file_name}))
+
+    assert influxdb_client_serializer() == vectorized_encoder()
+
+    for fn in (influxdb_client_serializer, vectorized_encoder):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+        best = min(timings)
+        typer.echo(f"{fn.__name__:<28} {best:.3f} s  {len(df) / best:>12,.0f} points/s")
+
+
+if __name__ == "__main__":
+    typer.run(main)
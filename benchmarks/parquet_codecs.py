@@ -0,0 +1,72 @@
+"""
+Benchmark of parquet engines, codecs and compression levels on a day of OCO-2 soundings.
+Reports encode time, decode time and file size of each combination, the default archive settings first.
+
+Run:
+    python -m benchmarks.parquet_codecs --soundings 150000
+    python -m benchmarks.parquet_codecs --file 2024-01-01.gzip  # Real daily file, e.g. downloaded from S3.
+"""
+import itertools
+import os
+import tempfile
+import time
+from typing import Optional
+
+import pandas as pd
+import typer
+from typing_extensions import Annotated
+
+from benchmarks.influxdb_write import day_of_soundings
+from data.utils.parquet import ParquetOptions, read_parquet, write_parquet
+
+CODECS: list[tuple[str | None, int | None]] = [
+    ("gzip", None), ("gzip", 1),
+    ("zstd", None), ("zstd", 1), ("zstd", 9),
+    ("snappy", None),
+    ("lz4", None),
+    (None, None),
+]
+
+
+def main(
+        soundings: Annotated[int, typer.Option(help="Number of synthetic soundings (points) per day")] = 150_000,
+        file: Annotated[Optional[str], typer.Option(help="Benchmark a real parquet file instead")] = None,
+        row_group_size: Annotated[Optional[int], typer.Option(help="Rows per row group")] = 20_000,
+        spatial_sort: bool = True,
+        repeat: int = 3,
+) -> None:
+    df = read_parquet(file) if file is not None else day_of_soundings(soundings)
+    typer.echo(f"{len(df):,} rows, {df.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MiB in memory")
+    typer.echo(f"{'engine':<12} {'codec':<8} {'level':>5} {'encode s':>9} {'decode s':>9} {'size MiB':>9} {'ratio':>6}")
+
+    raw_size = df.memory_usage(deep=True, index=False).sum()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "benchmark.parquet")
+
+        for engine, (compression, level) in itertools.product(("fastparquet", "pyarrow"), CODECS):
+            options = ParquetOptions(
+                engine=engine,
+                compression=compression,
+                compression_level=level,
+                row_group_size=row_group_size,
+            )
+
+            encode, decode = [], []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                write_parquet(df, path, options, spatial_sort=spatial_sort)
+                encode.append(time.perf_counter() - start)
+
+                start = time.perf_counter()
+                read_parquet(path, options)
+                decode.append(time.perf_counter() - start)
+
+            size = os.path.getsize(path)
+            typer.echo(
+                f"{engine:<12} {compression or 'none':<8} {level if level is not None else '-':>5} "
+                f"{min(encode):>9.3f} {min(decode):>9.3f} {size / 1024 ** 2:>9.2f} {raw_size / size:>6.2f}"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
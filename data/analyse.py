@@ -1,14 +1,30 @@
 from __future__ import annotations
 
 import datetime as dt
+import functools
+import glob
 import logging
+import os
 from typing import TYPE_CHECKING
 
-import netCDF4 as nc
+import numpy as np
 import pandas as pd
 
+from data.archive import CLOSED_MONTH_LAG, Archive, month_range
+from data.utils.climatology import ClimatologyStore
+from data.utils.geo import BoundingBox
+from data.utils.gridding import GridAggregator
+from data.utils.interpolation import Weighting, fill_grid
+from data.utils.mapreduce import map_reduce
+from data.utils.noaa import EVENT_FILE_PATTERN, event_file_daily_sums
+from data.utils.regions import Region, RegionRegistry
+from data.utils.sketch import HistogramSketch
+from data.utils.trends import trend_maps
+
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from data.loaders.base_loader import BaseLoader
 
 
@@ -16,121 +32,526 @@ logger = logging.getLogger(__name__)
 
 GLOBAL_DATE_START = dt.date(2023, 1, 1)
 
+# Extreme points of Slovakia and (approximately) the EU.
+SK_BBOX = BoundingBox(lat_min=47.7, lat_max=49.6, lon_min=16.8, lon_max=22.6)
+EU_BBOX = BoundingBox(lat_min=36, lat_max=71, lon_min=9, lon_max=45)
+
+# Regions of daily averages, each adds a `xco2_<name>` column.
+REGIONS = RegionRegistry([
+    Region("sk", SK_BBOX),
+    Region("eu", EU_BBOX),
+])
+
+# Coarser grids of monthly averages saved next to the base grid, see `monthly_avg_per_lat_lon`.
+MONTHLY_GRID_PYRAMID = (2.0, 5.0)
+
+# Quantiles saved from sketches of XCO2 per month and cell, see `monthly_avg_per_lat_lon`.
+MONTHLY_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
 
-def oco2_daily_avg(loader: BaseLoader) -> None:
+# State of `ClimatologyStore` of monthly grids, see `monthly_climatology`.
+CLIMATOLOGY_STATE = "climatology_per_lat_lon_state.gzip"
+CLIMATOLOGY_FOLDED = "climatology_per_lat_lon_months.gzip"
+
+# Versions of daily files the daily averages were calculated from, see `oco2_daily_avg`.
+OCO2_DAILY_AVG_SOURCES = "oco2_daily_avg_sources.gzip"
+
+
+def _month_batches(dates: list[dt.date]) -> list[list[dt.date]]:
     """
-    Calculate daily averages for OCO2 data.
-    :return:
+    Split sorted dates into batches of one month, each compacted monthly file is then read by one worker only.
     """
-    date = GLOBAL_DATE_START
-    date_stop = dt.date.today()
+    batches: dict[tuple[int, int], list[dt.date]] = {}
+    for date in dates:
+        batches.setdefault((date.year, date.month), []).append(date)
+    return list(batches.values())
 
-    # Value lists.
-    dates = []
-    xco2 = []
-    xco2_sk = []
-    xco2_eu = []
 
-    while date < date_stop:
+def _oco2_daily_sums(loader: BaseLoader, dates: list[dt.date]) -> dict[dt.date, np.ndarray]:
+    """
+    Map step of `oco2_daily_avg`.
+    :return: Sum and count of XCO2 values globally and in every region per date, interleaved.
+    """
+    sums = {}
+    archive = Archive(loader)
+    for date, _df in archive.iter_daily_dataframes(dates[0], dates[-1] + dt.timedelta(days=1), dates=set(dates)):
         try:
-            _df = loader.retrieve_dataframe(f"{date.isoformat()}.gzip")
-
-            # Assign SK attribute for coordinates between extreme points.
-            _df["is_sk"] = 0
-            _df.loc[
-                (_df["latitude"] >= 47.7) & (_df["latitude"] <= 49.6) &
-                (_df["longitude"] >= 16.8) & (_df["longitude"] <= 22.6),
-                "is_sk"
-            ] = 1
-
-            # Assign EU attribute for coordinates between extreme points.
-            _df["is_eu"] = 0
-            _df.loc[
-                (_df["latitude"] >= 36) & (_df["latitude"] <= 71) &
-                (_df["longitude"] >= 9) & (_df["longitude"] <= 45),
-                "is_eu"
-            ] = 1
-
-            avg = _df["xco2"].mean()
-            avg_sk = _df[_df["is_sk"] == 1]["xco2"].mean()
-            avg_eu = _df[_df["is_eu"] == 1]["xco2"].mean()
-
-            dates.append(date)
-            xco2.append(avg)
-            xco2_sk.append(avg_sk)
-            xco2_eu.append(avg_eu)
+            xco2 = _df["xco2"].to_numpy(dtype=np.float64)
+            region_sums, region_counts = REGIONS.sums(_df["latitude"], _df["longitude"], xco2)
+            _sums = np.empty(2 * (len(REGIONS.names) + 1))
+            _sums[0::2] = [np.nansum(xco2), *region_sums]
+            _sums[1::2] = [np.count_nonzero(~np.isnan(xco2)), *region_counts]
+            sums[date] = _sums
         except Exception as exc:
-            logger.error(f"Failed to load {date}: {exc}")
+            logger.error(f"Failed to process {date}: {exc}")
+    return sums
 
-        date += dt.timedelta(days=1)
 
-    df = pd.DataFrame({"_date": dates, "xco2": xco2, "xco2_sk": xco2_sk, "xco2_eu": xco2_eu})
+def _merge_daily_sums(a: dict[dt.date, np.ndarray], b: dict[dt.date, np.ndarray]) -> dict[dt.date, np.ndarray]:
+    """
+    Reduce step of `oco2_daily_avg`.
+    """
+    merged = dict(a)
+    for date, sums in b.items():
+        merged[date] = merged[date] + sums if date in merged else sums
+    return merged
+
+
+def oco2_daily_avg(
+        loader: BaseLoader,
+        incremental: bool = False,
+        workers: int = 1,
+        today: dt.date | None = None,
+) -> None:
+    """
+    Calculate daily averages for OCO2 data.
+    In incremental mode only dates missing from the existing result, or whose daily file changed
+    since (if the loader can tell file versions), are calculated and merged into the result.
+    :param loader: Loader, needs to be picklable if `workers` > 1.
+    :param incremental:
+    :param workers: Number of worker processes, see `data.utils.mapreduce.map_reduce`.
+    :param today: Dates up to the day before are calculated, today if None.
+    :return:
+    """
+    archive = Archive(loader)
+    date_stop = today or dt.date.today()
+    all_dates = [GLOBAL_DATE_START + dt.timedelta(days=i) for i in range((date_stop - GLOBAL_DATE_START).days)]
+    # One listing of the archive instead of one request per date.
+    versions = {date.isoformat(): version for date, version in archive.get_daily_versions(all_dates).items()}
+
+    columns = ["_date", "xco2", *(f"xco2_{name}" for name in REGIONS.names)]
+    existing_df = pd.DataFrame({column: [] for column in columns})
+    existing_versions: dict[str, str | None] = {}
+    if incremental:
+        try:
+            existing_df = loader.retrieve_dataframe("oco2_daily_avg.gzip")
+            sources_df = loader.retrieve_dataframe(OCO2_DAILY_AVG_SOURCES)
+            existing_versions = dict(zip(sources_df["_date"], sources_df["version"]))
+        except Exception as exc:
+            logger.warning(f"Existing daily averages are not available, calculating all dates: {exc}")
+            existing_df = existing_df.iloc[0:0]
+
+    done = set(existing_df["_date"])
+    dates_to_update = set()
+    for date in all_dates:
+        key = date.isoformat()
+        version = versions[key]
+        if key not in done or (version is not None and version != existing_versions.get(key)):
+            dates_to_update.add(date)
+    logger.info(f"Calculating daily averages for {len(dates_to_update)} of {len(all_dates)} dates")
+
+    sums = map_reduce(
+        functools.partial(_oco2_daily_sums, loader),
+        _month_batches(sorted(dates_to_update)),
+        _merge_daily_sums,
+        {},
+        workers=workers,
+    )
+
+    with np.errstate(invalid="ignore", divide="ignore"):  # Mean of no soundings in a region is NaN.
+        df = pd.DataFrame(
+            [(_date, *(_sums[0::2] / _sums[1::2])) for _date, _sums in sorted(sums.items())],
+            columns=columns,
+        )
     df["_date"] = df["_date"].astype(str)
+
+    # Keep previous results of dates which were not calculated again, e.g. failed to load this time.
+    existing_df = existing_df[~existing_df["_date"].isin(df["_date"])]
+    # Concatenation with empty frames is deprecated by pandas.
+    parts = [part for part in (existing_df, df) if not part.empty]
+    if parts:
+        df = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    df = df.sort_values("_date", ignore_index=True)
     loader.save_dataframe(df, "oco2_daily_avg.gzip")
 
+    # Sources are saved after the result, a missing update only causes recalculation on the next run.
+    calculated = set(df["_date"]) - set(existing_df["_date"])
+    sources_df = pd.DataFrame({"_date": df["_date"]})
+    sources_df["version"] = [
+        versions.get(_date) if _date in calculated else existing_versions.get(_date)
+        for _date in sources_df["_date"]
+    ]
+    loader.save_dataframe(sources_df, OCO2_DAILY_AVG_SOURCES)
+
+
+class _MonthlyGrids:
+    """
+    Grid aggregates and XCO2 quantile sketches per month, see `data.utils.gridding.GridAggregator`
+    and `data.utils.sketch.HistogramSketch`.
+    Memory is bounded by the number of months and occupied grid cells, not by the number of soundings.
+    """
+    _cell_size: float
+    _value_columns: list[str] | None
+    _grids: dict[tuple[int, int], GridAggregator]
+    _sketches: dict[tuple[int, int], HistogramSketch]
+
+    def __init__(self, cell_size: float = 1.0, value_columns: list[str] | None = None) -> None:
+        """
+        Constructor.
+        :param cell_size: Grid cell size in degrees.
+        :param value_columns: Columns to average, all but time and coordinates of the first dataframe if None.
+        """
+        self._cell_size = cell_size
+        self._value_columns = value_columns
+        self._grids = {}
+        self._sketches = {}
+
+    def update(self, df: pd.DataFrame) -> None:
+        if self._value_columns is None:
+            self._value_columns = [c for c in df.columns if c not in ("_time", "latitude", "longitude")]
+
+        _time = pd.to_datetime(df["_time"])
+        month_key = (_time.dt.year * 12 + _time.dt.month - 1).to_numpy(dtype=np.float64, na_value=np.nan)
+        for _month_key in np.unique(month_key[~np.isnan(month_key)]):
+            key = (int(_month_key) // 12, int(_month_key) % 12 + 1)
+            if key not in self._grids:
+                self._grids[key] = GridAggregator(self._value_columns, cell_size=self._cell_size)
+                self._sketches[key] = HistogramSketch(cell_size=self._cell_size)
+
+            month_df = df[month_key == _month_key]
+            self._grids[key].update(month_df)
+            if "xco2" in month_df.columns:
+                self._sketches[key].update(month_df["latitude"], month_df["longitude"], month_df["xco2"])
+
+    def merge(self, other: _MonthlyGrids) -> _MonthlyGrids:
+        """
+        Add grids of other into these.
+        :param other:
+        :return: self
+        """
+        if self._value_columns is None:
+            self._value_columns = other._value_columns
+
+        for key, grid in other._grids.items():
+            if key in self._grids:
+                self._grids[key].merge(grid)
+                self._sketches[key].merge(other._sketches[key])
+            else:
+                self._grids[key] = grid
+                self._sketches[key] = other._sketches[key]
+        return self
+
+    def coarsen(self, cell_size: float) -> _MonthlyGrids:
+        """
+        Grids of every month at a coarser cell size, see `GridAggregator.coarsen`.
+        :param cell_size:
+        :return: New grids.
+        """
+        coarse = _MonthlyGrids(cell_size, self._value_columns)
+        coarse._grids = {key: grid.coarsen(cell_size) for key, grid in self._grids.items()}
+        return coarse
+
+    def to_dataframe(self) -> pd.DataFrame:
+        value_columns = self._value_columns or ["xco2"]
+        dfs = []
+        for year, month in sorted(self._grids):
+            df = self._grids[(year, month)].to_dataframe()
+            df.insert(0, "year", np.int32(year))
+            df.insert(1, "month", np.int32(month))
+            dfs.append(df)
+
+        if not dfs:
+            return pd.DataFrame(columns=["year", "month", "latitude", "longitude", *value_columns, "count"])
+        return pd.concat(dfs, ignore_index=True)
+
+    @property
+    def sketches(self) -> dict[tuple[int, int], HistogramSketch]:
+        """
+        XCO2 quantile sketches by year and month, sorted.
+        """
+        return dict(sorted(self._sketches.items()))
+
+
+def _monthly_grids(loader: BaseLoader, cell_size: float, dates: list[dt.date]) -> _MonthlyGrids:
+    """
+    Map step of `monthly_avg_per_lat_lon`.
+    """
+    grids = _MonthlyGrids(cell_size)
+    archive = Archive(loader)
+    for _date, date_df in archive.iter_daily_dataframes(dates[0], dates[-1] + dt.timedelta(days=1), dates=set(dates)):
+        grids.update(date_df)
+    return grids
+
+
+def _sketch_quantiles(sketches: dict[tuple[int, int], HistogramSketch], quantiles: Sequence[float]) -> pd.DataFrame:
+    """
+    Quantiles of every month of sketches by year and month.
+    """
+    dfs = []
+    for (year, month), sketch in sketches.items():
+        df = sketch.quantiles(quantiles, prefix="xco2_q")
+        df.insert(0, "year", np.int32(year))
+        df.insert(1, "month", np.int32(month))
+        dfs.append(df)
+
+    if not dfs:
+        return pd.DataFrame(columns=[
+            "year", "month", "latitude", "longitude", *(f"xco2_q{q * 100:g}" for q in quantiles), "count",
+        ])
+    return pd.concat(dfs, ignore_index=True)
+
+
+def monthly_quantiles(
+        loader: BaseLoader,
+        quantiles: Sequence[float],
+        year: int | None = None,
+        month: int | None = None,
+        cell_size: float = 1.0,
+) -> pd.DataFrame:
+    """
+    Approximate XCO2 quantiles per cell from saved sketches, without reading soundings.
+    Only sketch files of the requested months are read, months without a sketch are left out.
+    :param loader:
+    :param quantiles: Quantiles between 0 and 1, e.g. 0.5 for median in column `xco2_q50`.
+    :param year: Only this year, all if None.
+    :param month: Only this month, all if None.
+    :param cell_size: Cell size of `monthly_avg_per_lat_lon`.
+    :return: Dataframe with `year`, `month`, `latitude`, `longitude`, quantile columns and `count`.
+    """
+    date_stop = dt.date.today()
+    month_keys = range(GLOBAL_DATE_START.year * 12 + GLOBAL_DATE_START.month - 1, date_stop.year * 12 + date_stop.month)
+    sketches = {}
+    for _year, _month in ((_key // 12, _key % 12 + 1) for _key in month_keys):
+        if year not in (None, _year) or month not in (None, _month):
+            continue
+        try:
+            state_df = loader.retrieve_dataframe(monthly_sketch_file_name(_year, _month))
+        except Exception as exc:
+            logger.debug(f"No quantile sketch of {_year:04d}-{_month:02d}: {exc}")
+            continue
+        sketches[(_year, _month)] = HistogramSketch.from_state_frame(state_df, cell_size=cell_size)
+    return _sketch_quantiles(sketches, quantiles)
+
+
+def monthly_avg_file_name(cell_size: float | None = None) -> str:
+    """
+    File name of monthly averages per grid cell.
+    :param cell_size: Cell size of a pyramid level, the base grid if None.
+    :return:
+    """
+    if cell_size is None:
+        return "monthly_avg_per_lat_lon.gzip"
+    return f"monthly_avg_per_lat_lon_{cell_size:g}deg.gzip"
+
 
-def monthly_avg_per_lat_lon(loader: BaseLoader) -> None:
+def monthly_sketch_file_name(year: int, month: int) -> str:
+    """
+    File name of XCO2 quantile sketches per grid cell of the month, see `data.utils.sketch.HistogramSketch`.
+    :param year:
+    :param month:
+    :return:
+    """
+    return f"monthly_sketch_per_lat_lon/{year:04d}-{month:02d}.gzip"
+
+
+def monthly_avg_per_lat_lon(
+        loader: BaseLoader,
+        workers: int = 1,
+        cell_size: float = 1.0,
+        pyramid: Sequence[float] = MONTHLY_GRID_PYRAMID,
+) -> None:
     """
     Calculate monthly averages for OCO2 data per whole latitude and longitude.
+    Days are reduced into running grid aggregates, `count` is the number of soundings per cell.
+    XCO2 quantile sketches of the base grid are saved per month to `monthly_sketch_file_name` and quantiles
+    `MONTHLY_QUANTILES` from them to `monthly_quantiles_per_lat_lon.gzip`, other quantiles are served
+    by `monthly_quantiles`.
+    The base grid is then coarsened into pyramid levels, saved as `monthly_avg_file_name(cell_size)`,
+    so that maps can be drawn with fewer cells.
+    :param loader: Loader, needs to be picklable if `workers` > 1.
+    :param workers: Number of worker processes, see `data.utils.mapreduce.map_reduce`.
+    :param cell_size: Grid cell size in degrees, whole degrees by default.
+    :param pyramid: Cell sizes of pyramid levels, multiples of `cell_size`.
     :return:
     """
-    date = GLOBAL_DATE_START
     date_stop = dt.date.today()
-
-    df = pd.DataFrame()
-    while date < date_stop:
+    dates = [GLOBAL_DATE_START + dt.timedelta(days=i) for i in range((date_stop - GLOBAL_DATE_START).days)]
+
+    grids = map_reduce(
+        functools.partial(_monthly_grids, loader, cell_size),
+        _month_batches(dates),
+        _MonthlyGrids.merge,
+        _MonthlyGrids(cell_size),
+        workers=workers,
+    )
+    loader.save_dataframe(grids.to_dataframe(), monthly_avg_file_name())
+
+    sketches = grids.sketches
+    for (year, month), sketch in sketches.items():
+        loader.save_dataframe(sketch.to_state_frame(), monthly_sketch_file_name(year, month))
+    loader.save_dataframe(_sketch_quantiles(sketches, MONTHLY_QUANTILES), "monthly_quantiles_per_lat_lon.gzip")
+
+    for level_cell_size in pyramid:
         try:
-            date_df = loader.retrieve_dataframe(f"{date.isoformat()}.gzip")
-            df = pd.concat([df, date_df])
+            level = grids.coarsen(level_cell_size)
+        except ValueError as exc:
+            logger.warning(f"Skipping pyramid level: {exc}")
+            continue
+        loader.save_dataframe(level.to_dataframe(), monthly_avg_file_name(level_cell_size))
+
+
+def monthly_climatology(
+        loader: BaseLoader,
+        rebuild: bool = False,
+        cell_size: float = 1.0,
+        today: dt.date | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Fold closed months of `monthly_avg_per_lat_lon` into the climatology store and calculate anomalies.
+    Only months not folded yet are read from the grid, the current month is left out until it is closed
+    and ingested, see `data.archive.CLOSED_MONTH_LAG`, as its averages still change. Saves climatology per
+    calendar month and cell to `climatology_per_lat_lon.gzip` and anomalies of every month of the grid to
+    `monthly_anomaly_per_lat_lon.gzip`.
+    :param loader:
+    :param rebuild: Discard the existing store, e.g. after a past month was recalculated.
+    :param cell_size: Cell size of `monthly_avg_per_lat_lon`.
+    :param today: Reference date, today if None.
+    :return: Newly folded months.
+    """
+    today = today or dt.date.today()
+    store = ClimatologyStore(cell_size=cell_size)
+    if not rebuild:
+        try:
+            store = ClimatologyStore.from_dataframes(
+                loader.retrieve_dataframe(CLIMATOLOGY_STATE),
+                loader.retrieve_dataframe(CLIMATOLOGY_FOLDED),
+                cell_size=cell_size,
+            )
         except Exception as exc:
-            logger.error(f"Failed to load {date}: {exc}")
-
-        date += dt.timedelta(days=1)
+            logger.warning(f"Climatology store is not available, folding all months: {exc}")
 
-    df["_time"] = pd.to_datetime(df["_time"])
-    df["month"] = df["_time"].dt.month
-    df["year"] = df["_time"].dt.year
-    df["latitude"] = df["latitude"].round()
-    df["longitude"] = df["longitude"].round()
+    grid_df = loader.retrieve_dataframe(monthly_avg_file_name())
+    # Same lag as `Archive.compact_closed_months`, the last days of the previous month may not be ingested yet.
+    closed = {
+        (int(year), int(month))
+        for year, month in grid_df[["year", "month"]].drop_duplicates().itertuples(index=False)
+        if month_range(int(year), int(month))[1] <= today - CLOSED_MONTH_LAG
+    }
+    folded = store.fold_grids(grid_df, months=closed)
+    logger.info(f"Folded {len(folded)} months into climatology of {len(store.folded)} months")
 
-    df = df.drop(columns=["_time"])
-    df = df.groupby(["year", "month", "latitude", "longitude"]).mean().reset_index()
+    # Store first, a failure afterwards only recalculates derived files on the next run.
+    state_df, folded_df = store.to_dataframes()
+    loader.save_dataframe(state_df, CLIMATOLOGY_STATE)
+    loader.save_dataframe(folded_df, CLIMATOLOGY_FOLDED)
 
-    loader.save_dataframe(df, "monthly_avg_per_lat_lon.gzip")
+    loader.save_dataframe(store.statistics(), "climatology_per_lat_lon.gzip")
+    loader.save_dataframe(store.anomalies(grid_df), "monthly_anomaly_per_lat_lon.gzip")
+    return folded
 
 
-def mlo(loader: BaseLoader) -> None:
+def monthly_trends(loader: BaseLoader, harmonics: int = 1, min_months: int = 24) -> None:
     """
-    Retrieves data from netCDF file and saves it as a dataframe.
-    Calculates daily averages for MLO data since 1975.
+    Fit linear trend and seasonal cycle of every cell of `monthly_avg_per_lat_lon`.
+    Saves growth rate and annual amplitude maps to `trend_per_lat_lon.gzip`, see `data.utils.trends.trend_maps`.
     :param loader:
+    :param harmonics: Number of seasonal harmonics.
+    :param min_months: Cells with fewer months of data are left out.
     :return:
     """
-    mlo_file = "co2_mlo_surface-flask_1_ccgg_event.nc"
+    grid_df = loader.retrieve_dataframe(monthly_avg_file_name())
+    df = trend_maps(grid_df, harmonics=harmonics, min_months=min_months)
+    logger.info(f"Fitted trends of {len(df)} cells")
+    loader.save_dataframe(df, "trend_per_lat_lon.gzip")
+
+
+def monthly_gap_filled(
+        loader: BaseLoader,
+        weighting: Weighting = "idw",
+        max_distance_km: float = 500.0,
+        cell_size: float = 1.0,
+) -> None:
+    """
+    Fill empty cells of every month of `monthly_avg_per_lat_lon` by interpolation of its occupied cells.
+    Saves occupied and filled cells to `monthly_avg_per_lat_lon_filled.gzip`, see `data.utils.interpolation.fill_grid`.
+    :param loader:
+    :param weighting: Inverse distance or gaussian weights of the nearest occupied cells.
+    :param max_distance_km: Empty cells further from occupied cells are left empty.
+    :param cell_size: Cell size of `monthly_avg_per_lat_lon`.
+    :return:
+    """
+    grid_df = loader.retrieve_dataframe(monthly_avg_file_name())
+    dfs = []
+    for (year, month), month_df in grid_df.groupby(["year", "month"], sort=True):
+        df = fill_grid(month_df, cell_size=cell_size, weighting=weighting, max_distance_km=max_distance_km)
+        df.insert(0, "year", np.int32(year))
+        df.insert(1, "month", np.int32(month))
+        dfs.append(df)
+
+    if dfs:
+        df = pd.concat(dfs, ignore_index=True)
+    else:
+        df = pd.DataFrame(columns=["year", "month", "latitude", "longitude", "xco2", "filled", "distance"])
+    logger.info(f"Filled {df['filled'].sum()} empty cells of {len(dfs)} months")
+    loader.save_dataframe(df, "monthly_avg_per_lat_lon_filled.gzip")
+
+
+def _merge_station_daily_sums(a: pd.DataFrame, b: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce step of `stations_daily_avg`, stations may have several event files, e.g. per sampling method.
+    """
+    return pd.concat([a, b], ignore_index=True).groupby(["station", "_date"], as_index=False)[["sum", "count"]].sum()
 
-    # Get data from MLO file.
-    with nc.Dataset(mlo_file, "r") as root_group_MLO:
-        _v = root_group_MLO.variables["value"]
-        _qc = root_group_MLO.variables["qcflag"]
-        retrieval_time_string = nc.chartostring(root_group_MLO.variables["datetime"][:])
 
-        # Create MLO dataframe.
-        df = pd.DataFrame({
-            "_time": pd.to_datetime(retrieval_time_string, format="%Y-%m-%dT%H:%M:%SZ", utc=True),
-            "co2": _v[:],
-            "qcflag": _qc[:, 0],
-        })
+def _stations_daily_avg(paths: list[str], workers: int = 1) -> pd.DataFrame:
+    """
+    Daily averages per station of event files, see `stations_daily_avg`.
+    """
+    sums = map_reduce(
+        event_file_daily_sums,
+        paths,
+        _merge_station_daily_sums,
+        pd.DataFrame({
+            "station": pd.Series(dtype=str),
+            "_date": pd.Series(dtype="datetime64[s]"),
+            "sum": pd.Series(dtype=np.float64),
+            "count": pd.Series(dtype=np.int64),
+        }),
+        workers=workers,
+    )
+    df = pd.DataFrame({
+        "station": sums["station"],
+        "_date": sums["_date"].dt.strftime("%Y-%m-%d"),
+        "co2": sums["sum"] / sums["count"],
+        "count": sums["count"],
+    })
+    return df.sort_values(["station", "_date"], ignore_index=True)
+
+
+def stations_daily_avg(
+        loader: BaseLoader,
+        directory: str,
+        pattern: str = EVENT_FILE_PATTERN,
+        workers: int = 1,
+) -> pd.DataFrame:
+    """
+    Calculate daily averages of valid CO2 samples of all NOAA event files in a directory.
+    Files are read in parallel, see `data.utils.noaa.read_event_file`.
+    Saves `stations_daily_avg.gzip` with `station`, `_date`, `co2` and `count` (number of samples) columns.
+    :param loader:
+    :param directory:
+    :param pattern: Glob pattern of event files.
+    :param workers: Number of worker processes, see `data.utils.mapreduce.map_reduce`.
+    :return: Saved dataframe.
+    """
+    paths = sorted(glob.glob(os.path.join(directory, pattern)))
+    if not paths:
+        raise FileNotFoundError(f"No files matching {pattern} in {directory}")
 
-    df = df[df["qcflag"] == b"."]  # Remove invalid data.
-    df = df.drop(columns=["qcflag"])
+    logger.info(f"Calculating daily averages of {len(paths)} station files")
+    df = _stations_daily_avg(paths, workers=workers)
+    loader.save_dataframe(df, "stations_daily_avg.gzip")
+    return df
 
-    # Daily averages, year > 1975.
-    df = df[df["_time"].dt.year > 1975]
-    df["_date"] = df["_time"].dt.date.astype(str)
-    df = df.groupby("_date").mean().reset_index()
 
-    # Drop datetime column.
-    df = df.drop(columns=["_time"])
+def mlo(loader: BaseLoader, mlo_file: str = "co2_mlo_surface-flask_1_ccgg_event.nc") -> None:
+    """
+    Calculates daily averages for MLO data since 1976 from NOAA event file.
+    :param loader:
+    :param mlo_file:
+    :return:
+    """
+    df = _stations_daily_avg([mlo_file])
+    df = df[df["_date"] >= "1976-01-01"]
 
     # TODO: Consider returning `df` to ditch `loader` dependency!
-    loader.save_dataframe(df, "mlo.gzip")
+    loader.save_dataframe(df[["_date", "co2"]].reset_index(drop=True), "mlo.gzip")
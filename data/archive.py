@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Collection, Iterator
+
+    from data.loaders.base_loader import BaseLoader
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE_NAME = "archive_index.gzip"
+
+# Daily ETL runs two days behind, give it one more day before a month is considered closed.
+CLOSED_MONTH_LAG = dt.timedelta(days=3)
+
+
+def daily_file_name(date: dt.date) -> str:
+    return f"{date.isoformat()}.gzip"
+
+
+def monthly_file_name(year: int, month: int, compacted_at: dt.datetime) -> str:
+    # Every compaction writes a new file, so readers holding the previous index are unaffected.
+    return f"monthly/{year:04d}-{month:02d}.{compacted_at:%Y%m%dT%H%M%S%f}.gzip"
+
+
+def month_range(year: int, month: int) -> tuple[dt.date, dt.date]:
+    """
+    First and last day of the month.
+    :param year:
+    :param month:
+    :return:
+    """
+    first = dt.date(year, month, 1)
+    last = (first + dt.timedelta(days=32)).replace(day=1) - dt.timedelta(days=1)
+    return first, last
+
+
+class Archive:
+    """
+    Archive of daily sounding files, optionally compacted into monthly files.
+    Compaction concatenates daily files of a closed month into one time sorted monthly file.
+    The index maps every compacted date to a row range of its monthly file. It is written only
+    after the monthly file, and daily files are never removed, so readers use whichever
+    of them the index they loaded points to.
+    """
+    _loader: BaseLoader
+    _monthly_loader: BaseLoader
+
+    def __init__(self, loader: BaseLoader, monthly_loader: BaseLoader | None = None) -> None:
+        """
+        Constructor.
+        :param loader: Loader of daily files and of the index.
+        :param monthly_loader: Loader of monthly files, e.g. with larger row groups, `loader` if None.
+        """
+        self._loader = loader
+        self._monthly_loader = monthly_loader or loader
+
+    def retrieve_index(self) -> pd.DataFrame:
+        """
+        Retrieve index of compacted dates.
+        Missing or unreadable index is treated as empty, daily files are then read instead.
+        :return: Dataframe with `date`, `file_name`, `row_start` and `row_end` columns.
+        """
+        try:
+            return self._loader.retrieve_dataframe(INDEX_FILE_NAME)
+        except Exception as exc:
+            logger.info(f"Archive index is not available, reading daily files: {exc}")
+            return pd.DataFrame({
+                "date": pd.Series(dtype=str),
+                "file_name": pd.Series(dtype=str),
+                "row_start": pd.Series(dtype="int64"),
+                "row_end": pd.Series(dtype="int64"),
+            })
+
+    def iter_daily_dataframes(
+            self,
+            date_from: dt.date,
+            date_to: dt.date,
+            dates: Collection[dt.date] | None = None,
+    ) -> Iterator[tuple[dt.date, pd.DataFrame]]:
+        """
+        Iterate over daily dataframes, each monthly file is retrieved at most once.
+        Dates which fail to load are logged and skipped.
+        :param date_from: First date, inclusive.
+        :param date_to: Last date, exclusive.
+        :param dates: Only these dates of the range, all if None.
+        :return: Iterator of date and its dataframe.
+        """
+        index = self.retrieve_index().set_index("date")
+
+        monthly_file_name_ = None
+        monthly_df = None
+
+        date = date_from
+        while date < date_to:
+            if dates is not None and date not in dates:
+                date += dt.timedelta(days=1)
+                continue
+
+            try:
+                key = date.isoformat()
+                if key in index.index:
+                    entry = index.loc[key]
+                    if entry["file_name"] != monthly_file_name_:
+                        monthly_file_name_ = entry["file_name"]
+                        monthly_df = None  # Release previous month first.
+                        monthly_df = self._monthly_loader.retrieve_dataframe(monthly_file_name_)
+
+                    df = monthly_df.iloc[entry["row_start"]:entry["row_end"]].reset_index(drop=True)
+                else:
+                    df = self._loader.retrieve_dataframe(daily_file_name(date))
+
+                yield date, df
+            except Exception as exc:
+                logger.error(f"Failed to load {date}: {exc}")
+
+            date += dt.timedelta(days=1)
+
+    def get_daily_versions(self, dates: Collection[dt.date]) -> dict[dt.date, str | None]:
+        """
+        Versions of daily files, which are kept also for compacted dates, looked up in bulk if the loader supports it.
+        :param dates:
+        :return: See `BaseLoader.get_versions`.
+        """
+        file_names = {date: daily_file_name(date) for date in dates}
+        versions = self._loader.get_versions(list(file_names.values()))
+        return {date: versions[file_name] for date, file_name in file_names.items()}
+
+    def compact_month(self, year: int, month: int, force: bool = False) -> bool:
+        """
+        Merge daily files of the month into one monthly file and update the index.
+        :param year:
+        :param month:
+        :param force: Compact again even if the month is already compacted, e.g. after reprocessing.
+        :return: True if the month was compacted.
+        """
+        first, last = month_range(year, month)
+        index = self.retrieve_index()
+        in_month = index["date"].between(first.isoformat(), last.isoformat())
+        if in_month.any() and not force:
+            logger.info(f"{year:04d}-{month:02d} is already compacted")
+            return False
+
+        dates = []
+        dfs = []
+        date = first
+        while date <= last:
+            try:
+                df = self._loader.retrieve_dataframe(daily_file_name(date))
+            except Exception as exc:
+                logger.warning(f"Daily file for {date} is missing from compaction: {exc}")
+            else:
+                dates.append(date.isoformat())
+                dfs.append(df.sort_values("_time", kind="stable"))
+            date += dt.timedelta(days=1)
+
+        if not dfs:
+            logger.info(f"No daily files to compact for {year:04d}-{month:02d}")
+            return False
+
+        row_count = np.array([len(df) for df in dfs])
+        row_end = np.cumsum(row_count)
+        file_name = monthly_file_name(year, month, dt.datetime.now(dt.timezone.utc))
+
+        # Monthly file must be complete before the index points to it.
+        self._monthly_loader.save_dataframe(pd.concat(dfs, ignore_index=True), file_name)
+
+        month_index = pd.DataFrame({
+            "date": dates,
+            "file_name": file_name,
+            "row_start": row_end - row_count,
+            "row_end": row_end,
+        })
+        index = pd.concat([index[~in_month], month_index], ignore_index=True) \
+            .sort_values("date", ignore_index=True)
+        self._loader.save_dataframe(index, INDEX_FILE_NAME)
+
+        logger.info(f"Compacted {len(dates)} daily files into {file_name}")
+        return True
+
+    def compact_closed_months(self, date_from: dt.date, today: dt.date | None = None) -> list[str]:
+        """
+        Compact all closed months since `date_from` that are not compacted yet.
+        :param date_from:
+        :param today: Reference date, today if None.
+        :return: List of compacted months in format YYYY-MM.
+        """
+        today = today or dt.date.today()
+        compacted = []
+
+        year, month = date_from.year, date_from.month
+        while month_range(year, month)[1] <= today - CLOSED_MONTH_LAG:
+            if self.compact_month(year, month):
+                compacted.append(f"{year:04d}-{month:02d}")
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+        return compacted
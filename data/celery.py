@@ -25,6 +25,10 @@ app.conf.beat_schedule = {
             "days_before_today": 2
         },
     },
+    "monthly_compaction_task": {
+        "task": "monthly_compaction_task",
+        "schedule": crontab(minute="0", hour="7"),  # 07:00, after daily ETL.
+    },
 }
 
 app.conf.timezone = settings.celery_timezone
@@ -1,8 +1,16 @@
+from data.archive import Archive
 from data.conf import get_app_settings
 from data.etl.etl_pipeline import ETLPipeline
 from data.extractors.utils import get_opendap_extractor_class
 from data.loaders.s3_parquet_loader import S3ParquetLoader
 from data.utils.opendap import OpendapClient
+from data.utils.parquet import ParquetOptions
+
+# Daily files are sorted spatially into row groups of this size, so regional reads can skip row groups.
+DAILY_PARQUET_OPTIONS = ParquetOptions(engine="fastparquet", compression="gzip", row_group_size=20_000)
+
+# Monthly files are sorted by time, row groups of roughly half a day allow date range reads to skip row groups.
+MONTHLY_PARQUET_OPTIONS = ParquetOptions(engine="fastparquet", compression="gzip", row_group_size=100_000)
 
 
 def pipeline_factory(extractor_class: str) -> ETLPipeline:
@@ -18,7 +26,19 @@ def pipeline_factory(extractor_class: str) -> ETLPipeline:
     settings = get_app_settings()
     etl_pipeline = ETLPipeline(
         extract_strategy=ExtractorCls(settings=settings, client=OpendapClient()),
-        load_strategy=S3ParquetLoader(settings=settings)
+        load_strategy=S3ParquetLoader(settings=settings, options=DAILY_PARQUET_OPTIONS, spatial_sort=True)
     )
 
     return etl_pipeline
+
+
+def archive_factory() -> Archive:
+    """
+    Create archive of daily and monthly files with production settings.
+    :return:
+    """
+    settings = get_app_settings()
+    return Archive(
+        loader=S3ParquetLoader(settings=settings, options=DAILY_PARQUET_OPTIONS),
+        monthly_loader=S3ParquetLoader(settings=settings, options=MONTHLY_PARQUET_OPTIONS),
+    )
@@ -4,6 +4,8 @@ from abc import ABC, abstractmethod
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from collections.abc import Collection
+
     import pandas as pd
 
 
@@ -31,3 +33,21 @@ class BaseLoader(ABC):
         :return: Dataframe
         """
         pass
+
+    def get_version(self, file_name: str) -> str | None:
+        """
+        Version of the stored dataframe, changes whenever its content is saved again.
+        Loaders which cannot tell versions apart return None.
+        :param file_name:
+        :return: Opaque version string, None if unknown or if the dataframe does not exist.
+        """
+        return None
+
+    def get_versions(self, file_names: Collection[str]) -> dict[str, str | None]:
+        """
+        Versions of many stored dataframes, see `get_version`.
+        Loaders which can list versions in bulk override this instead of one lookup per file.
+        :param file_names:
+        :return: Version of every file name.
+        """
+        return {file_name: self.get_version(file_name) for file_name in file_names}
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import collections
+import threading
+import time
+from typing import TYPE_CHECKING, NamedTuple, TypedDict
+
+from data.loaders.base_loader import BaseLoader
+
+if TYPE_CHECKING:
+    from collections.abc import Collection
+
+    import pandas as pd
+
+
+class _CacheEntry(NamedTuple):
+    df: pd.DataFrame
+    size: int
+    expires_at: float | None
+
+
+class CachedLoaderStats(TypedDict):
+    hits: int
+    misses: int
+    entries: int
+    size: int
+
+
+class CachedLoader(BaseLoader):
+    """
+    Loader wrapper keeping retrieved dataframes in memory.
+    The cache is bounded by the memory footprint of cached dataframes and evicts least recently used ones.
+    Saving a dataframe invalidates its cache entry.
+    """
+    _loader: BaseLoader
+    _max_size: int
+    _ttl: float | None
+
+    _entries: collections.OrderedDict[str, _CacheEntry]
+    _size: int
+    _generation: int  # Incremented by every invalidation, results of loads started before are not cached.
+    _lock: threading.Lock
+
+    hits: int
+    misses: int
+
+    def __init__(self, loader: BaseLoader, max_size: int, ttl: float | None = None) -> None:
+        """
+        Constructor.
+        :param loader: Wrapped loader.
+        :param max_size: Maximum total memory footprint of cached dataframes in bytes.
+        :param ttl: Time to live of cache entries in seconds, no expiration if None.
+        """
+        self._loader = loader
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries = collections.OrderedDict()
+        self._size = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
+        self._loader.save_dataframe(df, file_name)
+        # After the write, so entries cached from the previous file by concurrent retrievals are dropped.
+        self.invalidate(file_name)
+
+    def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
+        """
+        Retrieve dataframe from the cache or from the wrapped loader.
+        A copy is returned, so callers may modify it without corrupting the cache.
+        :param file_name:
+        :return: Dataframe
+        """
+        with self._lock:
+            entry = self._entries.get(file_name)
+            if entry is not None and entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._pop(file_name)
+                entry = None
+
+            if entry is not None:
+                self._entries.move_to_end(file_name)
+                self.hits += 1
+                return entry.df.copy()
+
+            self.misses += 1
+            generation = self._generation
+
+        df = self._loader.retrieve_dataframe(file_name)
+        self._put(file_name, df.copy(), generation)
+        return df
+
+    def get_version(self, file_name: str) -> str | None:
+        return self._loader.get_version(file_name)
+
+    def get_versions(self, file_names: Collection[str]) -> dict[str, str | None]:
+        return self._loader.get_versions(file_names)
+
+    def invalidate(self, file_name: str | None = None) -> None:
+        """
+        Remove cache entry for given file name, or all entries if None.
+        :param file_name:
+        :return: None
+        """
+        with self._lock:
+            self._generation += 1
+            if file_name is None:
+                self._entries.clear()
+                self._size = 0
+            elif file_name in self._entries:
+                self._pop(file_name)
+
+    def stats(self) -> CachedLoaderStats:
+        """
+        Hit and miss counters and current size of the cache.
+        :return:
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries), "size": self._size}
+
+    def _put(self, file_name: str, df: pd.DataFrame, generation: int) -> None:
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self._max_size:
+            return
+
+        expires_at = None if self._ttl is None else time.monotonic() + self._ttl
+        with self._lock:
+            if generation != self._generation:  # Invalidated while loading, the dataframe may be outdated.
+                return
+            if file_name in self._entries:
+                self._pop(file_name)
+
+            self._entries[file_name] = _CacheEntry(df, size, expires_at)
+            self._size += size
+
+            while self._size > self._max_size:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, file_name: str) -> None:
+        entry = self._entries.pop(file_name)
+        self._size -= entry.size
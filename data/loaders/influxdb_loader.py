@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import collections
+import concurrent.futures
+import queue
+import threading
 from typing import TYPE_CHECKING, TypedDict
 
 import influxdb_client as influxdb
 import pandas as pd
+from influxdb_client import WritePrecision
+from influxdb_client.client.write_api import SYNCHRONOUS, WriteApi, WriteOptions
+from urllib3.util.retry import Retry
 
 from data.loaders.base_loader import BaseLoader
+from data.utils.line_protocol import encode_line_protocol
 
 if TYPE_CHECKING:
+    from collections.abc import Iterator
+
     from data.settings import Settings
+    from data.utils.geo import BoundingBox
 
 
 class InfluxDBClientKwargs(TypedDict):
@@ -18,54 +29,146 @@ class InfluxDBClientKwargs(TypedDict):
     debug: bool | None
 
 
+_END_OF_WINDOW = object()  # Sentinel closing the chunk queue of a streamed time window.
+
+
 class InfluxDBLoader(BaseLoader):
     """
     InfluxDB loader class.
+    One client with a pooled HTTP connection is kept for the lifetime of the loader,
+    call `close` (or use the loader as a context manager) to release it.
     """
     _bucket: str
     _client_kwargs: dict
     _xco2_measurement_name: str = "xco2"
+    _dt_format: str = "%Y-%m-%dT%H:%M:%S.%fZ"
+
+    _batching: bool
+    _batch_size: int
+    _write_options: WriteOptions
 
-    def __init__(self, settings: Settings) -> None:
+    _client: influxdb.InfluxDBClient | None = None
+    _write_api: WriteApi | None = None
+
+    def __init__(
+            self,
+            settings: Settings,
+            *,
+            batching: bool = False,
+            batch_size: int = 5_000,
+            flush_interval: int = 1_000,
+            enable_gzip: bool = False,
+            max_retries: int = 5,
+            retry_interval: int = 5_000,
+            timeout: int = 30_000,
+    ) -> None:
+        """
+        Constructor.
+        :param settings:
+        :param batching: Write points asynchronously in batches. Points are guaranteed
+            to be written only after `flush` or `close`.
+        :param batch_size: Number of points per write request.
+        :param flush_interval: Maximum time in milliseconds before a partial batch is written.
+        :param enable_gzip: Compress write and query requests.
+        :param max_retries: Maximum number of retries of a failed write request.
+        :param retry_interval: Initial delay in milliseconds before retrying a failed write in batching mode.
+        :param timeout: HTTP request timeout in milliseconds.
+        """
         self._bucket = settings.influxdb_bucket
         self._client_kwargs = {
             "url": settings.influxdb_url,
             "token": settings.influxdb_token,
             "org": settings.influxdb_org,
             "debug": settings.debug,
+            "timeout": timeout,
+            "enable_gzip": enable_gzip,
+            # Batching writes have their own retry strategy configured by write options.
+            "retries": Retry(
+                total=max_retries,
+                backoff_factor=retry_interval / 1000,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=None,  # Retry also POST requests.
+            ),
         }
+        self._batching = batching
+        self._batch_size = batch_size
+        self._write_options = WriteOptions(
+            batch_size=batch_size,
+            flush_interval=flush_interval,
+            max_retries=max_retries,
+            retry_interval=retry_interval,
+        ) if batching else SYNCHRONOUS
+
+    def __enter__(self) -> InfluxDBLoader:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def client(self) -> influxdb.InfluxDBClient:
+        """
+        Long-lived InfluxDB client, created on first use.
+        """
+        if self._client is None:
+            self._client = influxdb.InfluxDBClient(**self._client_kwargs)
+        return self._client
+
+    @property
+    def write_api(self) -> WriteApi:
+        """
+        Long-lived write API, synchronous or batching according to the loader options.
+        """
+        if self._write_api is None:
+            self._write_api = self.client.write_api(write_options=self._write_options)
+        return self._write_api
+
+    def flush(self) -> None:
+        """
+        Write all pending points of the batching write API.
+        :return: None
+        """
+        if self._write_api is not None:
+            self._write_api.flush()
+
+    def close(self) -> None:
+        """
+        Flush pending points and close the client.
+        :return: None
+        """
+        if self._write_api is not None:
+            self._write_api.close()
+            self._write_api = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
     def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
-        df = df.set_index("_time")
-        df["file_name"] = file_name
-
-        with (
-            influxdb.InfluxDBClient(**self._client_kwargs) as _client,
-            _client.write_api() as write_client,
-        ):
-            # noinspection PyTypeChecker
-            write_client.write(
-                bucket=self._bucket,
-                record=df,
-                data_frame_measurement_name=self._xco2_measurement_name,
-                data_frame_tag_columns=["file_name"],
-            )
+        payloads = encode_line_protocol(
+            df,
+            self._xco2_measurement_name,
+            time_column="_time",
+            tags={"file_name": file_name},
+            chunk_size=self._batch_size,
+        )
+        for payload in payloads:
+            # Batching write API batches by points, so it gets lines, synchronous one gets whole payloads.
+            record = payload.split(b"\n") if self._batching else payload
+            self.write_api.write(bucket=self._bucket, record=record, write_precision=WritePrecision.NS)
 
     def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
-        with influxdb.InfluxDBClient(**self._client_kwargs, timeout=30_000) as _client:
-            _dt_format = "%Y-%m-%dT%H:%M:%S.%fZ"
-            query = f"""\
+        query = f"""\
 from(bucket: "{self._bucket}")
 |> filter(fn: (r) => r.file_name == "{file_name}")
 |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
 |> keep(columns:["_time", "latitude", "longitude", "xco2"])"""
 
-            df = _client.query_api().query_data_frame(query)
-            if df.empty:
-                return pd.DataFrame(columns=["_time", "latitude", "longitude", "xco2"])
+        df = self.client.query_api().query_data_frame(query)
+        if df.empty:
+            return pd.DataFrame(columns=["_time", "latitude", "longitude", "xco2"])
 
-            df = df.drop(columns=["table", "result"])
-            return df
+        df = df.drop(columns=["table", "result"])
+        return df
 
     def retrieve_dataframe_for_date_range(
             self,
@@ -73,17 +176,215 @@ from(bucket: "{self._bucket}")
             dt_from: pd.Timestamp,
             dt_to: pd.Timestamp
     ) -> pd.DataFrame:
-        with influxdb.InfluxDBClient(**self._client_kwargs) as _client:
-            _dt_format = "%Y-%m-%dT%H:%M:%S.%fZ"
-            query = f"""\
+        query = f"""\
 from(bucket: "{self._bucket}")
-|> range(start: {dt_from.strftime(_dt_format)}, stop: {dt_to.strftime(_dt_format)})
+|> range(start: {dt_from.strftime(self._dt_format)}, stop: {dt_to.strftime(self._dt_format)})
 |> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
 |> keep(columns:["_time", "latitude", "longitude", "xco2"])"""
 
-            df = _client.query_api().query_data_frame(query)
-            if df.empty:
-                return pd.DataFrame(columns=["_time", "latitude", "longitude", "xco2"])
+        df = self.client.query_api().query_data_frame(query)
+        if df.empty:
+            return pd.DataFrame(columns=["_time", "latitude", "longitude", "xco2"])
+
+        df = df.drop(columns=["table", "result"])
+        return df
+
+    def iter_dataframe_for_date_range(
+            self,
+            *,
+            dt_from: pd.Timestamp,
+            dt_to: pd.Timestamp,
+            chunk_size: int = 50_000,
+            window: pd.Timedelta = pd.Timedelta(days=1),
+            max_workers: int = 4,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream soundings for the date range in dataframe chunks of at most `chunk_size` rows.
+        The range is split into time windows queried in parallel. Chunks are yielded in window order
+        and at most `max_workers` windows are buffered, so memory usage does not grow with the range.
+        :param dt_from:
+        :param dt_to:
+        :param chunk_size: Maximum number of rows per chunk.
+        :param window: Length of time windows queried separately.
+        :param max_workers: Number of windows queried in parallel.
+        :return: Iterator of dataframes with `_time`, `latitude`, `longitude` and `xco2` columns.
+        """
+        windows = iter(self._split_date_range(dt_from, dt_to, window))
+        stop = threading.Event()
+        pending: collections.deque[tuple[queue.Queue, concurrent.futures.Future]] = collections.deque()
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            def submit_next_window() -> None:
+                _window = next(windows, None)
+                if _window is not None:
+                    _queue = queue.Queue(maxsize=2)
+                    pending.append((_queue, executor.submit(self._stream_window, *_window, chunk_size, _queue, stop)))
+
+            for _ in range(max_workers):
+                submit_next_window()
+
+            try:
+                while pending:
+                    _queue, _future = pending.popleft()
+                    while (item := _queue.get()) is not _END_OF_WINDOW:
+                        yield item
+                    _future.result()  # Propagate query errors.
+                    submit_next_window()
+            finally:
+                stop.set()  # Unblock workers if the consumer stopped early.
+
+    def _stream_window(
+            self,
+            dt_from: pd.Timestamp,
+            dt_to: pd.Timestamp,
+            chunk_size: int,
+            chunk_queue: queue.Queue,
+            stop: threading.Event,
+    ) -> None:
+        columns = ["_time", "latitude", "longitude", "xco2"]
+        query = f"""\
+{self._range_query(dt_from, dt_to)}
+|> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+|> keep(columns:["_time", "latitude", "longitude", "xco2"])
+|> group()"""
+
+        def put(item: object) -> bool:
+            while not stop.is_set():
+                try:
+                    chunk_queue.put(item, timeout=0.1)
+                except queue.Full:
+                    continue
+                return True
+            return False
+
+        try:
+            records = self.client.query_api().query_stream(query)
+            try:
+                rows = []
+                for record in records:
+                    rows.append(tuple(record.values.get(_c) for _c in columns))
+                    if len(rows) >= chunk_size:
+                        if not put(pd.DataFrame.from_records(rows, columns=columns)):
+                            return
+                        rows = []
+                if rows:
+                    put(pd.DataFrame.from_records(rows, columns=columns))
+            finally:
+                records.close()
+        finally:
+            put(_END_OF_WINDOW)
+
+    @staticmethod
+    def _split_date_range(
+            dt_from: pd.Timestamp,
+            dt_to: pd.Timestamp,
+            window: pd.Timedelta,
+    ) -> Iterator[tuple[pd.Timestamp, pd.Timestamp]]:
+        """
+        Split half-open date range into consecutive windows of given length, the last one may be shorter.
+        """
+        _from = dt_from
+        while _from < dt_to:
+            _to = min(_from + window, dt_to)
+            yield _from, _to
+            _from = _to
+
+    def retrieve_daily_mean(
+            self,
+            *,
+            dt_from: pd.Timestamp,
+            dt_to: pd.Timestamp,
+            bbox: BoundingBox | None = None,
+    ) -> pd.DataFrame:
+        """
+        Retrieve daily mean XCO2, aggregated by the InfluxDB server.
+        :param dt_from:
+        :param dt_to:
+        :param bbox: Only soundings inside the bounding box are aggregated, all if None.
+        :return: Dataframe with `_time` (start of the day) and `xco2` columns.
+        """
+        if bbox is None:
+            # Without spatial filter the coordinates are not needed, so the expensive pivot is skipped.
+            query = f"""\
+{self._range_query(dt_from, dt_to)}
+|> filter(fn: (r) => r._field == "xco2")
+|> group()
+|> aggregateWindow(every: 1d, fn: mean, timeSrc: "_start", createEmpty: false)
+|> rename(columns: {{_value: "xco2"}})
+|> keep(columns: ["_time", "xco2"])"""
+        else:
+            query = f"""\
+{self._range_query(dt_from, dt_to)}
+|> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+{self._bbox_filter(bbox)}
+|> keep(columns: ["_start", "_stop", "_time", "xco2"])
+|> group()
+|> aggregateWindow(every: 1d, fn: mean, column: "xco2", timeSrc: "_start", createEmpty: false)
+|> keep(columns: ["_time", "xco2"])"""
+
+        df = self.client.query_api().query_data_frame(query)
+        if df.empty:
+            return pd.DataFrame(columns=["_time", "xco2"])
+
+        return df[["_time", "xco2"]].reset_index(drop=True)
+
+    def retrieve_monthly_mean_per_cell(
+            self,
+            *,
+            dt_from: pd.Timestamp,
+            dt_to: pd.Timestamp,
+            cell_size: float = 1.0,
+            bbox: BoundingBox | None = None,
+    ) -> pd.DataFrame:
+        """
+        Retrieve monthly mean XCO2 per lat/lon grid cell, aggregated by the InfluxDB server.
+        Coordinates are rounded to the nearest multiple of `cell_size`, halves to even as in
+        `data.analyse.monthly_avg_per_lat_lon`.
+        :param dt_from:
+        :param dt_to:
+        :param cell_size: Grid cell size in degrees.
+        :param bbox: Only soundings inside the bounding box are aggregated, all if None.
+        :return: Dataframe with `year`, `month`, `latitude`, `longitude` and `xco2` columns.
+        """
+        bbox_filter = self._bbox_filter(bbox) if bbox is not None else ""
+        query = f"""\
+import "math"
+
+{self._range_query(dt_from, dt_to)}
+|> pivot(rowKey:["_time"], columnKey: ["_field"], valueColumn: "_value")
+{bbox_filter}
+|> map(fn: (r) => ({{
+    _start: r._start,
+    _stop: r._stop,
+    _time: r._time,
+    xco2: r.xco2,
+    latitude: math.roundtoeven(x: r.latitude / {cell_size:f}) * {cell_size:f},
+    longitude: math.roundtoeven(x: r.longitude / {cell_size:f}) * {cell_size:f}
+}}))
+|> group(columns: ["latitude", "longitude"])
+|> aggregateWindow(every: 1mo, fn: mean, column: "xco2", timeSrc: "_start", createEmpty: false)
+|> group()
+|> keep(columns: ["_time", "latitude", "longitude", "xco2"])"""
+
+        df = self.client.query_api().query_data_frame(query)
+        if df.empty:
+            return pd.DataFrame(columns=["year", "month", "latitude", "longitude", "xco2"])
+
+        _time = pd.to_datetime(df["_time"], utc=True)
+        df = df.assign(year=_time.dt.year, month=_time.dt.month)
+        return df[["year", "month", "latitude", "longitude", "xco2"]] \
+            .sort_values(["year", "month", "latitude", "longitude"], ignore_index=True)
+
+    def _range_query(self, dt_from: pd.Timestamp, dt_to: pd.Timestamp) -> str:
+        return f"""\
+from(bucket: "{self._bucket}")
+|> range(start: {dt_from.strftime(self._dt_format)}, stop: {dt_to.strftime(self._dt_format)})
+|> filter(fn: (r) => r._measurement == "{self._xco2_measurement_name}")"""
 
-            df = df.drop(columns=["table", "result"])
-            return df
+    @staticmethod
+    def _bbox_filter(bbox: BoundingBox) -> str:
+        return (
+            f"|> filter(fn: (r) => "
+            f"r.latitude >= {bbox.lat_min:f} and r.latitude <= {bbox.lat_max:f} and "
+            f"r.longitude >= {bbox.lon_min:f} and r.longitude <= {bbox.lon_max:f})"
+        )
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import os
+from typing import Literal
+
+import pandas as pd
+import pyarrow as pa
+
+from data.loaders.base_loader import BaseLoader
+
+
+class LocalArrowLoader(BaseLoader):
+    """
+    Local Arrow IPC (Feather v2) loader class.
+    Files are read through a memory map, so uncompressed files are not copied to the process heap
+    and several processes reading the same file share the OS page cache.
+    """
+    _compression: Literal["lz4", "zstd"] | None
+
+    def __init__(self, compression: Literal["lz4", "zstd"] | None = None) -> None:
+        """
+        Constructor.
+        :param compression: Buffer compression, None for zero-copy reads.
+            Compressed buffers have to be decompressed into the process memory on each read.
+        """
+        self._compression = compression
+
+    def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        options = pa.ipc.IpcWriteOptions(compression=self._compression)
+
+        # Replace atomically, readers may still have the previous file mapped.
+        tmp_file_name = f"{file_name}.{os.getpid()}.tmp"
+        try:
+            with pa.OSFile(tmp_file_name, "wb") as sink, pa.ipc.new_file(sink, table.schema, options=options) as writer:
+                writer.write_table(table)
+            os.replace(tmp_file_name, file_name)
+        finally:
+            if os.path.exists(tmp_file_name):
+                os.unlink(tmp_file_name)
+
+    def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
+        """
+        Retrieve dataframe from memory mapped file.
+        Columns of uncompressed files may be read-only views of the mapped file, replace them instead
+        of modifying them in place.
+        :param file_name:
+        :return: Dataframe
+        """
+        with pa.memory_map(file_name, "r") as source:
+            table = pa.ipc.open_file(source).read_all()
+
+        # Split blocks to avoid consolidating columns into new (copied) 2D blocks.
+        return table.to_pandas(split_blocks=True)
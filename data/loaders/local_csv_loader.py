@@ -1,41 +1,53 @@
 from __future__ import annotations
 
 import io
-from typing import IO
+from typing import TYPE_CHECKING
 
 import pandas as pd
 
 from data.loaders.base_loader import BaseLoader
 
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
 
 class LocalCSVLoader(BaseLoader):
     """
     Local CSV loader class.
+    In memory mode keeps CSV content of every file name separately instead of writing files.
     """
     _in_memory: bool
-    _buf: IO[str] | None = None
+    _files: dict[str, str]
 
     def __init__(self, in_memory: bool = False) -> None:
         self._in_memory = in_memory
-        if in_memory:
-            self._buf = io.StringIO()
+        self._files = {}
 
     def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
         if self._in_memory:
-            if self._buf is None:
-                raise ValueError("Buffer is not initialized")
-
-            df.to_csv(self._buf, index=False)
+            self._files[file_name] = df.to_csv(index=False)
             return
 
         df.to_csv(file_name, index=False)
 
     def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
-        if self._in_memory:
-            if self._buf is None:
-                raise ValueError("Buffer is not initialized")
-
-            self._buf.seek(0)
-            return pd.read_csv(self._buf, parse_dates=["_time"])
-
-        return pd.read_csv(file_name, parse_dates=["_time"])
+        return pd.read_csv(self._source(file_name), parse_dates=["_time"])
+
+    def iter_dataframe(self, file_name: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        """
+        Retrieve dataframe in chunks, without parsing the whole file at once.
+        :param file_name:
+        :param chunksize: Number of rows per chunk.
+        :return: Iterator of dataframes with continuous index.
+        """
+        with pd.read_csv(self._source(file_name), parse_dates=["_time"], chunksize=chunksize) as reader:
+            yield from reader
+
+    def _source(self, file_name: str) -> str | io.StringIO:
+        if not self._in_memory:
+            return file_name
+
+        try:
+            return io.StringIO(self._files[file_name])
+        except KeyError:
+            raise FileNotFoundError(f"No such file in memory: '{file_name}'") from None
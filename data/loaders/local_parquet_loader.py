@@ -1,17 +1,53 @@
 from __future__ import annotations
 
-import pandas as pd
+import os
+from typing import TYPE_CHECKING
 
 from data.loaders.base_loader import BaseLoader
+from data.utils.parquet import ParquetOptions, read_parquet, read_parquet_bbox, write_parquet
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from data.utils.geo import BoundingBox
 
 
 class LocalParquetLoader(BaseLoader):
     """
     Local Parquet loader class.
     """
+    _options: ParquetOptions
+    _spatial_sort: bool
+
+    def __init__(self, options: ParquetOptions | None = None, spatial_sort: bool = False) -> None:
+        """
+        Constructor.
+        :param options: Engine and encoding options, fastparquet with gzip if None.
+        :param spatial_sort: Sort rows spatially before saving, see `data.utils.parquet.write_parquet`.
+        """
+        self._options = options or ParquetOptions()
+        self._spatial_sort = spatial_sort
 
     def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
-        df.to_parquet(file_name, engine="fastparquet", compression="gzip", index=False)
+        if os.path.dirname(file_name):
+            os.makedirs(os.path.dirname(file_name), exist_ok=True)
+        write_parquet(df, file_name, self._options, spatial_sort=self._spatial_sort)
 
     def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
-        return pd.read_parquet(file_name, engine="fastparquet")
+        return read_parquet(file_name, self._options)
+
+    def get_version(self, file_name: str) -> str | None:
+        try:
+            stat = os.stat(file_name)
+        except FileNotFoundError:
+            return None
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def retrieve_dataframe_for_bbox(self, file_name: str, bbox: BoundingBox) -> pd.DataFrame:
+        """
+        Retrieve only rows inside the bounding box, skipping row groups outside of it.
+        :param file_name:
+        :param bbox:
+        :return: Dataframe
+        """
+        return read_parquet_bbox(file_name, bbox)
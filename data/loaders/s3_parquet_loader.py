@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 import contextlib
+import hashlib
+import logging
 import os
 import tempfile
-from typing import TYPE_CHECKING, IO
+from typing import TYPE_CHECKING, IO, TypedDict
 
 import pandas as pd
 
 from data.loaders.base_loader import BaseLoader
 from data.services.aws_s3 import S3Service
+from data.utils.parquet import ParquetOptions, read_parquet, read_parquet_bbox, write_parquet
+from data.utils.remote_parquet import read_parquet_remote
 
 if TYPE_CHECKING:
+    from collections.abc import Collection, Sequence
+
     from data.settings import Settings
+    from data.utils.geo import BoundingBox
+
+
+logger = logging.getLogger(__name__)
+
+
+class S3ParquetLoaderStats(TypedDict):
+    uploads: int
+    skipped_uploads: int
 
 
 class S3ParquetLoader(BaseLoader):
@@ -19,17 +34,52 @@ class S3ParquetLoader(BaseLoader):
     S3 Parquet loader class.
     """
     _s3_service: S3Service
+    _options: ParquetOptions
+    _spatial_sort: bool
+    _skip_unchanged: bool
+
+    uploads: int = 0
+    skipped_uploads: int = 0
 
-    def __init__(self, settings: Settings) -> None:
-        self._s3_service = S3Service(settings=settings)
+    # User metadata key of the content hash.
+    _checksum_key: str = "sha256"
+
+    def __init__(
+            self,
+            settings: Settings,
+            options: ParquetOptions | None = None,
+            spatial_sort: bool = False,
+            skip_unchanged: bool = True,
+            s3_service: S3Service | None = None,
+    ) -> None:
+        """
+        Constructor.
+        :param settings:
+        :param options: Engine and encoding options, fastparquet with gzip if None.
+        :param spatial_sort: Sort rows spatially before saving, see `data.utils.parquet.write_parquet`.
+        :param skip_unchanged: Do not upload objects whose content is identical to the stored object.
+        :param s3_service: Service to use instead of one created from settings.
+        """
+        self._s3_service = s3_service or S3Service(settings=settings)
+        self._options = options or ParquetOptions()
+        self._spatial_sort = spatial_sort
+        self._skip_unchanged = skip_unchanged
 
     def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
         # In memory IO buffer raises `ValueError: write on closed file`.
         with self.closed_named_temporary_file() as _f:
-            df.to_parquet(_f.name, engine="fastparquet", compression="gzip", index=False)
+            write_parquet(df, _f.name, self._options, spatial_sort=self._spatial_sort)
 
             with open(_f.name, "rb") as _f0:
-                self._s3_service.upload_file_obj(_f0, file_name)
+                sha256, md5 = self._digests(_f0)
+                if self._skip_unchanged and self._is_unchanged(file_name, sha256, md5):
+                    self.skipped_uploads += 1
+                    logger.info(f"Skipped upload of unchanged {file_name} ({self.skipped_uploads} skipped)")
+                    return
+
+                _f0.seek(0)
+                self._s3_service.upload_file_obj(_f0, file_name, metadata={self._checksum_key: sha256})
+                self.uploads += 1
 
     def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
         # In memory IO buffer raises `ValueError: read on closed file`.
@@ -37,7 +87,92 @@ class S3ParquetLoader(BaseLoader):
             with open(_f.name, "wb") as _f0:
                 self._s3_service.download_file_obj(_f0, file_name)
 
-            return pd.read_parquet(_f.name, engine="fastparquet")
+            return read_parquet(_f.name, self._options)
+
+    def get_version(self, file_name: str) -> str | None:
+        info = self._s3_service.get_object_info(file_name)
+        return info["etag"] if info is not None else None
+
+    def get_versions(self, file_names: Collection[str]) -> dict[str, str | None]:
+        """
+        ETags of many objects from one paginated listing of their common key prefix.
+        :param file_names:
+        :return: ETag of every file name, None for missing objects.
+        """
+        if not file_names:
+            return {}
+        etags = {
+            s3_object["key"]: s3_object["etag"]
+            for s3_object in self._s3_service.list_files_in_dir(os.path.commonprefix(list(file_names)))
+        }
+        return {file_name: etags.get(file_name) for file_name in file_names}
+
+    def retrieve_dataframe_for_bbox(self, file_name: str, bbox: BoundingBox) -> pd.DataFrame:
+        """
+        Retrieve only rows inside the bounding box, skipping row groups outside of it.
+        Without the local cache only the needed byte ranges are fetched, see `retrieve_dataframe_partial`.
+        :param file_name:
+        :param bbox:
+        :return: Dataframe
+        """
+        if self._s3_service.cache is None:
+            return self.retrieve_dataframe_partial(file_name, bbox=bbox)
+
+        with self.closed_named_temporary_file() as _f:
+            with open(_f.name, "wb") as _f0:
+                self._s3_service.download_file_obj(_f0, file_name)
+
+            return read_parquet_bbox(_f.name, bbox)
+
+    def retrieve_dataframe_partial(
+            self,
+            file_name: str,
+            columns: Sequence[str] | None = None,
+            bbox: BoundingBox | None = None,
+    ) -> pd.DataFrame:
+        """
+        Retrieve columns and rows using byte range requests, without downloading the whole object.
+        Only the footer and column chunks of row groups intersecting the bounding box are fetched.
+        :param file_name:
+        :param columns: Columns to retrieve, all if None.
+        :param bbox: Bounding box to retrieve rows from, all rows if None.
+        :return: Dataframe
+        """
+        info = self._s3_service.get_object_info(file_name)
+        if info is None:
+            raise FileNotFoundError(f"No such object: '{file_name}'")
+
+        return read_parquet_remote(
+            info["size"],
+            lambda start, end: self._s3_service.get_object_range(file_name, start, end, etag=info["etag"]),
+            columns=columns,
+            bbox=bbox,
+        )
+
+    def stats(self) -> S3ParquetLoaderStats:
+        """
+        Number of uploaded and skipped objects.
+        :return:
+        """
+        return {"uploads": self.uploads, "skipped_uploads": self.skipped_uploads}
+
+    def _is_unchanged(self, file_name: str, sha256: str, md5: str) -> bool:
+        info = self._s3_service.get_object_info(file_name)
+        if info is None:
+            return False
+        if self._checksum_key in info["metadata"]:
+            return info["metadata"][self._checksum_key] == sha256
+        # Objects uploaded without the checksum, ETag of single part uploads is MD5 of the content.
+        return info["etag"].strip('"') == md5
+
+    @staticmethod
+    def _digests(file_obj: IO[bytes]) -> tuple[str, str]:
+        sha256 = hashlib.sha256()
+        md5 = hashlib.md5()
+        while chunk := file_obj.read(1024 ** 2):
+            sha256.update(chunk)
+            md5.update(chunk)
+        return sha256.hexdigest(), md5.hexdigest()
 
     @contextlib.contextmanager
     def closed_named_temporary_file(self) -> IO[bytes]:
@@ -0,0 +1,182 @@
+from __future__ import annotations
+
+import datetime as dt
+import logging
+from typing import TYPE_CHECKING
+from urllib.parse import urlparse
+
+import duckdb
+import pandas as pd
+
+if TYPE_CHECKING:
+    from data.settings import Settings
+    from data.utils.geo import BoundingBox
+
+
+logger = logging.getLogger(__name__)
+
+
+def _sql_string(value: object) -> str:
+    """
+    SQL string literal of value, quotes are escaped by doubling.
+    """
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class QueryEngine:
+    """
+    Embedded analytical SQL engine over the parquet archive.
+    Daily sounding files are exposed as the `soundings` view with `_time`, `latitude`, `longitude`
+    and `xco2` columns. Queries run as parallel vectorized scans by DuckDB, only the result is
+    converted to a pandas dataframe.
+    """
+    _source: str
+    _connection: duckdb.DuckDBPyConnection
+
+    _daily_file_glob: str = "????-??-??.gzip"
+
+    def __init__(self, source: str, settings: Settings | None = None, threads: int | None = None) -> None:
+        """
+        Constructor.
+        :param source: Local directory or `s3://bucket[/prefix]` URL of the archive.
+        :param settings: Credentials for S3 sources.
+        :param threads: Number of DuckDB worker threads, all cores if None.
+        """
+        self._source = source.rstrip("/")
+        self._connection = duckdb.connect()
+        self._connection.execute("SET TimeZone = 'UTC'")
+        if threads is not None:
+            self._connection.execute(f"SET threads = {int(threads)}")
+
+        if self._source.startswith("s3://"):
+            self._configure_s3(settings)
+
+        self._connection.execute(f"""\
+CREATE VIEW soundings AS
+SELECT _time, latitude, longitude, xco2
+FROM read_parquet({_sql_string(f"{self._source}/{self._daily_file_glob}")})""")
+
+    @classmethod
+    def from_settings(cls, settings: Settings, threads: int | None = None) -> QueryEngine:
+        """
+        Query engine over the S3 bucket of the application.
+        :param settings:
+        :param threads:
+        :return:
+        """
+        return cls(f"s3://{settings.aws_s3_bucket_name}", settings=settings, threads=threads)
+
+    def __enter__(self) -> QueryEngine:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._connection.close()
+
+    def query(self, sql: str, params: list | dict | None = None) -> pd.DataFrame:
+        """
+        Run SQL query and return its result.
+        :param sql: Query, may reference the `soundings` view.
+        :param params: Prepared statement parameters.
+        :return: Dataframe
+        """
+        logger.debug("Running query %s", sql)
+        return self._connection.execute(sql, params).df()
+
+    def daily_avg(
+            self,
+            date_from: dt.date,
+            date_to: dt.date,
+            bbox: BoundingBox | None = None,
+    ) -> pd.DataFrame:
+        """
+        Daily average XCO2 for dates in the closed interval.
+        :param date_from:
+        :param date_to:
+        :param bbox: Only soundings inside the bounding box are averaged, all if None.
+        :return: Dataframe with `_date` and `xco2` columns.
+        """
+        sql = f"""\
+SELECT CAST(_time AS DATE) AS _date, avg(xco2) AS xco2
+FROM soundings
+WHERE {self._where(bbox)}
+GROUP BY _date
+ORDER BY _date"""
+        return self.query(sql, self._params(date_from, date_to, bbox))
+
+    def grid_mean(
+            self,
+            date_from: dt.date,
+            date_to: dt.date,
+            cell_size: float = 1.0,
+            bbox: BoundingBox | None = None,
+    ) -> pd.DataFrame:
+        """
+        Monthly mean XCO2 per lat/lon grid cell for dates in the closed interval.
+        Coordinates are rounded half to even to the nearest multiple of `cell_size`,
+        as in `data.analyse.monthly_avg_per_lat_lon`.
+        :param date_from:
+        :param date_to:
+        :param cell_size: Grid cell size in degrees.
+        :param bbox: Only soundings inside the bounding box are averaged, all if None.
+        :return: Dataframe with `year`, `month`, `latitude`, `longitude`, `xco2` and `count` columns.
+        """
+        sql = f"""\
+SELECT
+    year(_time) AS year,
+    month(_time) AS month,
+    round_even(latitude / $cell_size, 0) * $cell_size AS latitude,
+    round_even(longitude / $cell_size, 0) * $cell_size AS longitude,
+    avg(xco2) AS xco2,
+    count(*) AS count
+FROM soundings
+WHERE {self._where(bbox)}
+GROUP BY ALL
+ORDER BY ALL"""
+        return self.query(sql, {**self._params(date_from, date_to, bbox), "cell_size": cell_size})
+
+    @staticmethod
+    def _where(bbox: BoundingBox | None) -> str:
+        where = "_time >= $dt_from AND _time < $dt_to"
+        if bbox is not None:
+            where += (
+                " AND latitude BETWEEN $lat_min AND $lat_max"
+                " AND longitude BETWEEN $lon_min AND $lon_max"
+            )
+        return where
+
+    @staticmethod
+    def _params(date_from: dt.date, date_to: dt.date, bbox: BoundingBox | None) -> dict:
+        params = {
+            "dt_from": dt.datetime.combine(date_from, dt.time(), tzinfo=dt.timezone.utc),
+            "dt_to": dt.datetime.combine(date_to + dt.timedelta(days=1), dt.time(), tzinfo=dt.timezone.utc),
+        }
+        if bbox is not None:
+            params |= bbox._asdict()
+        return params
+
+    def _configure_s3(self, settings: Settings | None) -> None:
+        self._connection.execute("INSTALL httpfs")
+        self._connection.execute("LOAD httpfs")
+        if settings is None:
+            return
+
+        secret = {
+            "KEY_ID": settings.aws_access_key_id,
+            "SECRET": settings.aws_secret_access_key,
+            "REGION": settings.aws_region,
+        }
+        if settings.aws_s3_endpoint_url:
+            endpoint = urlparse(settings.aws_s3_endpoint_url)
+            secret |= {
+                "ENDPOINT": endpoint.netloc,
+                "USE_SSL": endpoint.scheme == "https",
+                "URL_STYLE": "path",
+            }
+
+        options = ", ".join(
+            f"{_k} {_v}" if isinstance(_v, bool) else f"{_k} {_sql_string(_v)}" for _k, _v in secret.items()
+        )
+        self._connection.execute(f"CREATE SECRET archive (TYPE S3, {options})")
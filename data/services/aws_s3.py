@@ -4,6 +4,9 @@ import datetime
 from typing import TYPE_CHECKING, IO, TypedDict
 
 import boto3
+from botocore.exceptions import ClientError
+
+from data.services.s3_cache import S3DiskCache
 
 if TYPE_CHECKING:
     from mypy_boto3_s3.client import S3Client  # Stubs for boto3.
@@ -14,6 +17,13 @@ if TYPE_CHECKING:
 class S3Object(TypedDict):
     key: str
     last_modified: datetime.datetime
+    etag: str
+
+
+class S3ObjectInfo(TypedDict):
+    etag: str
+    size: int
+    metadata: dict[str, str]
 
 
 class S3Service:
@@ -21,54 +31,149 @@ class S3Service:
     Service for interacting with AWS S3.
     """
     _client: S3Client
+    _settings: Settings
     _bucket_name: str
+    _cache: S3DiskCache | None = None
 
     def __init__(self, settings: Settings) -> None:
-        self.client = boto3.client(
+        self._settings = settings
+        self.client = self._create_client(settings)
+        self._bucket_name = settings.aws_s3_bucket_name
+        if settings.s3_cache_dir:
+            self._cache = S3DiskCache(settings.s3_cache_dir, max_size=settings.s3_cache_max_size)
+
+    def __getstate__(self) -> dict:
+        # Boto3 clients cannot be pickled, worker processes create their own.
+        state = self.__dict__.copy()
+        state.pop("client", None)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.client = self._create_client(self._settings)
+
+    @staticmethod
+    def _create_client(settings: Settings) -> S3Client:
+        return boto3.client(
             service_name="s3",
             aws_access_key_id=settings.aws_access_key_id,
             aws_secret_access_key=settings.aws_secret_access_key,
-            region_name=settings.aws_region
+            region_name=settings.aws_region,
+            endpoint_url=settings.aws_s3_endpoint_url or None,
         )
-        self._bucket_name = settings.aws_s3_bucket_name
 
-    def upload_file_obj(self, file_obj: IO, object_name: str, tag: str | None = None) -> None:
+    @property
+    def cache(self) -> S3DiskCache | None:
+        """
+        Local read-through cache of downloaded objects, None if disabled.
+        """
+        return self._cache
+
+    def upload_file_obj(
+            self,
+            file_obj: IO,
+            object_name: str,
+            tag: str | None = None,
+            metadata: dict[str, str] | None = None,
+    ) -> None:
         """
         Uploads file to S3 bucket.
         :param file_obj: File object to upload.
         :param object_name: Name of the object in S3 bucket.
         :param tag: Tag to add to the object.
+        :param metadata: User metadata to store with the object.
         :return: None.
         """
         extra_args = None
         if tag:
             extra_args = {"Tagging": tag}
+        if metadata:
+            extra_args = {**(extra_args or {}), "Metadata": metadata}
 
         self.client.upload_fileobj(file_obj, self._bucket_name, object_name, ExtraArgs=extra_args)
 
     def download_file_obj(self, file_obj: IO, object_name: str) -> None:
         """
         Downloads file from S3 bucket.
+        If the local cache is enabled, the object is served from it as long as its ETag is unchanged.
         :param file_obj: File object to download to.
         :param object_name: Name of the object in S3 bucket.
         :return: None.
         """
-        self.client.download_fileobj(self._bucket_name, object_name, file_obj)
+        if self._cache is None:
+            self.client.download_fileobj(self._bucket_name, object_name, file_obj)
+            return
+
+        etag = self.get_etag(object_name)
+        self._cache.read_through(
+            file_obj,
+            object_name,
+            etag,
+            # `IfMatch` guarantees the cached content belongs to the validated ETag.
+            lambda _f: self.client.download_fileobj(
+                self._bucket_name, object_name, _f, ExtraArgs={"IfMatch": etag}
+            ),
+        )
+
+    def get_object_range(self, object_name: str, start: int, end: int, etag: str | None = None) -> bytes:
+        """
+        Gets byte range of the object in S3 bucket.
+        :param object_name: Name of the object in S3 bucket.
+        :param start: First byte, inclusive.
+        :param end: Last byte, exclusive.
+        :param etag: Fail if the object changed, so ranges of one read belong to the same version.
+        :return: Content of the range.
+        """
+        kwargs = {"Range": f"bytes={start}-{end - 1}"}
+        if etag:
+            kwargs["IfMatch"] = etag
+        response = self.client.get_object(Bucket=self._bucket_name, Key=object_name, **kwargs)
+        return response["Body"].read()
+
+    def get_etag(self, object_name: str) -> str:
+        """
+        Gets ETag of the object in S3 bucket.
+        :param object_name: Name of the object in S3 bucket.
+        :return: ETag.
+        """
+        response = self.client.head_object(Bucket=self._bucket_name, Key=object_name)
+        return response["ETag"]
+
+    def get_object_info(self, object_name: str) -> S3ObjectInfo | None:
+        """
+        Gets ETag and user metadata of the object in S3 bucket.
+        :param object_name: Name of the object in S3 bucket.
+        :return: Object info, None if the object does not exist.
+        """
+        try:
+            response = self.client.head_object(Bucket=self._bucket_name, Key=object_name)
+        except ClientError as exc:
+            if exc.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return {"etag": response["ETag"], "size": response["ContentLength"], "metadata": response.get("Metadata", {})}
 
     def list_files_in_dir(self, dir_name: str) -> list[S3Object]:
         """
-        Lists files in directory in S3 bucket.
-        :param dir_name: Name of the directory.
+        Lists files in directory in S3 bucket, following all pages of the listing.
+        :param dir_name: Name of the directory, or any key prefix.
         :return: List of files in directory.
         """
-        response = self.client.list_objects_v2(Bucket=self._bucket_name, Prefix=dir_name)
-        return [
-            {
-                "key": content["Key"],
-                "last_modified": content["LastModified"]
-            }
-            for content in response["Contents"]
-        ]
+        files: list[S3Object] = []
+        kwargs = {"Bucket": self._bucket_name, "Prefix": dir_name}
+        while True:
+            response = self.client.list_objects_v2(**kwargs)
+            files.extend(
+                {
+                    "key": content["Key"],
+                    "last_modified": content["LastModified"],
+                    "etag": content["ETag"],
+                }
+                for content in response.get("Contents", [])
+            )
+            if not response.get("IsTruncated"):
+                return files
+            kwargs["ContinuationToken"] = response["NextContinuationToken"]
 
     def check_if_file_exists(self, object_name: str) -> bool:
         """
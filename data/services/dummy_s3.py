@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import collections
+import datetime
+import hashlib
+import io
+from typing import IO
+
+from botocore.exceptions import ClientError
+
+from data.services.aws_s3 import S3Service
+from data.services.s3_cache import S3DiskCache
+
+
+class DummyS3Client:
+    """
+    In-memory stand-in for the boto3 S3 client for testing purposes.
+    Implements only the subset of the client API used by `S3Service`.
+    """
+    _objects: dict[tuple[str, str], tuple[bytes, datetime.datetime, dict[str, str]]]
+    calls: collections.Counter[str]
+    range_bytes: int  # Bytes returned by `get_object`.
+    max_keys: int = 1000  # Page size of `list_objects_v2`.
+
+    def __init__(self) -> None:
+        self._objects = {}
+        self.calls = collections.Counter()
+        self.range_bytes = 0
+
+    def upload_fileobj(self, Fileobj: IO, Bucket: str, Key: str, ExtraArgs: dict | None = None) -> None:
+        self.calls["upload_fileobj"] += 1
+        metadata = {k.lower(): v for k, v in ((ExtraArgs or {}).get("Metadata") or {}).items()}
+        self._objects[(Bucket, Key)] = (Fileobj.read(), datetime.datetime.now(datetime.timezone.utc), metadata)
+
+    def download_fileobj(self, Bucket: str, Key: str, Fileobj: IO, ExtraArgs: dict | None = None) -> None:
+        self.calls["download_fileobj"] += 1
+        body = self._get(Bucket, Key)
+        if ExtraArgs and "IfMatch" in ExtraArgs and ExtraArgs["IfMatch"] != self._etag(body):
+            raise ClientError({"Error": {"Code": "412", "Message": "Precondition Failed"}}, "GetObject")
+        Fileobj.write(body)
+
+    def get_object(self, Bucket: str, Key: str, Range: str | None = None, IfMatch: str | None = None) -> dict:
+        self.calls["get_object"] += 1
+        body = self._get(Bucket, Key)
+        if IfMatch is not None and IfMatch != self._etag(body):
+            raise ClientError({"Error": {"Code": "412", "Message": "Precondition Failed"}}, "GetObject")
+
+        start, end = 0, len(body) - 1
+        if Range is not None:
+            _start, _end = Range.removeprefix("bytes=").split("-")
+            start, end = int(_start), min(int(_end), len(body) - 1)
+        self.range_bytes += end - start + 1
+        return {
+            "Body": io.BytesIO(body[start:end + 1]),
+            "ContentLength": end - start + 1,
+            "ContentRange": f"bytes {start}-{end}/{len(body)}",
+            "ETag": self._etag(body),
+        }
+
+    def head_object(self, Bucket: str, Key: str) -> dict:
+        self.calls["head_object"] += 1
+        body = self._get(Bucket, Key)
+        return {
+            "ETag": self._etag(body),
+            "ContentLength": len(body),
+            "LastModified": self._objects[(Bucket, Key)][1],
+            "Metadata": dict(self._objects[(Bucket, Key)][2]),
+        }
+
+    def list_objects_v2(self, Bucket: str, Prefix: str, ContinuationToken: str | None = None) -> dict:
+        self.calls["list_objects_v2"] += 1
+        contents = [
+            {"Key": _key, "LastModified": _last_modified, "ETag": self._etag(_body), "Size": len(_body)}
+            for (_bucket, _key), (_body, _last_modified, _metadata) in sorted(self._objects.items())
+            if _bucket == Bucket and _key.startswith(Prefix)
+        ]
+        start = int(ContinuationToken or 0)
+        response = {"IsTruncated": start + self.max_keys < len(contents), "KeyCount": 0}
+        page = contents[start:start + self.max_keys]
+        if page:  # Like S3, empty listings have no contents.
+            response["Contents"] = page
+            response["KeyCount"] = len(page)
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = str(start + self.max_keys)
+        return response
+
+    def _get(self, bucket: str, key: str) -> bytes:
+        try:
+            return self._objects[(bucket, key)][0]
+        except KeyError:
+            raise ClientError({"Error": {"Code": "404", "Message": "Not Found"}}, "HeadObject") from None
+
+    @staticmethod
+    def _etag(body: bytes) -> str:
+        return f'"{hashlib.md5(body).hexdigest()}"'
+
+
+class DummyS3Service(S3Service):
+    """
+    S3 service backed by `DummyS3Client` for testing purposes.
+    """
+    client: DummyS3Client
+
+    # noinspection PyMissingConstructor
+    def __init__(self, cache: S3DiskCache | None = None) -> None:
+        self.client = DummyS3Client()
+        self._bucket_name = "dummy-bucket"
+        self._cache = cache
+
+    def __getstate__(self) -> dict:
+        return self.__dict__.copy()
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)  # In-memory client is copied, there are no settings to recreate it from.
+
+    def put_object(self, object_name: str, body: bytes) -> None:
+        """
+        Store object directly, bypassing call counters.
+        """
+        self.client.upload_fileobj(io.BytesIO(body), self._bucket_name, object_name)
+        self.client.calls["upload_fileobj"] -= 1
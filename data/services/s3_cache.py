@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import TYPE_CHECKING, IO, TypedDict
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+
+logger = logging.getLogger(__name__)
+
+
+class S3DiskCacheStats(TypedDict):
+    hits: int
+    misses: int
+    size: int
+
+
+class S3DiskCache:
+    """
+    Size-bounded read-through disk cache of S3 objects.
+    Entries are keyed by object name and ETag, so a changed object is never served from the cache.
+    Least recently used entries are evicted when the cache exceeds its maximum size.
+    The cache directory can be shared by several processes: entries are published by atomic rename
+    and eviction runs under an exclusive file lock.
+    """
+    _directory: str
+    _max_size: int
+
+    _entry_suffix: str = ".obj"
+    _tmp_suffix: str = ".tmp"
+    _tmp_max_age: int = 3600  # Seconds, leftovers of crashed downloads.
+
+    hits: int
+    misses: int
+
+    def __init__(self, directory: str, max_size: int) -> None:
+        """
+        Constructor.
+        :param directory: Cache directory, created if it does not exist.
+        :param max_size: Maximum total size of cached objects in bytes.
+        """
+        self._directory = directory
+        self._max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def read_through(
+            self,
+            file_obj: IO,
+            object_name: str,
+            etag: str,
+            download: Callable[[IO], None],
+    ) -> None:
+        """
+        Write cached object to `file_obj`, download and cache it first on cache miss.
+        :param file_obj: File object to write to.
+        :param object_name: Name of the object in S3 bucket.
+        :param etag: Current ETag of the object.
+        :param download: Function downloading the object into given file object.
+        :return: None.
+        """
+        path = self._entry_path(object_name, etag)
+        try:
+            with open(path, "rb") as _f:
+                with contextlib.suppress(FileNotFoundError):
+                    os.utime(path)  # Mark as recently used.
+                shutil.copyfileobj(_f, file_obj)
+        except FileNotFoundError:
+            pass
+        else:
+            self.hits += 1
+            logger.debug("S3 cache hit %s", object_name)
+            return
+
+        self.misses += 1
+        logger.debug("S3 cache miss %s", object_name)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, suffix=self._tmp_suffix)
+        try:
+            with os.fdopen(fd, "wb") as _f:
+                download(_f)
+
+            with open(tmp_path, "rb") as _f:
+                shutil.copyfileobj(_f, file_obj)
+
+            if os.path.getsize(tmp_path) <= self._max_size:
+                with self._lock():
+                    self._remove_stale_entries(object_name)
+                    os.replace(tmp_path, path)
+                    self._evict()
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+
+    def stats(self) -> S3DiskCacheStats:
+        """
+        Hit and miss counters of this cache instance and the total size of the cache directory.
+        :return:
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": sum(_size for _, _, _size in self._entries()),
+        }
+
+    def clear(self) -> None:
+        """
+        Remove all cached objects.
+        :return: None.
+        """
+        with self._lock():
+            for path, _, _ in self._entries():
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+
+    def _entry_path(self, object_name: str, etag: str) -> str:
+        return os.path.join(
+            self._directory,
+            f"{self._key_prefix(object_name)}.{hashlib.sha256(etag.encode()).hexdigest()[:16]}{self._entry_suffix}",
+        )
+
+    @staticmethod
+    def _key_prefix(object_name: str) -> str:
+        return hashlib.sha256(object_name.encode()).hexdigest()
+
+    def _entries(self) -> Iterator[tuple[str, float, int]]:
+        """
+        Yield path, last access time and size of each cached object.
+        """
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self._entry_suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Evicted by other process.
+                yield entry.path, stat.st_mtime, stat.st_size
+
+    def _remove_stale_entries(self, object_name: str) -> None:
+        prefix = f"{self._key_prefix(object_name)}."
+        for path, _, _ in self._entries():
+            if os.path.basename(path).startswith(prefix):
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(path)
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits its maximum size. Must hold the lock.
+        """
+        entries = sorted(self._entries(), key=lambda _e: _e[1])
+        total_size = sum(_size for _, _, _size in entries)
+        for path, _, size in entries:
+            if total_size <= self._max_size:
+                break
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(path)
+            total_size -= size
+            logger.debug("S3 cache evicted %s", path)
+
+        tmp_deadline = time.time() - self._tmp_max_age
+        with os.scandir(self._directory) as it:
+            for entry in it:
+                if entry.name.endswith(self._tmp_suffix):
+                    with contextlib.suppress(FileNotFoundError):
+                        if entry.stat().st_mtime < tmp_deadline:
+                            os.unlink(entry.path)
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        with open(os.path.join(self._directory, ".lock"), "a") as _f:
+            fcntl.flock(_f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(_f, fcntl.LOCK_UN)
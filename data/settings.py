@@ -34,3 +34,8 @@ class Settings(BaseSettings):
     aws_secret_access_key: str
     aws_region: str
     aws_s3_bucket_name: str
+    aws_s3_endpoint_url: str | None = None  # S3-compatible storage, AWS if None.
+
+    # S3 CACHE
+    s3_cache_dir: str | None = None  # Local read-through cache of S3 objects, disabled if None.
+    s3_cache_max_size: int = 2 * 1024 ** 3  # Bytes.
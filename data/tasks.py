@@ -27,6 +27,21 @@ def daily_etl_task(extractor_class: str, days_before_today: int) -> None:
     pipeline.invoke([_date])
 
 
+@app.task(name="monthly_compaction_task")
+def monthly_compaction_task() -> list[str]:
+    """
+    Compact closed months of daily files into monthly files.
+    Months which are already compacted are skipped, so the task can run daily.
+    :return: List of compacted months in format YYYY-MM.
+    """
+    from data.analyse import GLOBAL_DATE_START
+    from data.etl.utils import archive_factory
+
+    compacted = archive_factory().compact_closed_months(GLOBAL_DATE_START)
+    logger.info("Compacted months %s", compacted)
+    return compacted
+
+
 @app.task(name="debug_task")
 def debug_task() -> int:
     """
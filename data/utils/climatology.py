@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from data.utils.gridding import GridAggregator
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+
+class ClimatologyStore:
+    """
+    Per-cell climatology of monthly grids, one set of statistics per calendar month.
+    Every folded month adds one sample per cell, its monthly mean, merged into running count, mean and
+    sum of squared deviations by Chan's formulas (Welford's update for one sample). Folding a month
+    costs time proportional to the grid, not to the number of years already folded, and stores merge,
+    e.g. when folded in parallel. Folded months are recorded, so folding a month again has no effect.
+    """
+    _cell_size: float
+    _value_columns: list[str]
+    _grids: dict[int, GridAggregator]  # Calendar month to statistics of its cells over years.
+    _folded: set[tuple[int, int]]
+
+    def __init__(self, value_columns: Sequence[str] = ("xco2",), cell_size: float = 1.0) -> None:
+        """
+        Constructor.
+        :param value_columns: Columns of monthly grids to keep statistics of.
+        :param cell_size: Cell size of monthly grids in degrees.
+        """
+        self._cell_size = cell_size
+        self._value_columns = list(value_columns)
+        self._grids = {}
+        self._folded = set()
+
+    @property
+    def folded(self) -> list[tuple[int, int]]:
+        """
+        Sorted year and month of folded months.
+        """
+        return sorted(self._folded)
+
+    def fold(self, year: int, month: int, df: pd.DataFrame) -> bool:
+        """
+        Add monthly grid as one sample per cell.
+        :param year:
+        :param month:
+        :param df: Dataframe with `latitude`, `longitude` and value columns of the month.
+        :return: False if the month is already folded.
+        """
+        if (year, month) in self._folded:
+            return False
+
+        grid = GridAggregator(self._value_columns, self._cell_size).update(df)
+        if month in self._grids:
+            self._grids[month].merge(grid)
+        else:
+            self._grids[month] = grid
+        self._folded.add((year, month))
+        return True
+
+    def fold_grids(self, df: pd.DataFrame, months: Iterable[tuple[int, int]] | None = None) -> list[tuple[int, int]]:
+        """
+        Fold months of grid with `year` and `month` columns, e.g. `monthly_avg_per_lat_lon`.
+        :param df:
+        :param months: Only these months, all if None.
+        :return: Newly folded months.
+        """
+        months = set(months) if months is not None else None
+        folded = []
+        for (year, month), month_df in df.groupby(["year", "month"], sort=True):
+            if months is not None and (year, month) not in months:
+                continue
+            if self.fold(int(year), int(month), month_df):
+                folded.append((int(year), int(month)))
+        return folded
+
+    def merge(self, other: ClimatologyStore) -> ClimatologyStore:
+        """
+        Add statistics of another store, which must not have folded the same months.
+        :param other:
+        :return: self
+        """
+        if self._folded & other._folded:
+            raise ValueError("Stores with common folded months cannot be merged")
+
+        for month, grid in other._grids.items():
+            if month in self._grids:
+                self._grids[month].merge(grid)
+            else:
+                self._grids[month] = grid
+        self._folded |= other._folded
+        return self
+
+    def statistics(self) -> pd.DataFrame:
+        """
+        Climatology per calendar month and cell.
+        :return: Dataframe with `month`, `latitude`, `longitude`, `<column>_climatology`, `<column>_std`
+            (NaN with fewer than two years) of each value column and `years`, the number of folded months.
+        """
+        dfs = []
+        for month in sorted(self._grids):
+            df = self._grids[month].to_dataframe(statistics=("mean", "std"))
+            df = df.rename(columns={column: f"{column}_climatology" for column in self._value_columns})
+            df = df.rename(columns={"count": "years"})
+            df.insert(0, "month", np.int32(month))
+            dfs.append(df)
+
+        if not dfs:
+            return pd.DataFrame(columns=[
+                "month", "latitude", "longitude",
+                *(f"{column}_{name}" for column in self._value_columns for name in ("climatology", "std")),
+                "years",
+            ])
+        return pd.concat(dfs, ignore_index=True)
+
+    def anomalies(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Anomalies of monthly grids against the climatology of their calendar month.
+        :param df: Dataframe with `year`, `month`, `latitude`, `longitude` and value columns.
+        :return: `df` with climatology statistics, `<column>_anomaly` and `<column>_zscore` of each value column.
+            Cells without climatology get NaN.
+        """
+        statistics = self.statistics()
+        statistics["month"] = statistics["month"].astype(df["month"].dtype)
+        df = df.merge(statistics, on=["month", "latitude", "longitude"], how="left")
+        for column in self._value_columns:
+            df[f"{column}_anomaly"] = df[column] - df[f"{column}_climatology"]
+            df[f"{column}_zscore"] = df[f"{column}_anomaly"] / df[f"{column}_std"]
+        return df
+
+    def to_dataframes(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        State of the store, see `from_dataframes`.
+        :return: Statistics state per calendar month and cell, and folded months.
+        """
+        dfs = []
+        for month in sorted(self._grids):
+            df = self._grids[month].to_state_frame()
+            df.insert(0, "month", np.int32(month))
+            dfs.append(df)
+
+        if dfs:
+            state_df = pd.concat(dfs, ignore_index=True)
+        else:
+            empty = GridAggregator(self._value_columns, self._cell_size).to_state_frame()
+            state_df = pd.concat([pd.DataFrame({"month": pd.Series(dtype=np.int32)}), empty], axis=1)
+
+        folded = self.folded
+        folded_df = pd.DataFrame({
+            "year": np.array([year for year, _ in folded], dtype=np.int32),
+            "month": np.array([month for _, month in folded], dtype=np.int32),
+        })
+        return state_df, folded_df
+
+    @classmethod
+    def from_dataframes(
+            cls,
+            state_df: pd.DataFrame,
+            folded_df: pd.DataFrame,
+            value_columns: Sequence[str] = ("xco2",),
+            cell_size: float = 1.0,
+    ) -> ClimatologyStore:
+        """
+        Restore store saved by `to_dataframes`.
+        :param state_df:
+        :param folded_df:
+        :param value_columns:
+        :param cell_size:
+        :return:
+        """
+        store = cls(value_columns, cell_size)
+        for month, month_df in state_df.groupby("month"):
+            store._grids[int(month)] = GridAggregator.from_state_frame(month_df, value_columns, cell_size)
+        store._folded = {(int(year), int(month)) for year, month in zip(folded_df["year"], folded_df["month"])}
+        return store
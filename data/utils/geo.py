@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+class BoundingBox(NamedTuple):
+    """
+    Latitude/longitude bounding box with inclusive bounds in degrees.
+    """
+    lat_min: float
+    lat_max: float
+    lon_min: float
+    lon_max: float
+
+    def mask(self, latitude: np.ndarray | pd.Series, longitude: np.ndarray | pd.Series) -> np.ndarray:
+        """
+        Boolean mask of coordinates inside the bounding box.
+        :param latitude:
+        :param longitude:
+        :return:
+        """
+        latitude = np.asarray(latitude)
+        longitude = np.asarray(longitude)
+        return (
+            (latitude >= self.lat_min) & (latitude <= self.lat_max) &
+            (longitude >= self.lon_min) & (longitude <= self.lon_max)
+        )
+
+    def to_parquet_filters(self) -> list[tuple[str, str, float]]:
+        """
+        Row group filters usable by `fastparquet.ParquetFile.to_pandas`.
+        :return:
+        """
+        return [
+            ("latitude", ">=", self.lat_min),
+            ("latitude", "<=", self.lat_max),
+            ("longitude", ">=", self.lon_min),
+            ("longitude", "<=", self.lon_max),
+        ]
+
+
+class Polygon(NamedTuple):
+    """
+    Latitude/longitude polygon in degrees, the last vertex is connected to the first one.
+    Edges are straight lines in the lat/lon plane, polygons must not cross the antimeridian.
+    """
+    vertices: tuple[tuple[float, float], ...]  # (latitude, longitude) pairs.
+
+    def mask(self, latitude: np.ndarray | pd.Series, longitude: np.ndarray | pd.Series) -> np.ndarray:
+        """
+        Boolean mask of coordinates inside the polygon (even-odd rule).
+        :param latitude:
+        :param longitude:
+        :return:
+        """
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        inside = np.zeros(latitude.shape, dtype=bool)
+
+        vertices = np.asarray(self.vertices, dtype=np.float64)
+        for (lat0, lon0), (lat1, lon1) in zip(vertices, np.roll(vertices, -1, axis=0)):
+            # Edges crossing the parallel of the point, left of the point toggle it.
+            crosses = (lat0 > latitude) != (lat1 > latitude)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                lon_cross = lon0 + (latitude - lat0) * (lon1 - lon0) / (lat1 - lat0)
+            inside ^= crosses & (longitude < lon_cross)
+        return inside
+
+    def bounds(self) -> BoundingBox:
+        """
+        Smallest bounding box containing the polygon.
+        :return:
+        """
+        latitude, longitude = zip(*self.vertices)
+        return BoundingBox(min(latitude), max(latitude), min(longitude), max(longitude))
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    """
+    Insert a zero bit between each of the lower 16 bits of `v`.
+    """
+    v = v.astype(np.uint32) & 0x0000FFFF
+    v = (v | (v << 8)) & 0x00FF00FF
+    v = (v | (v << 4)) & 0x0F0F0F0F
+    v = (v | (v << 2)) & 0x33333333
+    v = (v | (v << 1)) & 0x55555555
+    return v
+
+
+def morton_key(
+        latitude: np.ndarray | pd.Series,
+        longitude: np.ndarray | pd.Series,
+        cell_size: float = 0.5,
+) -> np.ndarray:
+    """
+    Z-order (Morton) key of the lat/lon grid cell of each coordinate.
+    Coordinates close to each other get close keys, so sorting by the key keeps
+    both latitude and longitude ranges of consecutive rows narrow.
+    :param latitude:
+    :param longitude:
+    :param cell_size: Grid cell size in degrees.
+    :return: Array of `uint32` keys.
+    """
+    lat_idx = np.floor((np.asarray(latitude, dtype=np.float64) + 90.0) / cell_size)
+    lon_idx = np.floor((np.asarray(longitude, dtype=np.float64) + 180.0) / cell_size)
+    lat_idx = np.clip(lat_idx, 0, np.floor(180.0 / cell_size)).astype(np.uint32)
+    lon_idx = np.clip(lon_idx, 0, np.floor(360.0 / cell_size)).astype(np.uint32)
+    return _spread_bits(lat_idx) | (_spread_bits(lon_idx) << 1)
+
+
+def sort_spatially(df: pd.DataFrame, cell_size: float = 0.5) -> pd.DataFrame:
+    """
+    Sort dataframe by the Z-order key of its `latitude` and `longitude` columns.
+    The sort is stable, so soundings in one cell keep their time order.
+    :param df:
+    :param cell_size: Grid cell size in degrees.
+    :return: Sorted dataframe with a fresh index.
+    """
+    key = morton_key(df["latitude"], df["longitude"], cell_size=cell_size)
+    order = np.argsort(key, kind="stable")
+    return df.iloc[order].reset_index(drop=True)
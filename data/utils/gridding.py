@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+GridStatistic = Literal["mean", "std", "min", "max"]
+
+
+class GridAggregator:
+    """
+    Streaming aggregation of values per cell of a regular lat/lon grid.
+    Coordinates are binned to the nearest cell center (multiples of the cell size, rounding half
+    to even like `pandas.Series.round`) and reduced by `numpy.bincount` over flat cell indices.
+    Only occupied cells are stored, as sorted cell indices with count, mean, sum of squared
+    deviations (merged by Chan's parallel algorithm, so standard deviations stay accurate), minimum
+    and maximum of each value column. Aggregators of disjoint batches can be merged.
+    Batches added by `update` are merged lazily, all at once when their cells outnumber the occupied
+    cells, so the cost of an update follows the size of the batch, not the number of occupied cells.
+    """
+    _cell_size: float
+    _value_columns: list[str]
+    _n_lat: int
+    _n_lon: int
+    _pending: list[GridAggregator]  # Batches of `update` not merged yet, see `flush`.
+    _pending_cells: int
+
+    # State of merged batches, see `flush`.
+    cells: np.ndarray  # Sorted flat indices of occupied cells.
+    rows: np.ndarray  # (cells,) number of coordinates.
+    count: np.ndarray  # (values, cells) number of non-NaN values.
+    mean: np.ndarray  # (values, cells)
+    m2: np.ndarray  # (values, cells) sum of squared deviations from the mean.
+    min: np.ndarray  # (values, cells)
+    max: np.ndarray  # (values, cells)
+
+    def __init__(self, value_columns: Sequence[str], cell_size: float = 1.0) -> None:
+        """
+        Constructor.
+        :param value_columns: Columns to aggregate.
+        :param cell_size: Grid cell size in degrees, must divide 180.
+        """
+        if not np.isclose(180 / cell_size, round(180 / cell_size)):
+            raise ValueError(f"Cell size {cell_size} does not divide 180 degrees")
+
+        self._cell_size = cell_size
+        self._value_columns = list(value_columns)
+        self._n_lat = 2 * round(90 / cell_size) + 1
+        self._n_lon = 2 * round(180 / cell_size) + 1
+        self._pending = []
+        self._pending_cells = 0
+
+        n_values = len(self._value_columns)
+        self.cells = np.zeros(0, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros((n_values, 0), dtype=np.int64)
+        self.mean = np.zeros((n_values, 0))
+        self.m2 = np.zeros((n_values, 0))
+        self.min = np.zeros((n_values, 0))
+        self.max = np.zeros((n_values, 0))
+
+    @property
+    def cell_size(self) -> float:
+        return self._cell_size
+
+    @property
+    def value_columns(self) -> list[str]:
+        return list(self._value_columns)
+
+    def cell_index(self, latitude: np.ndarray | pd.Series, longitude: np.ndarray | pd.Series) -> np.ndarray:
+        """
+        Flat index of the cell of each coordinate, -1 for invalid coordinates.
+        :param latitude:
+        :param longitude:
+        :return:
+        """
+        with np.errstate(invalid="ignore"):
+            lat_idx = np.round(np.asarray(latitude, dtype=np.float64) / self._cell_size) + (self._n_lat // 2)
+            lon_idx = np.round(np.asarray(longitude, dtype=np.float64) / self._cell_size) + (self._n_lon // 2)
+            valid = (lat_idx >= 0) & (lat_idx < self._n_lat) & (lon_idx >= 0) & (lon_idx < self._n_lon)
+
+        index = np.full(lat_idx.shape, -1, dtype=np.int64)
+        index[valid] = lat_idx[valid].astype(np.int64) * self._n_lon + lon_idx[valid].astype(np.int64)
+        return index
+
+    def cell_coordinates(self, cells: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Latitude and longitude of cell centers.
+        :param cells: Flat cell indices.
+        :return:
+        """
+        latitude = (cells // self._n_lon - self._n_lat // 2) * self._cell_size
+        longitude = (cells % self._n_lon - self._n_lon // 2) * self._cell_size
+        return latitude.astype(np.float64), longitude.astype(np.float64)
+
+    def update(self, df: pd.DataFrame) -> GridAggregator:
+        """
+        Add rows of dataframe with `latitude`, `longitude` and value columns.
+        :param df:
+        :return: self
+        """
+        index = self.cell_index(df["latitude"], df["longitude"])
+        valid = index >= 0
+        index = index[valid]
+        values = df[self._value_columns].to_numpy(dtype=np.float64)[valid].T
+
+        # Binned over the occupied cells of the batch, so the cost follows the batch size, not the grid size.
+        cells, inverse, rows = np.unique(index, return_inverse=True, return_counts=True)
+        n_cells = len(cells)
+
+        batch = GridAggregator(self._value_columns, self._cell_size)
+        batch.cells = cells
+        batch.rows = rows
+        batch.count = np.zeros((len(values), n_cells), dtype=np.int64)
+        batch.mean = np.zeros((len(values), n_cells))
+        batch.m2 = np.zeros((len(values), n_cells))
+        batch.min = np.full((len(values), n_cells), np.inf)
+        batch.max = np.full((len(values), n_cells), -np.inf)
+
+        for i, _values in enumerate(values):
+            notna = ~np.isnan(_values)
+            _values = _values[notna]
+            _inverse = inverse[notna]
+
+            count = np.bincount(_inverse, minlength=n_cells)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.bincount(_inverse, weights=_values, minlength=n_cells) / count
+            mean[count == 0] = 0
+            # Deviations from the batch mean of the cell, not from a global reference.
+            batch.m2[i] = np.bincount(_inverse, weights=(_values - mean[_inverse]) ** 2, minlength=n_cells)
+            batch.count[i] = count
+            batch.mean[i] = mean
+            np.minimum.at(batch.min[i], _inverse, _values)
+            np.maximum.at(batch.max[i], _inverse, _values)
+
+        self._pending.append(batch)
+        self._pending_cells += n_cells
+        if self._pending_cells >= len(self.cells):
+            self.flush()
+        return self
+
+    def flush(self) -> GridAggregator:
+        """
+        Merge pending batches of `update` into the state of occupied cells.
+        Called by every method reading the state, needed only before the state attributes are read directly.
+        :return: self
+        """
+        if self._pending:
+            parts = [self, *self._pending]
+            self._pending = []
+            self._pending_cells = 0
+            self._pool(np.concatenate([part.cells for part in parts]), parts)
+        return self
+
+    def merge(self, other: GridAggregator) -> GridAggregator:
+        """
+        Add aggregates of another grid with the same cell size and value columns.
+        :param other:
+        :return: self
+        """
+        if other._cell_size != self._cell_size or other._value_columns != self._value_columns:
+            raise ValueError("Only aggregators of the same grid and value columns can be merged")
+
+        self.flush()
+        other.flush()
+        if not len(self.cells):
+            for name in ("cells", "rows", "count", "mean", "m2", "min", "max"):
+                setattr(self, name, getattr(other, name).copy())
+            return self
+        return self._pool(np.concatenate([self.cells, other.cells]), [self, other])
+
+    def coarsen(self, cell_size: float) -> GridAggregator:
+        """
+        Aggregates on a coarser grid, e.g. for a lower resolution map.
+        Every coarse cell merges the same number of whole fine cells per axis, fine cells on the boundary
+        of two coarse cells go to the northern and eastern one. Statistics are merged exactly, so they
+        only differ from gridding the soundings directly at the coarse cell size by this assignment.
+        :param cell_size: Cell size in degrees, a multiple of the current cell size.
+        :return: New aggregator.
+        """
+        ratio = round(cell_size / self._cell_size)
+        if ratio < 1 or not np.isclose(cell_size / self._cell_size, ratio):
+            raise ValueError(f"Cell size {cell_size} is not a multiple of {self._cell_size}")
+
+        self.flush()
+        coarse = GridAggregator(self._value_columns, cell_size)
+        lat_offset = self.cells // self._n_lon - self._n_lat // 2
+        lon_offset = self.cells % self._n_lon - self._n_lon // 2
+        # Offsets are rounded half up in integers, then clipped as the poles and the antimeridian fall on a boundary.
+        lat_idx = np.clip((2 * lat_offset + ratio) // (2 * ratio), -(coarse._n_lat // 2), coarse._n_lat // 2)
+        lon_idx = np.clip((2 * lon_offset + ratio) // (2 * ratio), -(coarse._n_lon // 2), coarse._n_lon // 2)
+        index = (lat_idx + coarse._n_lat // 2) * coarse._n_lon + lon_idx + coarse._n_lon // 2
+        return coarse._pool(index, [self])
+
+    def to_dataframe(self, statistics: Sequence[GridStatistic] = ("mean",)) -> pd.DataFrame:
+        """
+        Aggregates of occupied cells.
+        :param statistics: Statistics of each value column. Mean is named after the column,
+            the others get a suffix, e.g. `xco2_std`. Standard deviation has one degree of freedom.
+        :return: Dataframe with `latitude`, `longitude`, statistics and `count` of coordinates per cell.
+        """
+        self.flush()
+        latitude, longitude = self.cell_coordinates(self.cells)
+        data = {"latitude": latitude, "longitude": longitude}
+
+        has_values = self.count > 0
+        for i, column in enumerate(self._value_columns):
+            for statistic in statistics:
+                if statistic == "mean":
+                    result = np.where(has_values[i], self.mean[i], np.nan)
+                elif statistic == "std":
+                    with np.errstate(invalid="ignore", divide="ignore"):
+                        result = np.where(self.count[i] > 1, np.sqrt(self.m2[i] / (self.count[i] - 1)), np.nan)
+                elif statistic == "min":
+                    result = np.where(has_values[i], self.min[i], np.nan)
+                elif statistic == "max":
+                    result = np.where(has_values[i], self.max[i], np.nan)
+                else:
+                    raise ValueError(f"Unknown statistic {statistic}")
+                data[column if statistic == "mean" else f"{column}_{statistic}"] = result
+
+        data["count"] = self.rows
+        return pd.DataFrame(data)
+
+    def to_state_frame(self) -> pd.DataFrame:
+        """
+        Complete state of occupied cells, e.g. to be saved and merged into later.
+        :return: Dataframe with `latitude`, `longitude`, `rows` and `<column>_count`, `<column>_mean`,
+            `<column>_m2`, `<column>_min` and `<column>_max` of each value column.
+        """
+        self.flush()
+        latitude, longitude = self.cell_coordinates(self.cells)
+        data = {"latitude": latitude, "longitude": longitude, "rows": self.rows}
+        for i, column in enumerate(self._value_columns):
+            for name in ("count", "mean", "m2", "min", "max"):
+                data[f"{column}_{name}"] = getattr(self, name)[i]
+        return pd.DataFrame(data)
+
+    @classmethod
+    def from_state_frame(cls, df: pd.DataFrame, value_columns: Sequence[str], cell_size: float) -> GridAggregator:
+        """
+        Restore aggregator saved by `to_state_frame`.
+        :param df:
+        :param value_columns:
+        :param cell_size: Cell size the state was aggregated at.
+        :return:
+        """
+        grid = cls(value_columns, cell_size)
+        index = grid.cell_index(df["latitude"], df["longitude"])
+        if (index < 0).any():
+            raise ValueError("State contains coordinates outside of the grid")
+
+        order = np.argsort(index)
+        grid.cells = index[order]
+        grid.rows = df["rows"].to_numpy(dtype=np.int64)[order]
+        for name in ("count", "mean", "m2", "min", "max"):
+            state = df[[f"{column}_{name}" for column in grid._value_columns]].to_numpy().T[:, order]
+            setattr(grid, name, state.astype(np.int64 if name == "count" else np.float64))
+        return grid
+
+    def _pool(self, index: np.ndarray, parts: Sequence[GridAggregator]) -> GridAggregator:
+        """
+        Set state to cells of parts merged by their index in this grid, Chan's merge of all of them at once.
+        :param index: Cell in this grid of every cell of the concatenated parts.
+        :param parts: Aggregators without pending batches, may include self.
+        :return: self
+        """
+        rows = np.concatenate([part.rows for part in parts])
+        part_count = np.concatenate([part.count for part in parts], axis=1)
+        part_mean = np.concatenate([part.mean for part in parts], axis=1)
+        part_m2 = np.concatenate([part.m2 for part in parts], axis=1)
+        part_min = np.concatenate([part.min for part in parts], axis=1)
+        part_max = np.concatenate([part.max for part in parts], axis=1)
+
+        cells, inverse = np.unique(index, return_inverse=True)
+        n_cells = len(cells)
+        self.cells = cells
+        self.rows = np.bincount(inverse, weights=rows, minlength=n_cells).astype(np.int64)
+        self.count = np.zeros((len(self._value_columns), n_cells), dtype=np.int64)
+        self.mean = np.zeros((len(self._value_columns), n_cells))
+        self.m2 = np.zeros((len(self._value_columns), n_cells))
+        self.min = np.full((len(self._value_columns), n_cells), np.inf)
+        self.max = np.full((len(self._value_columns), n_cells), -np.inf)
+
+        for i in range(len(self._value_columns)):
+            count = np.bincount(inverse, weights=part_count[i], minlength=n_cells)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                mean = np.bincount(inverse, weights=part_count[i] * part_mean[i], minlength=n_cells) / count
+            mean[count == 0] = 0
+
+            self.count[i] = count
+            self.mean[i] = mean
+            # Pooled sum of squared deviations.
+            self.m2[i] = np.bincount(
+                inverse,
+                weights=part_m2[i] + part_count[i] * (part_mean[i] - mean[inverse]) ** 2,
+                minlength=n_cells,
+            )
+            np.minimum.at(self.min[i], inverse, part_min[i])
+            np.maximum.at(self.max[i], inverse, part_max[i])
+
+        return self
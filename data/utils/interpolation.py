@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import enum
+from typing import TYPE_CHECKING, Literal
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+EARTH_RADIUS_KM = 6371.0
+
+Weighting = Literal["idw", "gaussian"]
+
+
+class WeightingChoices(str, enum.Enum):
+    """
+    Enum for the available weightings of `SphericalInterpolator`.
+    """
+    idw = "idw"
+    gaussian = "gaussian"
+
+
+def unit_vectors(latitude: np.ndarray | pd.Series, longitude: np.ndarray | pd.Series) -> np.ndarray:
+    """
+    Points on the unit sphere, euclidean distances between them grow monotonically with great circle distances.
+    :param latitude:
+    :param longitude:
+    :return: (points, 3)
+    """
+    lat = np.radians(np.asarray(latitude, dtype=np.float64))
+    lon = np.radians(np.asarray(longitude, dtype=np.float64))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=1)
+
+
+class SphericalInterpolator:
+    """
+    Weighted average of the nearest known points on the sphere.
+    Known points are indexed once by a KD-tree over their unit vectors, any number of targets is then
+    interpolated by one vectorized query. Targets without a known point within the maximum distance get NaN.
+    """
+    _tree: cKDTree
+    _values: np.ndarray
+    _neighbours: int
+    _max_distance_km: float
+    _weighting: Weighting
+    _power: float
+    _length_scale_km: float
+
+    def __init__(
+            self,
+            latitude: np.ndarray | pd.Series,
+            longitude: np.ndarray | pd.Series,
+            values: np.ndarray | pd.Series,
+            neighbours: int = 8,
+            max_distance_km: float = 500.0,
+            weighting: Weighting = "idw",
+            power: float = 2.0,
+            length_scale_km: float = 250.0,
+    ) -> None:
+        """
+        Constructor.
+        :param latitude: Latitude of known points.
+        :param longitude: Longitude of known points.
+        :param values: Values of known points, NaN values are left out.
+        :param neighbours: Number of nearest known points averaged.
+        :param max_distance_km: Known points further away are not used.
+        :param weighting: Inverse distance weights, or gaussian weights of distance.
+        :param power: Power of inverse distance weights.
+        :param length_scale_km: Standard deviation of gaussian weights.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        notna = ~np.isnan(values)
+        self._tree = cKDTree(unit_vectors(np.asarray(latitude)[notna], np.asarray(longitude)[notna]))
+        self._values = values[notna]
+        self._neighbours = neighbours
+        self._max_distance_km = max_distance_km
+        self._weighting = weighting
+        self._power = power
+        self._length_scale_km = length_scale_km
+
+    def __call__(
+            self,
+            latitude: np.ndarray | pd.Series,
+            longitude: np.ndarray | pd.Series,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Interpolate values at targets.
+        :param latitude:
+        :param longitude:
+        :return: Interpolated values and great circle distance to the nearest known point in km, both NaN
+            for targets without known points within the maximum distance.
+        """
+        targets = unit_vectors(latitude, longitude)
+        n_targets = len(targets)
+        if not len(self._values) or not n_targets:
+            return np.full(n_targets, np.nan), np.full(n_targets, np.nan)
+
+        neighbours = min(self._neighbours, len(self._values))
+        max_chord = 2 * np.sin(min(self._max_distance_km / EARTH_RADIUS_KM, np.pi) / 2)
+        chord, index = self._tree.query(targets, k=neighbours, distance_upper_bound=max_chord)
+        chord, index = chord.reshape(n_targets, neighbours), index.reshape(n_targets, neighbours)
+
+        found = index < len(self._values)  # Missing neighbours have infinite distance and index out of range.
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(np.where(found, chord, 0) / 2, 0, 1))
+        if self._weighting == "idw":
+            weights = 1 / np.maximum(distance, 1e-6) ** self._power
+        elif self._weighting == "gaussian":
+            weights = np.exp(-0.5 * (distance / self._length_scale_km) ** 2)
+        else:
+            raise ValueError(f"Unknown weighting {self._weighting}")
+        weights = np.where(found, weights, 0)
+
+        neighbour_values = self._values[np.where(found, index, 0)]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            interpolated = (weights * neighbour_values).sum(axis=1) / weights.sum(axis=1)
+        nearest = np.where(found[:, 0], distance[:, 0], np.nan)
+        interpolated[~found[:, 0]] = np.nan
+        return interpolated, nearest
+
+
+def grid_coordinates(cell_size: float = 1.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Cell centers of the whole grid of `data.utils.gridding.GridAggregator`.
+    :param cell_size:
+    :return: Flat latitude and longitude of all cells.
+    """
+    latitude = np.arange(-round(90 / cell_size), round(90 / cell_size) + 1) * cell_size
+    longitude = np.arange(-round(180 / cell_size), round(180 / cell_size) + 1) * cell_size
+    latitude, longitude = np.meshgrid(latitude, longitude, indexing="ij")
+    return latitude.ravel(), longitude.ravel()
+
+
+def fill_grid(
+        df: pd.DataFrame,
+        value_columns: Sequence[str] = ("xco2",),
+        cell_size: float = 1.0,
+        **kwargs,
+) -> pd.DataFrame:
+    """
+    Fill empty cells of a grid by interpolation of its occupied cells.
+    :param df: Dataframe with `latitude`, `longitude` and value columns of one grid, e.g. one month
+        of `monthly_avg_per_lat_lon`.
+    :param value_columns:
+    :param cell_size: Cell size of the grid.
+    :param kwargs: See `SphericalInterpolator`.
+    :return: Dataframe with `latitude`, `longitude`, value columns, `filled` flag and `distance`
+        (km to the nearest occupied cell, 0 for occupied cells) of occupied cells and of filled cells,
+        empty cells too far from occupied ones are left out.
+    """
+    latitude, longitude = grid_coordinates(cell_size)
+    occupied = pd.MultiIndex.from_arrays([
+        np.round(df["latitude"].to_numpy(dtype=np.float64) / cell_size) * cell_size,
+        np.round(df["longitude"].to_numpy(dtype=np.float64) / cell_size) * cell_size,
+    ])
+    empty = ~pd.MultiIndex.from_arrays([latitude, longitude]).isin(occupied)
+
+    filled = pd.DataFrame({"latitude": latitude[empty], "longitude": longitude[empty]})
+    reached = np.zeros(len(filled), dtype=bool)
+    for column in value_columns:
+        interpolator = SphericalInterpolator(df["latitude"], df["longitude"], df[column], **kwargs)
+        filled[column], distance = interpolator(filled["latitude"], filled["longitude"])
+        reached |= ~np.isnan(distance)
+        filled["distance"] = distance if "distance" not in filled else np.fmin(filled["distance"], distance)
+    filled["filled"] = True
+
+    known = df[["latitude", "longitude", *value_columns]].assign(filled=False, distance=0.0)
+    return pd.concat([known, filled[reached]], ignore_index=True)[
+        ["latitude", "longitude", *value_columns, "filled", "distance"]
+    ]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping, Sequence
+
+
+class _Column(NamedTuple):
+    key: str  # Escaped tag or field key.
+    placeholder: str  # Format placeholder including type suffix, e.g. "{}i" for integers.
+    values: list  # Values formatted by `str.format`.
+    missing: np.ndarray | None  # Mask of values to omit, None if nothing is missing.
+
+
+def _escape_key(value: str) -> str:
+    """
+    Escape measurement name, tag key, tag value or field key.
+    """
+    return value.replace("\\", "\\\\").replace(",", "\\,").replace("=", "\\=").replace(" ", "\\ ")
+
+
+def _escape_format(value: str) -> str:
+    return value.replace("{", "{{").replace("}", "}}")
+
+
+def _tag_column(key: str, series: pd.Series) -> _Column:
+    values = series.astype(str).to_numpy(dtype=str)
+    for _char in ("\\", ",", "=", " "):
+        values = np.strings.replace(values, _char, f"\\{_char}")
+    missing = (values == "") | series.isna().to_numpy()
+    return _Column(_escape_key(key), "{}", values.tolist(), missing if missing.any() else None)
+
+
+def _field_column(key: str, series: pd.Series) -> _Column:
+    kind = series.dtype.kind
+    if kind == "f":
+        values = series.to_numpy(dtype=np.float64)
+        missing = np.isnan(values)
+        # `str.format` of a Python float is its shortest repr, as in the influxdb-client serializer.
+        return _Column(_escape_key(key), "{}", values.tolist(), missing if missing.any() else None)
+    if kind in "iu":
+        return _Column(_escape_key(key), "{}i", series.to_numpy().tolist(), None)
+    if kind == "b":
+        return _Column(_escape_key(key), "{}", series.to_numpy().tolist(), None)  # "True"/"False".
+
+    missing = series.isna().to_numpy()
+    values = series.astype(str).to_numpy(dtype=str)
+    values = np.strings.replace(np.strings.replace(values, "\\", "\\\\"), '"', '\\"')
+    return _Column(_escape_key(key), '"{}"', values.tolist(), missing if missing.any() else None)
+
+
+def encode_line_protocol(
+        df: pd.DataFrame,
+        measurement: str,
+        *,
+        time_column: str = "_time",
+        tags: Mapping[str, str] | None = None,
+        tag_columns: Sequence[str] = (),
+        chunk_size: int = 50_000,
+) -> Iterator[bytes]:
+    """
+    Encode dataframe to InfluxDB line protocol with nanosecond precision.
+    Each column is converted in bulk and all lines are rendered by one line template,
+    instead of building a point object per row. Payloads of at most `chunk_size` lines are yielded.
+    Fields are written in alphabetical order and missing (NaN/None) values are omitted,
+    which matches the output of the influxdb-client dataframe serializer.
+    :param df:
+    :param measurement: Measurement name.
+    :param time_column: Column with timezone-aware or UTC timestamps.
+    :param tags: Tags common to all points.
+    :param tag_columns: Columns written as tags, all remaining columns are written as fields.
+    :param chunk_size: Maximum number of lines per payload.
+    :return: Iterator of newline separated line protocol payloads.
+    """
+    prefix = _escape_key(measurement)
+    for _key, _value in sorted((tags or {}).items()):
+        if _value != "":
+            prefix += f",{_escape_key(_key)}={_escape_key(str(_value))}"
+
+    tag_cols = [_tag_column(_c, df[_c]) for _c in sorted(tag_columns)]
+    field_cols = [_field_column(_c, df[_c]) for _c in sorted(set(df.columns) - {time_column, *tag_columns})]
+    timestamps = pd.to_datetime(df[time_column], utc=True).to_numpy(dtype="datetime64[ns]").view(np.int64).tolist()
+
+    template = _escape_format(prefix)
+    template += "".join(f",{_escape_format(_c.key)}={_c.placeholder}" for _c in tag_cols)
+    template += " " + ",".join(f"{_escape_format(_c.key)}={_c.placeholder}" for _c in field_cols)
+    template += " {}"
+
+    columns = [*tag_cols, *field_cols]
+    missing = np.zeros(len(df), dtype=bool)
+    for _c in columns:
+        if _c.missing is not None:
+            missing |= _c.missing
+
+    for _start in range(0, len(df), chunk_size):
+        _stop = min(_start + chunk_size, len(df))
+        if not missing[_start:_stop].any():
+            lines = list(map(template.format, *(_c.values[_start:_stop] for _c in columns), timestamps[_start:_stop]))
+        else:
+            lines = [
+                _encode_row(prefix, tag_cols, field_cols, timestamps, _i) if missing[_i] else
+                template.format(*(_c.values[_i] for _c in columns), timestamps[_i])
+                for _i in range(_start, _stop)
+            ]
+            lines = [_line for _line in lines if _line is not None]
+
+        if lines:
+            yield "\n".join(lines).encode()
+
+
+def _encode_row(
+        prefix: str,
+        tag_cols: list[_Column],
+        field_cols: list[_Column],
+        timestamps: list[int],
+        i: int,
+) -> str | None:
+    """
+    Encode a row with missing values, returns None if the row has no field value.
+    """
+    def present(_c: _Column) -> bool:
+        return _c.missing is None or not _c.missing[i]
+
+    fields = ",".join(f"{_c.key}={_c.placeholder.format(_c.values[i])}" for _c in field_cols if present(_c))
+    if not fields:
+        return None
+    tags = "".join(f",{_c.key}={_c.placeholder.format(_c.values[i])}" for _c in tag_cols if present(_c))
+    return f"{prefix}{tags} {fields} {timestamps[i]}"
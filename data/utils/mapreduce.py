@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import functools
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, Callable, TypeVar
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def map_reduce(
+        mapper: Callable[[T], R],
+        items: Sequence[T],
+        reducer: Callable[[R, R], R],
+        initial: R,
+        workers: int = 1,
+) -> R:
+    """
+    Map items to partial results and merge them into one.
+    With more than one worker, items are mapped in a process pool. Partial results are merged
+    in the order of items as they arrive, so `reducer` needs to be associative, not commutative.
+    :param mapper: Picklable callable, e.g. module level function or `functools.partial` of one.
+    :param items: Picklable units of work.
+    :param reducer: Merges two partial results.
+    :param initial: Partial result of no items.
+    :param workers: Number of worker processes, mapped in the current process if 1.
+    :return: Merged result.
+    """
+    if workers <= 1 or len(items) <= 1:
+        return functools.reduce(reducer, map(mapper, items), initial)
+
+    logger.info("Mapping %d items in %d worker processes", len(items), workers)
+    # Forked workers would inherit client connections and locks of the parent, start them clean.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return functools.reduce(reducer, executor.map(mapper, items), initial)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import os
+import re
+
+import netCDF4 as nc
+import numpy as np
+import pandas as pd
+
+
+# NOAA GML event files, e.g. `co2_mlo_surface-flask_1_ccgg_event.nc`.
+EVENT_FILE_PATTERN = "co2_*_event.nc"
+
+_EVENT_FILE_NAME = re.compile(r"co2_(?P<site>[a-z0-9]+)_.*event\.nc", re.IGNORECASE)
+_EPOCH_SECONDS_UNITS = re.compile(r"seconds since 1970-01-01([ T]00:00(:00)?)?( ?(Z|UTC|\+00:00))?$")
+
+
+def station_code(path: str, dataset: nc.Dataset) -> str:
+    """
+    Station code from the `site_code` attribute, or from the file name if missing.
+    :param path:
+    :param dataset:
+    :return: Lower case code, e.g. `mlo`.
+    :raises ValueError: If there is no attribute and the file name is not `co2_<site>_..._event.nc`.
+    """
+    if "site_code" in dataset.ncattrs():
+        return str(dataset.getncattr("site_code")).lower()
+    match = _EVENT_FILE_NAME.fullmatch(os.path.basename(path))
+    if match is None:
+        raise ValueError(f"No site_code attribute and no station in name of {path}")
+    return match["site"].lower()
+
+
+def decode_char_times(chars: np.ndarray) -> np.ndarray:
+    """
+    Parse character array of ISO 8601 UTC times without converting every row to a Python string.
+    :param chars: (times, characters) array of single bytes, e.g. `2024-01-31T12:00:00Z`.
+    :return: Array of `datetime64[s]`.
+    """
+    chars = np.ascontiguousarray(np.ma.getdata(chars)[:, :19])  # Without the time zone designator.
+    return chars.view("S19").ravel().astype("datetime64[s]")
+
+
+def decode_event_times(dataset: nc.Dataset) -> np.ndarray:
+    """
+    Sample times of event file, from numeric `time` variable if in epoch seconds, else from `datetime` strings.
+    :param dataset:
+    :return: Array of `datetime64[s]`.
+    """
+    time = dataset.variables.get("time")
+    if time is not None and _EPOCH_SECONDS_UNITS.match(getattr(time, "units", "")):
+        return np.ma.getdata(time[:]).astype(np.int64).astype("datetime64[s]")
+    return decode_char_times(dataset.variables["datetime"][:])
+
+
+def read_event_file(path: str) -> pd.DataFrame:
+    """
+    Valid CO2 samples of NOAA event file.
+    Samples with a rejection flag, the first character of `qcflag` other than `.`, and missing values are dropped.
+    :param path:
+    :return: Dataframe with `station`, `_time` (UTC) and `co2` columns.
+    """
+    with nc.Dataset(path, "r") as dataset:
+        dataset.set_auto_chartostring(False)
+        station = station_code(path, dataset)
+        times = decode_event_times(dataset)
+        values = np.ma.filled(dataset.variables["value"][:].astype(np.float64), np.nan)
+        valid = (np.ma.getdata(dataset.variables["qcflag"][:])[:, 0] == b".") & ~np.isnan(values)
+
+    return pd.DataFrame({
+        "station": station,
+        "_time": pd.to_datetime(times[valid]).tz_localize("UTC"),
+        "co2": values[valid],
+    })
+
+
+def event_file_daily_sums(path: str) -> pd.DataFrame:
+    """
+    Daily sums and counts of valid CO2 samples of NOAA event file.
+    :param path:
+    :return: Dataframe with `station`, `_date` (`datetime64`), `sum` and `count` columns.
+    """
+    df = read_event_file(path)
+    days, inverse = np.unique(df["_time"].dt.tz_localize(None).to_numpy().astype("datetime64[D]"), return_inverse=True)
+    return pd.DataFrame({
+        "station": df["station"].iloc[0] if len(df) else pd.Series(dtype=str),
+        "_date": days,
+        "sum": np.bincount(inverse, weights=df["co2"].to_numpy(), minlength=len(days)),
+        "count": np.bincount(inverse, minlength=len(days)),
+    })
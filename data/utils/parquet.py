@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, IO, Literal, NamedTuple
+
+import fastparquet
+import pandas as pd
+
+from data.utils.geo import sort_spatially
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    from data.utils.geo import BoundingBox
+
+
+ParquetEngine = Literal["fastparquet", "pyarrow"]
+ParquetCompression = Literal["gzip", "zstd", "snappy", "lz4", "brotli"]
+
+# Keyword argument carrying the compression level of each fastparquet (cramjam) compressor.
+_FASTPARQUET_LEVEL_ARGS = {
+    "GZIP": lambda level: {"compresslevel": level},
+    "ZSTD": lambda level: {"level": level},
+    "BROTLI": lambda level: {"level": level},
+    "LZ4_RAW": lambda level: {"mode": "high_compression", "compression": level},
+}
+
+
+class ParquetOptions(NamedTuple):
+    """
+    Parquet engine and encoding options.
+    """
+    engine: ParquetEngine = "fastparquet"
+    compression: ParquetCompression | None = "gzip"
+    compression_level: int | None = None  # Codec default if None.
+    row_group_size: int | None = None  # Approximate number of rows per row group, single row group if None.
+
+    def to_parquet_kwargs(self) -> dict:
+        """
+        Keyword arguments of `pandas.DataFrame.to_parquet` for these options.
+        :return:
+        """
+        kwargs: dict = {"engine": self.engine, "index": False}
+
+        if self.engine == "pyarrow":
+            kwargs["compression"] = self.compression
+            if self.compression_level is not None:
+                kwargs["compression_level"] = self.compression_level
+            if self.row_group_size is not None:
+                kwargs["row_group_size"] = self.row_group_size
+            return kwargs
+
+        codec = None
+        if self.compression is not None:
+            # Fastparquet "LZ4" is the deprecated Hadoop framing, "LZ4_RAW" is what other readers expect.
+            codec = "LZ4_RAW" if self.compression == "lz4" else self.compression.upper()
+        if codec is not None and self.compression_level is not None:
+            if codec not in _FASTPARQUET_LEVEL_ARGS:
+                raise ValueError(f"Compression level is not supported for {self.compression}")
+            kwargs["compression"] = {
+                "_default": {"type": codec, "args": _FASTPARQUET_LEVEL_ARGS[codec](self.compression_level)},
+            }
+        else:
+            kwargs["compression"] = codec
+        if self.row_group_size is not None:
+            kwargs["row_group_offsets"] = self.row_group_size
+        return kwargs
+
+
+def write_parquet(
+        df: pd.DataFrame,
+        path: str,
+        options: ParquetOptions = ParquetOptions(),
+        *,
+        spatial_sort: bool = False,
+) -> None:
+    """
+    Write dataframe to parquet file.
+    :param df:
+    :param path:
+    :param options: Engine and encoding options.
+    :param spatial_sort: Sort rows by a lat/lon space filling curve first, so row group statistics
+        of `latitude` and `longitude` are narrow and can be used to skip row groups on read.
+    :return: None
+    """
+    if spatial_sort:
+        df = sort_spatially(df)
+
+    df.to_parquet(path, **options.to_parquet_kwargs())
+
+
+def read_parquet(path: str, options: ParquetOptions = ParquetOptions()) -> pd.DataFrame:
+    """
+    Read parquet file with the engine from options.
+    :param path:
+    :param options:
+    :return:
+    """
+    return pd.read_parquet(path, engine=options.engine)
+
+
+def read_parquet_bbox(
+        path: str | IO[bytes],
+        bbox: BoundingBox,
+        columns: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Read rows inside the bounding box from parquet file.
+    Only row groups whose `latitude`/`longitude` statistics intersect the bounding box are decoded,
+    the remaining rows are then filtered exactly.
+    :param path: File path or seekable file object.
+    :param bbox:
+    :param columns: Columns to read, all if None. Coordinates are always read for filtering.
+    :return:
+    """
+    pf = fastparquet.ParquetFile(path)
+
+    _columns = None
+    if columns is not None:
+        _columns = list(dict.fromkeys([*columns, "latitude", "longitude"]))
+
+    df = pf.to_pandas(columns=_columns, filters=bbox.to_parquet_filters())
+    df = df.loc[bbox.mask(df["latitude"], df["longitude"])].reset_index(drop=True)
+
+    if columns is not None:
+        df = df[list(columns)]
+    return df
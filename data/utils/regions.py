@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from data.utils.geo import BoundingBox, Polygon
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+    import pandas as pd
+
+
+class Region(NamedTuple):
+    name: str
+    shape: BoundingBox | Polygon
+
+
+class RegionRegistry:
+    """
+    Regions assigned to coordinates using a precomputed lookup table over a global lat/lon grid.
+    Every grid cell stores bitmasks of regions covering the whole cell and of regions whose outline
+    passes through the cell. Coordinates get the former by one lookup, only coordinates in cells
+    of the latter are tested exactly against the region shape. Assigning many regions therefore
+    costs about the same as assigning one.
+    """
+    _regions: list[Region]
+    _cell_size: float
+    _inside: np.ndarray  # (latitude cells, longitude cells) bitmasks of regions covering the whole cell.
+    _boundary: np.ndarray  # (latitude cells, longitude cells) bitmasks of regions partially covering the cell.
+
+    max_regions: int = 64
+
+    def __init__(self, regions: Sequence[Region], cell_size: float = 0.5) -> None:
+        """
+        Constructor.
+        :param regions:
+        :param cell_size: Grid cell size in degrees.
+        """
+        if len(regions) > self.max_regions:
+            raise ValueError(f"At most {self.max_regions} regions are supported")
+        if len({region.name for region in regions}) != len(regions):
+            raise ValueError("Region names must be unique")
+
+        self._regions = list(regions)
+        self._cell_size = cell_size
+
+        n_lat, n_lon = int(np.ceil(180 / cell_size)), int(np.ceil(360 / cell_size))
+        self._inside = np.zeros((n_lat, n_lon), dtype=np.uint64)
+        self._boundary = np.zeros((n_lat, n_lon), dtype=np.uint64)
+
+        center_lat = (np.arange(n_lat) + 0.5) * cell_size - 90
+        center_lon = (np.arange(n_lon) + 0.5) * cell_size - 180
+        center_lat, center_lon = np.meshgrid(center_lat, center_lon, indexing="ij")
+        for i, region in enumerate(self._regions):
+            bit = np.uint64(1) << np.uint64(i)
+            boundary = self._outline_cells(region.shape)
+            # Cells without the outline are either whole inside or whole outside, their center tells which.
+            inside = ~boundary & region.shape.mask(center_lat, center_lon)
+            self._inside[inside] |= bit
+            self._boundary[boundary] |= bit
+
+    @property
+    def names(self) -> list[str]:
+        return [region.name for region in self._regions]
+
+    def assign(self, latitude: np.ndarray | pd.Series, longitude: np.ndarray | pd.Series) -> np.ndarray:
+        """
+        Bitmask of regions of each coordinate, bit `i` is set for the i-th region.
+        :param latitude:
+        :param longitude:
+        :return: Array of `uint64` bitmasks.
+        """
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        valid = np.isfinite(latitude) & np.isfinite(longitude)
+        lat_idx, lon_idx = self._cell_index(latitude, longitude)
+
+        bits = np.where(valid, self._inside[lat_idx, lon_idx], np.uint64(0))
+        boundary = np.where(valid, self._boundary[lat_idx, lon_idx], np.uint64(0))
+        if not boundary.any():
+            return bits
+
+        for i, region in enumerate(self._regions):
+            bit = np.uint64(1) << np.uint64(i)
+            candidates = np.flatnonzero(boundary & bit)
+            if candidates.size:
+                inside = region.shape.mask(latitude[candidates], longitude[candidates])
+                bits[candidates[inside]] |= bit
+        return bits
+
+    def membership(self, latitude: np.ndarray | pd.Series, longitude: np.ndarray | pd.Series) -> np.ndarray:
+        """
+        Boolean matrix of coordinates (rows) inside regions (columns).
+        :param latitude:
+        :param longitude:
+        :return:
+        """
+        bits = self.assign(latitude, longitude)
+        shifts = np.arange(len(self._regions), dtype=np.uint64)
+        return ((bits[:, np.newaxis] >> shifts) & np.uint64(1)).astype(bool)
+
+    def sums(
+            self,
+            latitude: np.ndarray | pd.Series,
+            longitude: np.ndarray | pd.Series,
+            values: np.ndarray | pd.Series,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Sums and counts of non-NaN values per region.
+        :param latitude:
+        :param longitude:
+        :param values:
+        :return: Sums and counts, one element per region.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        notna = ~np.isnan(values)
+        membership = self.membership(latitude, longitude) & notna[:, np.newaxis]
+        return np.where(notna, values, 0) @ membership, membership.sum(axis=0)
+
+    def _cell_index(self, latitude: np.ndarray, longitude: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        n_lat, n_lon = self._inside.shape
+        with np.errstate(invalid="ignore"):
+            lat_idx = np.floor((latitude + 90) / self._cell_size)
+            lon_idx = np.floor((longitude + 180) / self._cell_size)
+        lat_idx = np.clip(np.nan_to_num(lat_idx), 0, n_lat - 1).astype(np.intp)
+        lon_idx = np.clip(np.nan_to_num(lon_idx), 0, n_lon - 1).astype(np.intp)
+        return lat_idx, lon_idx
+
+    def _outline_cells(self, shape: BoundingBox | Polygon) -> np.ndarray:
+        """
+        Cells the outline of the shape passes through, possibly with some of their neighbours.
+        """
+        if isinstance(shape, BoundingBox):
+            vertices = [
+                (shape.lat_min, shape.lon_min), (shape.lat_min, shape.lon_max),
+                (shape.lat_max, shape.lon_max), (shape.lat_max, shape.lon_min),
+            ]
+        else:
+            vertices = list(shape.vertices)
+
+        # Points along every edge closer than a cell to each other, neighbours of their cells then
+        # contain every cell the edge passes through.
+        points = []
+        for (lat0, lon0), (lat1, lon1) in zip(vertices, vertices[1:] + vertices[:1]):
+            n = int(np.ceil(max(abs(lat1 - lat0), abs(lon1 - lon0)) / (self._cell_size / 2))) + 1
+            points.append(np.column_stack([np.linspace(lat0, lat1, n), np.linspace(lon0, lon1, n)]))
+        points = np.concatenate(points)
+
+        cells = np.zeros(self._inside.shape, dtype=bool)
+        cells[self._cell_index(points[:, 0], points[:, 1])] = True
+
+        padded = np.pad(cells, 1)
+        dilated = np.zeros_like(cells)
+        for d_lat in (0, 1, 2):
+            for d_lon in (0, 1, 2):
+                dilated |= padded[d_lat:d_lat + cells.shape[0], d_lon:d_lon + cells.shape[1]]
+        return dilated
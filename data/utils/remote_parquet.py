@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import bisect
+import logging
+import struct
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable
+
+import fastparquet
+from fastparquet.api import filter_row_groups
+
+from data.utils.parquet import read_parquet_bbox
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Sequence
+
+    import pandas as pd
+
+    from data.utils.geo import BoundingBox
+
+
+logger = logging.getLogger(__name__)
+
+# Fetch bytes `[start, end)` of the remote object.
+Fetch = Callable[[int, int], bytes]
+
+# Footer of daily files is a few KiB, one request usually covers the whole of it.
+FOOTER_PREFETCH_SIZE = 64 * 1024
+
+# Ranges closer than this are fetched in one request, reading the gap is cheaper than another round trip.
+COALESCE_GAP = 512 * 1024
+
+# Coalesced ranges are not extended beyond this size, so large reads are still fetched in parallel.
+MAX_RANGE_SIZE = 8 * 1024 ** 2
+
+
+class RangeFile:
+    """
+    Read-only file object over a remote object.
+    Reads are served from prefetched byte ranges, reads outside of them are fetched on demand.
+    """
+    _size: int
+    _fetch: Fetch
+    _starts: list[int]
+    _chunks: list[bytes]
+    _position: int = 0
+
+    requests: int = 0
+    fetched_bytes: int = 0
+
+    def __init__(self, size: int, fetch: Fetch) -> None:
+        """
+        Constructor.
+        :param size: Size of the remote object.
+        :param fetch: Function fetching a byte range of the remote object.
+        """
+        self._size = size
+        self._fetch = fetch
+        self._starts = []
+        self._chunks = []
+
+    def prefetch(self, ranges: Iterable[tuple[int, int]], max_workers: int = 8) -> None:
+        """
+        Fetch byte ranges in parallel.
+        :param ranges: Ranges `[start, end)`, expected to be coalesced already.
+        :param max_workers:
+        :return: None
+        """
+        ranges = [(start, end) for start, end in ranges if end > start and not self._is_fetched(start, end)]
+        if not ranges:
+            return
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(ranges))) as executor:
+            for (start, end), data in zip(ranges, executor.map(lambda r: self._fetch(*r), ranges)):
+                self._add(start, data)
+
+    def read(self, size: int = -1) -> bytes:
+        start = self._position
+        end = self._size if size is None or size < 0 else min(start + size, self._size)
+        self._position = end
+        if end <= start:
+            return b""
+
+        if self._is_fetched(start, end):
+            i = bisect.bisect_right(self._starts, start) - 1
+            offset = start - self._starts[i]
+            return self._chunks[i][offset:offset + end - start]
+
+        logger.debug("Fetching bytes %d-%d which were not prefetched", start, end)
+        data = self._fetch(start, end)
+        self._add(start, data)
+        return data
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        if whence == 0:
+            self._position = offset
+        elif whence == 1:
+            self._position += offset
+        elif whence == 2:
+            self._position = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence {whence}")
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def seekable(self) -> bool:
+        return True
+
+    def readable(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        # Fastparquet may close the file between row groups, prefetched ranges must stay available.
+        pass
+
+    def __enter__(self) -> RangeFile:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _is_fetched(self, start: int, end: int) -> bool:
+        i = bisect.bisect_right(self._starts, start) - 1
+        return i >= 0 and end <= self._starts[i] + len(self._chunks[i])
+
+    def _add(self, start: int, data: bytes) -> None:
+        self.requests += 1
+        self.fetched_bytes += len(data)
+        i = bisect.bisect_left(self._starts, start)
+        self._starts.insert(i, start)
+        self._chunks.insert(i, data)
+
+
+def coalesce_ranges(
+        ranges: Iterable[tuple[int, int]],
+        gap: int = COALESCE_GAP,
+        max_size: int = MAX_RANGE_SIZE,
+) -> list[tuple[int, int]]:
+    """
+    Merge sorted byte ranges which are closer than `gap`, up to `max_size`.
+    :param ranges: Ranges `[start, end)`.
+    :param gap:
+    :param max_size:
+    :return: Sorted non-overlapping ranges.
+    """
+    coalesced: list[tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if coalesced:
+            last_start, last_end = coalesced[-1]
+            if start - last_end <= gap and max(end, last_end) - last_start <= max_size:
+                coalesced[-1] = (last_start, max(end, last_end))
+                continue
+        coalesced.append((start, end))
+    return coalesced
+
+
+def column_chunk_ranges(
+        pf: fastparquet.ParquetFile,
+        row_groups: Sequence,
+        columns: Sequence[str] | None = None,
+) -> list[tuple[int, int]]:
+    """
+    Byte ranges of column chunks in the row groups, as read by fastparquet.
+    :param pf:
+    :param row_groups: Row groups of `pf`.
+    :param columns: Column names, all if None.
+    :return: Ranges `[start, end)`.
+    """
+    ranges = []
+    for rg in row_groups:
+        for chunk in rg.columns:
+            meta = chunk.meta_data
+            if columns is not None and ".".join(meta.path_in_schema) not in columns:
+                continue
+            start = min(meta.dictionary_page_offset or meta.data_page_offset, meta.data_page_offset)
+            ranges.append((start, start + meta.total_compressed_size))
+    return ranges
+
+
+def open_remote_parquet(size: int, fetch: Fetch, footer_prefetch_size: int = FOOTER_PREFETCH_SIZE) -> RangeFile:
+    """
+    Open remote parquet file with its footer prefetched.
+    :param size: Size of the remote object.
+    :param fetch:
+    :param footer_prefetch_size: Number of bytes fetched from the end of the object in the first request.
+    :return:
+    """
+    f = RangeFile(size, fetch)
+    tail_start = max(0, size - footer_prefetch_size)
+    f.prefetch([(tail_start, size)])
+
+    f.seek(-8, 2)
+    footer_size = struct.unpack("<I", f.read(4))[0]
+    footer_start = size - footer_size - 8
+    if footer_start < tail_start:
+        f.prefetch([(footer_start, size)])  # Footer larger than the first request, must be one contiguous range.
+    return f
+
+
+def read_parquet_remote(
+        size: int,
+        fetch: Fetch,
+        columns: Sequence[str] | None = None,
+        bbox: BoundingBox | None = None,
+        max_workers: int = 8,
+        coalesce_gap: int = COALESCE_GAP,
+) -> pd.DataFrame:
+    """
+    Read remote parquet file, fetching only the footer and the column chunks needed.
+    Row groups outside of the bounding box are skipped using their statistics, column chunks
+    of the remaining row groups are fetched as coalesced byte ranges in parallel.
+    :param size: Size of the remote object.
+    :param fetch: Function fetching a byte range `[start, end)` of the remote object.
+    :param columns: Columns to read, all if None.
+    :param bbox: Bounding box to read rows from, all rows if None.
+    :param max_workers: Number of parallel requests.
+    :param coalesce_gap: Maximum gap between column chunks fetched in one request.
+    :return: Dataframe
+    """
+    f = open_remote_parquet(size, fetch)
+    pf = fastparquet.ParquetFile(f)
+
+    read_columns = None
+    if columns is not None:
+        read_columns = list(columns)
+        if bbox is not None:
+            read_columns = list(dict.fromkeys([*columns, "latitude", "longitude"]))
+
+    row_groups = pf.row_groups
+    if bbox is not None:
+        row_groups = filter_row_groups(pf, bbox.to_parquet_filters())
+
+    ranges = coalesce_ranges(column_chunk_ranges(pf, row_groups, read_columns), gap=coalesce_gap)
+    f.prefetch(ranges, max_workers=max_workers)
+    logger.debug(
+        "Fetched %d of %d bytes in %d requests for %d of %d row groups",
+        f.fetched_bytes, size, f.requests, len(row_groups), len(pf.row_groups),
+    )
+
+    if bbox is not None:
+        return read_parquet_bbox(f, bbox, columns)
+    return pf.to_pandas(columns=read_columns)
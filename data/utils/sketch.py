@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+import pandas as pd
+
+from data.utils.gridding import GridAggregator
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+class HistogramSketch:
+    """
+    Mergeable quantile sketch of values per cell of a regular lat/lon grid.
+    Values are counted in fixed width bins, stored sparsely as sorted keys of cell and bin, so memory
+    is bounded by the number of occupied cells times the number of bins regardless of the number of
+    values. Merging adds counts and is exact, the result does not depend on the order of updates.
+    Quantiles are interpolated linearly within a bin, so their error is below the bin width. Values
+    outside of the range are counted in the first or the last bin.
+    """
+    _grid: GridAggregator  # Cell indexing only.
+    _lower: float
+    _bin_width: float
+    _n_bins: int
+
+    keys: np.ndarray  # Sorted `cell * bins + bin` of non-empty bins.
+    counts: np.ndarray
+
+    def __init__(
+            self,
+            cell_size: float = 1.0,
+            lower: float = 350.0,
+            upper: float = 500.0,
+            bin_width: float = 0.25,
+    ) -> None:
+        """
+        Constructor.
+        :param cell_size: Grid cell size in degrees, see `GridAggregator`.
+        :param lower: Lower bound of the first bin.
+        :param upper: Upper bound of the last bin.
+        :param bin_width: Width of bins, bounds the error of quantiles.
+        """
+        self._grid = GridAggregator([], cell_size)
+        self._lower = lower
+        self._bin_width = bin_width
+        self._n_bins = int(np.ceil((upper - lower) / bin_width))
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def cell_size(self) -> float:
+        return self._grid.cell_size
+
+    def update(
+            self,
+            latitude: np.ndarray | pd.Series,
+            longitude: np.ndarray | pd.Series,
+            values: np.ndarray | pd.Series,
+    ) -> HistogramSketch:
+        """
+        Add values, NaN values and invalid coordinates are skipped.
+        :param latitude:
+        :param longitude:
+        :param values:
+        :return: self
+        """
+        cells = self._grid.cell_index(latitude, longitude)
+        values = np.asarray(values, dtype=np.float64)
+        valid = (cells >= 0) & ~np.isnan(values)
+
+        bins = np.clip(np.floor((values[valid] - self._lower) / self._bin_width), 0, self._n_bins - 1)
+        keys, counts = np.unique(cells[valid] * self._n_bins + bins.astype(np.int64), return_counts=True)
+        return self._add(keys, counts)
+
+    def merge(self, other: HistogramSketch) -> HistogramSketch:
+        """
+        Add counts of another sketch with the same grid and bins.
+        :param other:
+        :return: self
+        """
+        if (other.cell_size, other._lower, other._bin_width, other._n_bins) != \
+                (self.cell_size, self._lower, self._bin_width, self._n_bins):
+            raise ValueError("Only sketches of the same grid and bins can be merged")
+        return self._add(other.keys, other.counts)
+
+    def quantiles(self, quantiles: Sequence[float], prefix: str = "q") -> pd.DataFrame:
+        """
+        Approximate quantiles per occupied cell.
+        :param quantiles: Quantiles between 0 and 1.
+        :param prefix: Columns are named `<prefix><percent>`, e.g. `q50` for the median.
+        :return: Dataframe with `latitude`, `longitude`, quantile columns and `count` of values per cell.
+        """
+        cell_of_key = self.keys // self._n_bins
+        cells, starts = np.unique(cell_of_key, return_index=True)
+        ends = np.append(starts[1:], len(self.keys))[:len(starts)]
+
+        cumulative = np.cumsum(self.counts)
+        before = np.where(starts > 0, cumulative[starts - 1], 0)
+        totals = cumulative[ends - 1] - before
+
+        latitude, longitude = self._grid.cell_coordinates(cells)
+        data = {"latitude": latitude, "longitude": longitude}
+        for q in quantiles:
+            rank = before + q * totals
+            i = np.clip(np.searchsorted(cumulative, rank, side="left"), starts, ends - 1)
+            below = cumulative[i] - self.counts[i]
+            fraction = np.clip((rank - below) / self.counts[i], 0, 1)
+            data[f"{prefix}{q * 100:g}"] = self._lower + (self.keys[i] % self._n_bins + fraction) * self._bin_width
+        data["count"] = totals
+        return pd.DataFrame(data)
+
+    def to_state_frame(self) -> pd.DataFrame:
+        """
+        Non-empty bins, e.g. to be saved and merged into later.
+        :return: Dataframe with `latitude`, `longitude`, `bin` and `count`.
+        """
+        latitude, longitude = self._grid.cell_coordinates(self.keys // self._n_bins)
+        return pd.DataFrame({
+            "latitude": latitude,
+            "longitude": longitude,
+            "bin": (self.keys % self._n_bins).astype(np.int32),
+            "count": self.counts,
+        })
+
+    @classmethod
+    def from_state_frame(cls, df: pd.DataFrame, **kwargs) -> HistogramSketch:
+        """
+        Restore sketch saved by `to_state_frame`.
+        :param df:
+        :param kwargs: Arguments the sketch was constructed with.
+        :return:
+        """
+        sketch = cls(**kwargs)
+        cells = sketch._grid.cell_index(df["latitude"], df["longitude"])
+        if (cells < 0).any():
+            raise ValueError("State contains coordinates outside of the grid")
+
+        keys = cells * sketch._n_bins + df["bin"].to_numpy(dtype=np.int64)
+        return sketch._add(keys, df["count"].to_numpy(dtype=np.int64))
+
+    def _add(self, keys: np.ndarray, counts: np.ndarray) -> HistogramSketch:
+        keys, inverse = np.unique(np.concatenate([self.keys, keys]), return_inverse=True)
+        self.counts = np.bincount(inverse, weights=np.concatenate([self.counts, counts]), minlength=len(keys)) \
+            .astype(np.int64)
+        self.keys = keys
+        return self
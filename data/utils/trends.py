@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from collections.abc import Sequence
+
+
+class GridCube(NamedTuple):
+    latitude: np.ndarray  # (cells,)
+    longitude: np.ndarray  # (cells,)
+    time: np.ndarray  # (months,) decimal years of month midpoints.
+    values: np.ndarray  # (cells, months) NaN for missing months.
+
+
+class TrendFit(NamedTuple):
+    coefficients: np.ndarray  # (cells, parameters) see `design_matrix`, NaN for cells which were not fitted.
+    months: np.ndarray  # (cells,) number of months fitted.
+    rmse: np.ndarray  # (cells,) root mean square of residuals.
+
+    @property
+    def intercept(self) -> np.ndarray:
+        return self.coefficients[:, 0]
+
+    @property
+    def slope(self) -> np.ndarray:
+        """
+        Growth rate per year.
+        """
+        return self.coefficients[:, 1]
+
+    def amplitude(self, harmonic: int = 1) -> np.ndarray:
+        """
+        Amplitude of a seasonal harmonic, half of its peak to trough difference.
+        :param harmonic: 1 for the annual cycle, 2 for the semi-annual one etc.
+        :return:
+        """
+        sin, cos = self.coefficients[:, 2 * harmonic], self.coefficients[:, 2 * harmonic + 1]
+        return np.hypot(sin, cos)
+
+
+def grid_cube(df: pd.DataFrame, value_column: str = "xco2") -> GridCube:
+    """
+    Arrange monthly grid into a cube of cells by months.
+    :param df: Dataframe with `year`, `month`, `latitude`, `longitude` and the value column,
+        e.g. `monthly_avg_per_lat_lon`.
+    :param value_column:
+    :return:
+    """
+    month_key = (df["year"].to_numpy(dtype=np.int64) * 12 + df["month"].to_numpy(dtype=np.int64) - 1)
+    months, month_idx = np.unique(month_key, return_inverse=True)
+    cells, cell_idx = np.unique(
+        np.stack([df["latitude"].to_numpy(dtype=np.float64), df["longitude"].to_numpy(dtype=np.float64)], axis=1),
+        axis=0,
+        return_inverse=True,
+    )
+    cell_idx = cell_idx.ravel()
+
+    values = np.full((len(cells), len(months)), np.nan)
+    values[cell_idx, month_idx] = df[value_column].to_numpy(dtype=np.float64)
+    return GridCube(
+        latitude=cells[:, 0],
+        longitude=cells[:, 1],
+        time=months // 12 + (months % 12 + 0.5) / 12,
+        values=values,
+    )
+
+
+def design_matrix(time: np.ndarray, harmonics: int = 1, reference: float | None = None) -> np.ndarray:
+    """
+    Columns of intercept, linear trend and sine and cosine of every seasonal harmonic.
+    :param time: Decimal years.
+    :param harmonics: Number of seasonal harmonics.
+    :param reference: Time of the intercept, the first time if None.
+    :return: (times, 2 + 2 * harmonics)
+    """
+    if reference is None:
+        reference = time[0] if len(time) else 0.0
+    columns = [np.ones_like(time), time - reference]
+    for k in range(1, harmonics + 1):
+        columns += [np.sin(2 * np.pi * k * time), np.cos(2 * np.pi * k * time)]
+    return np.stack(columns, axis=1)
+
+
+def fit_trends(
+        cube: GridCube,
+        harmonics: int = 1,
+        min_months: int = 24,
+        reference: float | None = None,
+) -> TrendFit:
+    """
+    Least squares fit of trend and seasonal cycle of every cell at once.
+    Missing months are masked out of the normal equations of their cell, so every cell is solved
+    with its own months as one batch of small linear systems instead of a loop over cells.
+    :param cube:
+    :param harmonics: Number of seasonal harmonics.
+    :param min_months: Cells with fewer months are not fitted.
+    :param reference: Time of the intercept in decimal years, the first month if None.
+    :return:
+    """
+    x = design_matrix(cube.time, harmonics, reference)  # (months, parameters)
+    n_parameters = x.shape[1]
+    mask = ~np.isnan(cube.values)  # (cells, months)
+    weights = mask.astype(np.float64)
+    y = np.where(mask, cube.values, 0)
+
+    months = mask.sum(axis=1)
+    # Masked normal equations of all cells as two matrix products, X'WX from outer products of the rows of X.
+    outer = (x[:, :, None] * x[:, None, :]).reshape(len(x), n_parameters ** 2)
+    xtx = (weights @ outer).reshape(len(months), n_parameters, n_parameters)
+    xty = y @ x
+
+    # Cells with too few months, or months which do not determine all parameters, e.g. a single season.
+    fit = months >= max(min_months, n_parameters + 1)
+    eigenvalues = np.linalg.eigvalsh(xtx[fit])  # Symmetric, cheaper than the SVD of `np.linalg.cond`.
+    fit[fit] = eigenvalues[:, 0] > 1e-10 * eigenvalues[:, -1]
+
+    coefficients = np.full((len(months), n_parameters), np.nan)
+    coefficients[fit] = np.linalg.solve(xtx[fit], xty[fit, :, None])[:, :, 0]
+
+    with np.errstate(invalid="ignore"):
+        residuals = np.where(mask, cube.values - coefficients @ x.T, 0)
+        rmse = np.sqrt((residuals ** 2).sum(axis=1) / months)
+    rmse[~fit] = np.nan
+    return TrendFit(coefficients=coefficients, months=months, rmse=rmse)
+
+
+def trend_maps(
+        df: pd.DataFrame,
+        value_columns: Sequence[str] = ("xco2",),
+        harmonics: int = 1,
+        min_months: int = 24,
+) -> pd.DataFrame:
+    """
+    Trend and seasonal amplitude per cell of a monthly grid.
+    :param df: See `grid_cube`.
+    :param value_columns:
+    :param harmonics: See `fit_trends`.
+    :param min_months: See `fit_trends`.
+    :return: Dataframe with `latitude`, `longitude` and `<column>_slope` (per year), `<column>_amplitude`
+        (of the annual cycle), `<column>_rmse` and `<column>_months` of each value column.
+        Only cells fitted for at least one value column are included.
+    """
+    data = {}
+    fitted = None
+    for column in value_columns:
+        cube = grid_cube(df, column)
+        trend_fit = fit_trends(cube, harmonics=harmonics, min_months=min_months)
+        data.update({
+            "latitude": cube.latitude,
+            "longitude": cube.longitude,
+            f"{column}_slope": trend_fit.slope,
+            f"{column}_amplitude": trend_fit.amplitude(),
+            f"{column}_rmse": trend_fit.rmse,
+            f"{column}_months": trend_fit.months,
+        })
+        is_fitted = ~np.isnan(trend_fit.slope)
+        fitted = is_fitted if fitted is None else fitted | is_fitted
+
+    result = pd.DataFrame(data)
+    return result[fitted].reset_index(drop=True) if fitted is not None else result
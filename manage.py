@@ -4,6 +4,7 @@ import typer
 from typing_extensions import Annotated
 
 from data.extractors.utils import OpendapExtractorChoices
+from data.utils.interpolation import WeightingChoices
 
 
 logging.basicConfig(
@@ -47,7 +48,12 @@ def dash_app() -> None:
 
 
 @app.command()
-def analyse() -> None:
+def analyse(
+        incremental: Annotated[
+            bool, typer.Option(help="Calculate daily averages only for new or changed dates"),
+        ] = False,
+        workers: Annotated[int, typer.Option(help="Number of worker processes")] = 1,
+) -> None:
     """
     Run utility function.
     """
@@ -58,8 +64,129 @@ def analyse() -> None:
     settings = get_app_settings()
     loader = S3ParquetLoader(settings)
 
-    oco2_daily_avg(loader)
-    monthly_avg_per_lat_lon(loader)
+    oco2_daily_avg(loader, incremental=incremental, workers=workers)
+    monthly_avg_per_lat_lon(loader, workers=workers)
+
+
+@app.command()
+def climatology(
+        rebuild: Annotated[bool, typer.Option(help="Discard folded months and fold all closed months again")] = False,
+) -> None:
+    """
+    Update climatology and anomalies of monthly averages per latitude and longitude.
+    """
+    from data.analyse import monthly_climatology
+    from data.conf import get_app_settings
+    from data.loaders.s3_parquet_loader import S3ParquetLoader
+
+    settings = get_app_settings()
+    loader = S3ParquetLoader(settings)
+
+    folded = monthly_climatology(loader, rebuild=rebuild)
+    typer.echo(f"Folded {len(folded)} months: {', '.join(f'{y:04d}-{m:02d}' for y, m in folded)}")
+
+
+@app.command()
+def trends(
+        min_months: Annotated[int, typer.Option(help="Minimum number of months of a cell to fit")] = 24,
+) -> None:
+    """
+    Fit trend and seasonal amplitude of monthly averages per latitude and longitude.
+    """
+    from data.analyse import monthly_trends
+    from data.conf import get_app_settings
+    from data.loaders.s3_parquet_loader import S3ParquetLoader
+
+    settings = get_app_settings()
+    loader = S3ParquetLoader(settings)
+
+    monthly_trends(loader, min_months=min_months)
+
+
+@app.command()
+def fill_gaps(
+        weighting: Annotated[WeightingChoices, typer.Option(help="Weights of nearest cells")] = WeightingChoices.idw,
+        max_distance: Annotated[float, typer.Option(help="Maximum distance to occupied cells in km")] = 500.0,
+) -> None:
+    """
+    Fill empty cells of monthly averages per latitude and longitude by interpolation.
+    """
+    from data.analyse import monthly_gap_filled
+    from data.conf import get_app_settings
+    from data.loaders.s3_parquet_loader import S3ParquetLoader
+
+    settings = get_app_settings()
+    loader = S3ParquetLoader(settings)
+
+    monthly_gap_filled(loader, weighting=weighting.value, max_distance_km=max_distance)
+
+
+@app.command()
+def stations(
+        directory: Annotated[str, typer.Argument(help="Directory of NOAA event files")],
+        workers: Annotated[int, typer.Option(help="Number of worker processes")] = 1,
+) -> None:
+    """
+    Calculate daily averages of NOAA station event files.
+    """
+    from data.analyse import stations_daily_avg
+    from data.conf import get_app_settings
+    from data.loaders.s3_parquet_loader import S3ParquetLoader
+
+    settings = get_app_settings()
+    loader = S3ParquetLoader(settings)
+
+    df = stations_daily_avg(loader, directory, workers=workers)
+    typer.echo(f"{len(df)} daily averages of {df['station'].nunique()} stations")
+
+
+@app.command()
+def compact(
+        month: Annotated[str, typer.Argument(help="Month in format YYYY-MM, all closed months if empty")] = "",
+        force: Annotated[bool, typer.Option(help="Compact again even if the month is already compacted")] = False,
+) -> None:
+    """
+    Compact daily files into monthly files.
+    """
+    from data.analyse import GLOBAL_DATE_START
+    from data.etl.utils import archive_factory
+
+    archive = archive_factory()
+    if month:
+        year, month_ = map(int, month.split("-"))
+        archive.compact_month(year, month_, force=force)
+    else:
+        archive.compact_closed_months(GLOBAL_DATE_START)
+
+
+@app.command()
+def query(
+        sql: Annotated[str, typer.Argument(help="SQL query, daily soundings are available as view `soundings`")],
+        source: Annotated[
+            str, typer.Option(help="Local directory or s3:// URL, S3 bucket from settings if empty"),
+        ] = "",
+        output: Annotated[str, typer.Option(help="Save result to CSV file instead of printing it")] = "",
+) -> None:
+    """
+    Run SQL query over the parquet archive.
+    """
+    from data.conf import get_app_settings
+    from data.query_engine import QueryEngine
+
+    if source and not source.startswith("s3://"):
+        engine = QueryEngine(source)  # Local archive does not need credentials.
+    elif source:
+        engine = QueryEngine(source, settings=get_app_settings())
+    else:
+        engine = QueryEngine.from_settings(get_app_settings())
+
+    with engine:
+        df = engine.query(sql)
+
+    if output:
+        df.to_csv(output, index=False)
+    else:
+        typer.echo(df.to_string(index=False))
 
 
 if __name__ == "__main__":
@@ -1,3 +1,9 @@
+from __future__ import annotations
+
+from typing import Callable
+
+import netCDF4 as nc
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -46,3 +52,42 @@ def dummy_df() -> pd.DataFrame:
         "longitude": [0.1, 0.0, -0.1],
         "xco2": [420.1, 420.0, 420.1],
     })
+
+
+@pytest.fixture
+def noaa_event_file(tmp_path) -> Callable[..., str]:
+    """
+    Factory of NOAA event files, with character `datetime` or numeric `time` variable.
+    :return:
+    """
+    def write(
+            name: str,
+            times: list[str],
+            values: list[float],
+            qcflags: list[str],
+            site_code: str | None = None,
+            numeric_time: bool = False,
+    ) -> str:
+        path = str(tmp_path / name)
+        with nc.Dataset(path, "w") as dataset:
+            if site_code is not None:
+                dataset.site_code = site_code
+            dataset.createDimension("obs", len(times))
+            dataset.createDimension("datetime_strlen", 20)
+            dataset.createDimension("qcflag_strlen", 3)
+
+            if numeric_time:
+                time = dataset.createVariable("time", "f8", ("obs",))
+                time.units = "seconds since 1970-01-01T00:00:00Z"
+                time[:] = pd.to_datetime(times).tz_localize(None).astype("datetime64[s]").astype(np.int64)
+            else:
+                dataset.createVariable("datetime", "S1", ("obs", "datetime_strlen"))[:] = nc.stringtochar(
+                    np.array(times, dtype="S20"),
+                )
+            dataset.createVariable("value", "f4", ("obs",), fill_value=-999.99)[:] = np.ma.masked_invalid(values)
+            dataset.createVariable("qcflag", "S1", ("obs", "qcflag_strlen"))[:] = nc.stringtochar(
+                np.array(qcflags, dtype="S3"),
+            )
+        return path
+
+    return write
@@ -0,0 +1,92 @@
+import pandas as pd
+import pytest
+
+from data.loaders.base_loader import BaseLoader
+from data.loaders.cached_loader import CachedLoader
+
+
+class CountingLoader(BaseLoader):
+
+    def __init__(self) -> None:
+        self.dfs = {}
+        self.retrieve_count = 0
+
+    def save_dataframe(self, df: pd.DataFrame, file_name: str) -> None:
+        self.dfs[file_name] = df.copy()
+
+    def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
+        self.retrieve_count += 1
+        return self.dfs[file_name].copy()
+
+
+class TestCachedLoader:
+    @pytest.fixture
+    def inner_loader(self) -> CountingLoader:
+        return CountingLoader()
+
+    # noinspection DuplicatedCode
+    def test_loader_workflow(self, dummy_df, inner_loader):
+        loader = CachedLoader(inner_loader, max_size=1024 ** 2)
+
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.csv")
+        loaded_df = loader.retrieve_dataframe(file_name="2024-01-01.csv")
+        loaded_df["xco2"] = 0.0  # Modifying returned dataframe does not corrupt the cache.
+        loaded_df = loader.retrieve_dataframe(file_name="2024-01-01.csv")
+
+        pd.testing.assert_frame_equal(loaded_df, dummy_df)
+        assert inner_loader.retrieve_count == 1
+        assert loader.stats()["hits"] == 1 and loader.stats()["misses"] == 1
+
+    def test_save_dataframe_invalidates_entry(self, dummy_df, inner_loader):
+        loader = CachedLoader(inner_loader, max_size=1024 ** 2)
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.csv")
+        loader.retrieve_dataframe(file_name="2024-01-01.csv")
+
+        loader.save_dataframe(dummy_df.iloc[:1], file_name="2024-01-01.csv")
+        loaded_df = loader.retrieve_dataframe(file_name="2024-01-01.csv")
+
+        assert len(loaded_df) == 1
+        assert inner_loader.retrieve_count == 2
+
+    def test_save_during_retrieve_is_not_cached(self, dummy_df, inner_loader, monkeypatch):
+        loader = CachedLoader(inner_loader, max_size=1024 ** 2)
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.csv")
+        retrieve = inner_loader.retrieve_dataframe
+
+        def retrieve_then_save(file_name: str) -> pd.DataFrame:
+            df = retrieve(file_name)
+            monkeypatch.setattr(inner_loader, "retrieve_dataframe", retrieve)
+            loader.save_dataframe(dummy_df.iloc[:1], file_name)  # Concurrent save finishing after the read.
+            return df
+
+        monkeypatch.setattr(inner_loader, "retrieve_dataframe", retrieve_then_save)
+        assert len(loader.retrieve_dataframe(file_name="2024-01-01.csv")) == len(dummy_df)
+
+        assert len(loader.retrieve_dataframe(file_name="2024-01-01.csv")) == 1
+
+    def test_lru_eviction_by_memory_size(self, dummy_df, inner_loader, monkeypatch):
+        df_size = int(dummy_df.memory_usage(index=True, deep=True).sum())
+        loader = CachedLoader(inner_loader, max_size=2 * df_size)
+        monkeypatch.setattr(inner_loader, "retrieve_dataframe", lambda _name: dummy_df)
+
+        loader.retrieve_dataframe("a")
+        loader.retrieve_dataframe("b")
+        loader.retrieve_dataframe("a")
+        loader.retrieve_dataframe("c")  # Evicts "b".
+
+        assert list(loader._entries) == ["a", "c"]
+        assert loader.stats() == {"hits": 1, "misses": 3, "entries": 2, "size": 2 * df_size}
+
+    def test_ttl(self, dummy_df, inner_loader, monkeypatch):
+        loader = CachedLoader(inner_loader, max_size=1024 ** 2, ttl=10)
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.csv")
+        now = 1000.0
+        monkeypatch.setattr("time.monotonic", lambda: now)
+
+        loader.retrieve_dataframe(file_name="2024-01-01.csv")
+        now += 5
+        loader.retrieve_dataframe(file_name="2024-01-01.csv")
+        now += 10
+        loader.retrieve_dataframe(file_name="2024-01-01.csv")
+
+        assert inner_loader.retrieve_count == 2
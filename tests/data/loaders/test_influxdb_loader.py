@@ -4,6 +4,7 @@ from testcontainers.core.container import DockerContainer
 from testcontainers.core.waiting_utils import wait_for_logs
 
 from data.loaders.influxdb_loader import InfluxDBLoader
+from data.utils.geo import BoundingBox
 
 
 @pytest.mark.integration
@@ -41,25 +42,121 @@ class TestInfluxDBLoader:
             "xco2": [420.0, 421.0],
         })
 
-        loader = InfluxDBLoader(settings=dummy_settings)
-        loader.save_dataframe(df=dummy_df, file_name="2024-01-01")
-        loaded_df = loader.retrieve_dataframe_for_date_range(
-            dt_from=pd.to_datetime("2024-01-01T01:30", utc=True),
-            dt_to=pd.to_datetime("2024-01-01T02:30", utc=True),
-        )
+        with InfluxDBLoader(settings=dummy_settings) as loader:
+            loader.save_dataframe(df=dummy_df, file_name="2024-01-01")
+            loaded_df = loader.retrieve_dataframe_for_date_range(
+                dt_from=pd.to_datetime("2024-01-01T01:30", utc=True),
+                dt_to=pd.to_datetime("2024-01-01T02:30", utc=True),
+            )
         loaded_df = loaded_df.reset_index(drop=True)
 
         pd.testing.assert_frame_equal(loaded_df, expected_df, check_like=True)
 
+    def test_loader_workflow__batching(self, influxdb_container, dummy_settings, dummy_df):
+        with InfluxDBLoader(settings=dummy_settings, batching=True, batch_size=2, enable_gzip=True) as loader:
+            loader.save_dataframe(df=dummy_df, file_name="2024-01-01")
+            loader.flush()
+            loaded_df = loader.retrieve_dataframe_for_date_range(
+                dt_from=pd.to_datetime("2024-01-01T00:00", utc=True),
+                dt_to=pd.to_datetime("2024-01-01T04:00", utc=True),
+            )
+
+        assert len(loaded_df) == len(dummy_df)
+
     def test_retrieve_dataframe__works_with_empty_result(self, influxdb_container, dummy_settings, dummy_df):
         assert isinstance(dummy_df, pd.DataFrame) and len(dummy_df) > 0  # Sanity check
 
-        loader = InfluxDBLoader(settings=dummy_settings)
-        loader.save_dataframe(df=dummy_df, file_name="2024-01-01")
-        loaded_df = loader.retrieve_dataframe_for_date_range(
-            dt_from=pd.to_datetime("2020-01-01T00:00", utc=True),
-            dt_to=pd.to_datetime("2020-01-01T01:00", utc=True),
-        )
+        with InfluxDBLoader(settings=dummy_settings) as loader:
+            loader.save_dataframe(df=dummy_df, file_name="2024-01-01")
+            loaded_df = loader.retrieve_dataframe_for_date_range(
+                dt_from=pd.to_datetime("2020-01-01T00:00", utc=True),
+                dt_to=pd.to_datetime("2020-01-01T01:00", utc=True),
+            )
         loaded_df = loaded_df.reset_index(drop=True)
 
         assert loaded_df.empty
+
+    def test_iter_dataframe_for_date_range(self, influxdb_container, dummy_settings):
+        dummy_df = pd.DataFrame({
+            "_time": pd.date_range("2023-05-01", periods=50, freq="3h", tz="UTC"),
+            "latitude": 1.0,
+            "longitude": 2.0,
+            "xco2": 420.0,
+        })
+
+        with InfluxDBLoader(settings=dummy_settings) as loader:
+            loader.save_dataframe(df=dummy_df, file_name="2023-05")
+            chunks = list(loader.iter_dataframe_for_date_range(
+                dt_from=pd.to_datetime("2023-05-01", utc=True),
+                dt_to=pd.to_datetime("2023-05-08", utc=True),
+                chunk_size=3,
+                max_workers=2,
+            ))
+
+        assert max(len(_c) for _c in chunks) == 3
+        loaded_df = pd.concat(chunks, ignore_index=True)
+        pd.testing.assert_series_equal(loaded_df["_time"], dummy_df["_time"], check_dtype=False)
+
+    def test_retrieve_daily_mean(self, influxdb_container, dummy_settings):
+        dummy_df = pd.DataFrame({
+            "_time": pd.to_datetime(["2023-06-01T01:00", "2023-06-01T02:00", "2023-06-02T01:00"], utc=True),
+            "latitude": [48.0, 10.0, 48.5],
+            "longitude": [17.0, 10.0, 18.0],
+            "xco2": [410.0, 420.0, 412.0],
+        })
+
+        with InfluxDBLoader(settings=dummy_settings) as loader:
+            loader.save_dataframe(df=dummy_df, file_name="2023-06")
+            daily_df = loader.retrieve_daily_mean(
+                dt_from=pd.to_datetime("2023-06-01", utc=True),
+                dt_to=pd.to_datetime("2023-06-03", utc=True),
+            )
+            daily_sk_df = loader.retrieve_daily_mean(
+                dt_from=pd.to_datetime("2023-06-01", utc=True),
+                dt_to=pd.to_datetime("2023-06-03", utc=True),
+                bbox=BoundingBox(lat_min=47.7, lat_max=49.6, lon_min=16.8, lon_max=22.6),
+            )
+
+        assert daily_df["xco2"].tolist() == [415.0, 412.0]
+        assert daily_sk_df["xco2"].tolist() == [410.0, 412.0]
+        assert daily_df["_time"].tolist() == pd.to_datetime(["2023-06-01", "2023-06-02"], utc=True).tolist()
+
+    def test_retrieve_monthly_mean_per_cell(self, influxdb_container, dummy_settings):
+        dummy_df = pd.DataFrame({
+            "_time": pd.to_datetime(
+                ["2023-07-01T01:00", "2023-07-02T02:00", "2023-07-03T01:00", "2023-07-04T01:00"], utc=True,
+            ),
+            "latitude": [48.1, 47.9, 10.0, 10.5],  # Halves are rounded to even.
+            "longitude": [17.2, 16.8, 10.0, 10.5],
+            "xco2": [410.0, 420.0, 430.0, 440.0],
+        })
+        expected_df = pd.DataFrame({
+            "year": [2023, 2023],
+            "month": [7, 7],
+            "latitude": [10.0, 48.0],
+            "longitude": [10.0, 17.0],
+            "xco2": [435.0, 415.0],
+        })
+
+        with InfluxDBLoader(settings=dummy_settings) as loader:
+            loader.save_dataframe(df=dummy_df, file_name="2023-07")
+            monthly_df = loader.retrieve_monthly_mean_per_cell(
+                dt_from=pd.to_datetime("2023-07-01", utc=True),
+                dt_to=pd.to_datetime("2023-08-01", utc=True),
+            )
+
+        pd.testing.assert_frame_equal(monthly_df, expected_df, check_dtype=False)
+
+
+def test_split_date_range():
+    windows = list(InfluxDBLoader._split_date_range(
+        pd.to_datetime("2024-01-01", utc=True),
+        pd.to_datetime("2024-01-03T12:00", utc=True),
+        pd.Timedelta(days=1),
+    ))
+
+    assert windows == [
+        (pd.to_datetime("2024-01-01", utc=True), pd.to_datetime("2024-01-02", utc=True)),
+        (pd.to_datetime("2024-01-02", utc=True), pd.to_datetime("2024-01-03", utc=True)),
+        (pd.to_datetime("2024-01-03", utc=True), pd.to_datetime("2024-01-03T12:00", utc=True)),
+    ]
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+import pytest
+
+from data.loaders.local_arrow_loader import LocalArrowLoader
+
+
+class TestLocalArrowLoader:
+
+    # noinspection DuplicatedCode
+    @pytest.mark.parametrize("compression", [None, "lz4", "zstd"])
+    def test_loader_workflow(self, dummy_df, tmp_path, compression):
+        assert isinstance(dummy_df, pd.DataFrame) and len(dummy_df) > 0  # Sanity check
+        file_name = str(tmp_path / "oco2_daily_avg.arrow")
+
+        loader = LocalArrowLoader(compression=compression)
+        loader.save_dataframe(dummy_df, file_name=file_name)
+        loaded_df = loader.retrieve_dataframe(file_name=file_name)
+
+        pd.testing.assert_frame_equal(loaded_df, dummy_df)
+        assert os.listdir(tmp_path) == ["oco2_daily_avg.arrow"]
+
+    def test_save_dataframe_replaces_mapped_file(self, dummy_df, tmp_path):
+        file_name = str(tmp_path / "oco2_daily_avg.arrow")
+        loader = LocalArrowLoader()
+        loader.save_dataframe(dummy_df, file_name=file_name)
+        loaded_df = loader.retrieve_dataframe(file_name=file_name)
+
+        loader.save_dataframe(dummy_df.iloc[:1], file_name=file_name)
+
+        pd.testing.assert_frame_equal(loaded_df, dummy_df)  # Previously mapped data stay valid.
+        assert len(loader.retrieve_dataframe(file_name=file_name)) == 1
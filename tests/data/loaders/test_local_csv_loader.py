@@ -18,3 +18,27 @@ class TestLocalCSVLoader:
         loaded_df = loaded_df.reset_index(drop=True)
 
         pd.testing.assert_frame_equal(loaded_df, dummy_df)
+
+    def test_files_are_stored_separately(self, dummy_df, local_csv_loader):
+        local_csv_loader.save_dataframe(dummy_df, file_name="2024-01-01.csv")
+        local_csv_loader.save_dataframe(dummy_df.head(1), file_name="2024-01-02.csv")
+        local_csv_loader.save_dataframe(dummy_df.tail(2), file_name="2024-01-01.csv")  # Overwrite.
+
+        pd.testing.assert_frame_equal(
+            local_csv_loader.retrieve_dataframe(file_name="2024-01-01.csv"),
+            dummy_df.tail(2).reset_index(drop=True),
+        )
+        pd.testing.assert_frame_equal(local_csv_loader.retrieve_dataframe(file_name="2024-01-02.csv"), dummy_df.head(1))
+        with pytest.raises(FileNotFoundError):
+            local_csv_loader.retrieve_dataframe(file_name="2024-01-03.csv")
+
+    @pytest.mark.parametrize("in_memory", [True, False])
+    def test_iter_dataframe(self, dummy_df, tmp_path, in_memory):
+        loader = LocalCSVLoader(in_memory=in_memory)
+        file_name = str(tmp_path / "2024-01-01.csv")
+        loader.save_dataframe(dummy_df, file_name=file_name)
+
+        chunks = list(loader.iter_dataframe(file_name, chunksize=2))
+
+        assert [len(chunk) for chunk in chunks] == [2, 1]
+        pd.testing.assert_frame_equal(pd.concat(chunks), dummy_df)
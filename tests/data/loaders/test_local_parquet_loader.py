@@ -0,0 +1,87 @@
+import fastparquet
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.loaders.local_parquet_loader import LocalParquetLoader
+from data.utils.geo import BoundingBox
+from data.utils.parquet import ParquetOptions
+
+
+class TestLocalParquetLoader:
+    @pytest.fixture
+    def soundings_df(self) -> pd.DataFrame:
+        n = 10_000
+        rng = np.random.default_rng(42)
+        return pd.DataFrame({
+            "_time": pd.date_range("2024-01-01", periods=n, freq="s", tz="UTC"),
+            "latitude": rng.uniform(-90, 90, n),
+            "longitude": rng.uniform(-180, 180, n),
+            "xco2": rng.uniform(400, 430, n),
+        })
+
+    # noinspection DuplicatedCode
+    def test_loader_workflow(self, dummy_df, tmp_path):
+        assert isinstance(dummy_df, pd.DataFrame) and len(dummy_df) > 0  # Sanity check
+        file_name = str(tmp_path / "2024-01-01.gzip")
+
+        loader = LocalParquetLoader()
+        loader.save_dataframe(dummy_df, file_name=file_name)
+        loaded_df = loader.retrieve_dataframe(file_name=file_name)
+
+        pd.testing.assert_frame_equal(loaded_df, dummy_df)
+
+    def test_retrieve_dataframe_for_bbox(self, soundings_df, tmp_path):
+        file_name = str(tmp_path / "2024-01-01.gzip")
+        bbox = BoundingBox(lat_min=36, lat_max=71, lon_min=9, lon_max=45)
+        expected_df = soundings_df \
+            .loc[bbox.mask(soundings_df["latitude"], soundings_df["longitude"])] \
+            .sort_values("_time", ignore_index=True)
+
+        loader = LocalParquetLoader(ParquetOptions(row_group_size=500), spatial_sort=True)
+        loader.save_dataframe(soundings_df, file_name=file_name)
+        loaded_df = loader.retrieve_dataframe_for_bbox(file_name, bbox).sort_values("_time", ignore_index=True)
+
+        pd.testing.assert_frame_equal(loaded_df, expected_df)
+
+    def test_spatial_sort_allows_row_group_pruning(self, soundings_df, tmp_path):
+        file_name = str(tmp_path / "2024-01-01.gzip")
+        bbox = BoundingBox(lat_min=47.7, lat_max=49.6, lon_min=16.8, lon_max=22.6)
+
+        loader = LocalParquetLoader(ParquetOptions(row_group_size=500), spatial_sort=True)
+        loader.save_dataframe(soundings_df, file_name=file_name)
+        pf = fastparquet.ParquetFile(file_name)
+
+        assert len(pf.row_groups) > 1
+        assert len(pf.to_pandas(filters=bbox.to_parquet_filters())) < len(soundings_df) // 4
+
+    @pytest.mark.parametrize("engine", ["fastparquet", "pyarrow"])
+    @pytest.mark.parametrize("compression,compression_level", [
+        ("gzip", None), ("gzip", 9), ("zstd", None), ("zstd", 3), ("snappy", None), ("lz4", None), (None, None),
+    ])
+    def test_parquet_options(self, soundings_df, tmp_path, engine, compression, compression_level):
+        file_name = str(tmp_path / "2024-01-01.parquet")
+        options = ParquetOptions(
+            engine=engine,
+            compression=compression,
+            compression_level=compression_level,
+            row_group_size=2_500,
+        )
+
+        loader = LocalParquetLoader(options)
+        loader.save_dataframe(soundings_df, file_name=file_name)
+        loaded_df = loader.retrieve_dataframe(file_name=file_name)
+        pf = fastparquet.ParquetFile(file_name)
+
+        pd.testing.assert_frame_equal(loaded_df, soundings_df)
+        assert len(pf.row_groups) == 4
+        # Files must stay readable by the other engine, e.g. for bounding box reads.
+        pd.testing.assert_frame_equal(
+            pd.read_parquet(file_name, engine="pyarrow" if engine == "fastparquet" else "fastparquet"),
+            soundings_df,
+        )
+
+    def test_parquet_options_unsupported_level(self, soundings_df, tmp_path):
+        loader = LocalParquetLoader(ParquetOptions(compression="snappy", compression_level=1))
+        with pytest.raises(ValueError):
+            loader.save_dataframe(soundings_df, file_name=str(tmp_path / "2024-01-01.parquet"))
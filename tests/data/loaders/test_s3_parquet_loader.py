@@ -0,0 +1,83 @@
+import io
+import pickle
+
+import pandas as pd
+import pytest
+
+from data.loaders.s3_parquet_loader import S3ParquetLoader
+from data.services.dummy_s3 import DummyS3Service
+
+
+class TestS3ParquetLoader:
+    @pytest.fixture
+    def s3_service(self) -> DummyS3Service:
+        return DummyS3Service()
+
+    @pytest.fixture
+    def loader(self, dummy_settings, s3_service) -> S3ParquetLoader:
+        return S3ParquetLoader(dummy_settings, s3_service=s3_service)
+
+    # noinspection DuplicatedCode
+    def test_loader_workflow(self, dummy_df, loader):
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+        loaded_df = loader.retrieve_dataframe(file_name="2024-01-01.gzip")
+
+        pd.testing.assert_frame_equal(loaded_df, dummy_df)
+
+    def test_unchanged_upload_is_skipped(self, dummy_df, loader, s3_service):
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+        loader.save_dataframe(dummy_df.head(2), file_name="2024-01-01.gzip")
+
+        assert s3_service.client.calls["upload_fileobj"] == 2
+        assert loader.stats() == {"uploads": 2, "skipped_uploads": 1}
+        pd.testing.assert_frame_equal(loader.retrieve_dataframe(file_name="2024-01-01.gzip"), dummy_df.head(2))
+
+    def test_unchanged_upload_without_checksum_is_skipped(self, dummy_df, loader, s3_service):
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+        buf = io.BytesIO()
+        s3_service.download_file_obj(buf, "2024-01-01.gzip")
+        s3_service.put_object("2024-01-01.gzip", buf.getvalue())  # Uploaded before checksums, ETag only.
+
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+
+        assert loader.stats() == {"uploads": 1, "skipped_uploads": 1}
+
+    def test_skip_unchanged_disabled(self, dummy_settings, dummy_df, s3_service):
+        loader = S3ParquetLoader(dummy_settings, skip_unchanged=False, s3_service=s3_service)
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+
+        assert s3_service.client.calls["upload_fileobj"] == 2
+        assert s3_service.client.calls["head_object"] == 0
+
+    def test_retrieve_dataframe_partial(self, dummy_df, loader, s3_service):
+        loader.save_dataframe(dummy_df, file_name="2024-01-01.gzip")
+
+        df = loader.retrieve_dataframe_partial("2024-01-01.gzip", columns=["xco2"])
+
+        pd.testing.assert_frame_equal(df, dummy_df[["xco2"]])
+        assert s3_service.client.calls["download_fileobj"] == 0
+        assert s3_service.client.calls["get_object"] == 1  # Small object is covered by the footer request.
+        with pytest.raises(FileNotFoundError):
+            loader.retrieve_dataframe_partial("2024-01-02.gzip")
+
+    def test_pickle(self, dummy_settings):
+        settings = dummy_settings.model_copy(update={"aws_region": "eu-central-1"})
+        loader = pickle.loads(pickle.dumps(S3ParquetLoader(settings)))
+
+        assert loader._s3_service.client.meta.service_model.service_name == "s3"
+
+    def test_get_versions(self, dummy_df, loader, s3_service):
+        s3_service.client.max_keys = 2  # Several pages.
+        file_names = [f"2024-01-0{day}.gzip" for day in range(1, 6)]
+        for file_name in file_names[:4]:
+            loader.save_dataframe(dummy_df, file_name=file_name)
+        expected = {file_name: loader.get_version(file_name) for file_name in file_names}
+        s3_service.client.calls.clear()
+
+        versions = loader.get_versions(file_names)
+
+        assert versions == expected and versions[file_names[4]] is None
+        assert s3_service.client.calls["list_objects_v2"] == 2  # Two pages of two objects.
+        assert s3_service.client.calls["head_object"] == 0
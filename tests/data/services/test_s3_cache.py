@@ -0,0 +1,60 @@
+import io
+import os
+
+import pytest
+
+from data.services.dummy_s3 import DummyS3Service
+from data.services.s3_cache import S3DiskCache
+
+
+class TestS3DiskCache:
+    @pytest.fixture
+    def s3_service(self, tmp_path) -> DummyS3Service:
+        return DummyS3Service(cache=S3DiskCache(str(tmp_path / "cache"), max_size=100))
+
+    @staticmethod
+    def download(s3_service: DummyS3Service, object_name: str) -> bytes:
+        buf = io.BytesIO()
+        s3_service.download_file_obj(buf, object_name)
+        return buf.getvalue()
+
+    def test_read_through(self, s3_service):
+        s3_service.put_object("2024-01-01.gzip", b"a" * 10)
+
+        assert self.download(s3_service, "2024-01-01.gzip") == b"a" * 10
+        assert self.download(s3_service, "2024-01-01.gzip") == b"a" * 10
+
+        assert s3_service.client.calls["download_fileobj"] == 1
+        assert s3_service.cache.stats() == {"hits": 1, "misses": 1, "size": 10}
+
+    def test_changed_object_is_downloaded_again(self, s3_service):
+        s3_service.put_object("2024-01-01.gzip", b"a" * 10)
+        self.download(s3_service, "2024-01-01.gzip")
+        s3_service.put_object("2024-01-01.gzip", b"b" * 20)
+
+        assert self.download(s3_service, "2024-01-01.gzip") == b"b" * 20
+        assert s3_service.cache.stats() == {"hits": 0, "misses": 2, "size": 20}  # Stale version removed.
+
+    def test_lru_eviction(self, s3_service):
+        for _name in ("a", "b", "c"):
+            s3_service.put_object(_name, _name.encode() * 40)
+
+        self.download(s3_service, "a")
+        self.download(s3_service, "b")
+        os.utime(s3_service.cache._entry_path("b", s3_service.get_etag("b")), (0, 0))  # "b" least recent.
+        self.download(s3_service, "a")
+        self.download(s3_service, "c")  # Exceeds 100 bytes, evicts "b".
+        self.download(s3_service, "a")
+
+        assert s3_service.cache.stats() == {"hits": 2, "misses": 3, "size": 80}
+        self.download(s3_service, "b")
+        assert s3_service.cache.misses == 4
+
+    def test_object_larger_than_cache_is_not_cached(self, s3_service):
+        s3_service.put_object("big", b"x" * 101)
+
+        assert self.download(s3_service, "big") == b"x" * 101
+        assert self.download(s3_service, "big") == b"x" * 101
+
+        assert s3_service.cache.stats() == {"hits": 0, "misses": 2, "size": 0}
+        assert os.listdir(s3_service.cache._directory) == []
@@ -0,0 +1,288 @@
+import datetime as dt
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data import analyse
+from data.loaders.local_parquet_loader import LocalParquetLoader
+from data.loaders.s3_parquet_loader import S3ParquetLoader
+from data.services.dummy_s3 import DummyS3Service
+
+
+class CountingParquetLoader(LocalParquetLoader):
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.retrieved = []
+
+    def retrieve_dataframe(self, file_name: str) -> pd.DataFrame:
+        self.retrieved.append(file_name)
+        return super().retrieve_dataframe(file_name)
+
+
+class TestOco2DailyAvg:
+    TODAY = dt.date(2024, 2, 2)
+
+    @pytest.fixture
+    def dates(self, tmp_path, monkeypatch) -> list[dt.date]:
+        monkeypatch.chdir(tmp_path)
+        # Dates of two months, so they are split into more than one batch of the map step.
+        monkeypatch.setattr(analyse, "GLOBAL_DATE_START", dt.date(2024, 1, 30))
+        return [dt.date(2024, 1, 30), dt.date(2024, 1, 31), dt.date(2024, 2, 1)]
+
+    @staticmethod
+    def save_day(loader, date: dt.date, xco2: float) -> None:
+        rng = np.random.default_rng(42)
+        loader.save_dataframe(pd.DataFrame({
+            "_time": pd.Timestamp(date, tz="UTC") + pd.to_timedelta(np.arange(100), unit="min"),
+            "latitude": rng.uniform(-90, 90, 100),
+            "longitude": rng.uniform(-180, 180, 100),
+            "xco2": np.full(100, xco2),
+        }), f"{date.isoformat()}.gzip")
+
+    def test_incremental(self, dates):
+        loader = CountingParquetLoader()
+        self.save_day(loader, dates[0], 410.0)
+        self.save_day(loader, dates[1], 411.0)
+
+        analyse.oco2_daily_avg(loader, incremental=True, today=self.TODAY)  # No previous result.
+        self.save_day(loader, dates[2], 412.0)  # New date.
+        self.save_day(loader, dates[0], 420.0)  # Changed date.
+        os.utime(f"{dates[0].isoformat()}.gzip", ns=(0, 0))
+        loader.retrieved.clear()
+        analyse.oco2_daily_avg(loader, incremental=True, today=self.TODAY)
+
+        assert sorted(f for f in loader.retrieved if f[0].isdigit()) == [
+            f"{dates[0].isoformat()}.gzip", f"{dates[2].isoformat()}.gzip",
+        ]
+        df = loader.retrieve_dataframe("oco2_daily_avg.gzip")
+        assert df["_date"].tolist() == [d.isoformat() for d in dates]
+        assert df["xco2"].tolist() == [420.0, 411.0, 412.0]
+
+    def test_versions_listed_in_bulk(self, dates, dummy_settings):
+        s3_service = DummyS3Service()
+        loader = S3ParquetLoader(dummy_settings, s3_service=s3_service)
+        for i, date in enumerate(dates):
+            self.save_day(loader, date, 410.0 + i)
+        s3_service.client.calls.clear()
+
+        analyse.oco2_daily_avg(loader, incremental=True, today=self.TODAY)
+        analyse.oco2_daily_avg(loader, incremental=True, today=self.TODAY)
+
+        assert s3_service.client.calls["list_objects_v2"] == 2
+        # Only the unchanged checks of the four saved results, no request per date.
+        assert s3_service.client.calls["head_object"] == 4
+
+    def test_workers(self, dates):
+        loader = LocalParquetLoader()
+        for i, date in enumerate(dates):
+            self.save_day(loader, date, 410.0 + i)
+
+        analyse.oco2_daily_avg(loader, today=self.TODAY)
+        expected_df = loader.retrieve_dataframe("oco2_daily_avg.gzip")
+        assert len(analyse._month_batches(dates)) > 1  # Otherwise mapped in process.
+        analyse.oco2_daily_avg(loader, workers=2, today=self.TODAY)
+
+        pd.testing.assert_frame_equal(loader.retrieve_dataframe("oco2_daily_avg.gzip"), expected_df)
+
+    def test_incremental_matches_full(self, dates):
+        loader = LocalParquetLoader()
+        for i, date in enumerate(dates):
+            self.save_day(loader, date, 410.0 + i)
+
+        analyse.oco2_daily_avg(loader, today=self.TODAY)
+        full_df = loader.retrieve_dataframe("oco2_daily_avg.gzip")
+        analyse.oco2_daily_avg(loader, incremental=True, today=self.TODAY)
+
+        pd.testing.assert_frame_equal(loader.retrieve_dataframe("oco2_daily_avg.gzip"), full_df)
+
+
+class TestMonthlyAvgPerLatLon:
+    def test_matches_groupby(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        today = dt.date.today()
+        monkeypatch.setattr(analyse, "GLOBAL_DATE_START", today - dt.timedelta(days=40))
+        loader = CountingParquetLoader()
+        rng = np.random.default_rng(42)
+        dfs = []
+        for i in (40, 39, 2, 1):
+            date = today - dt.timedelta(days=i)
+            n = 5_000
+            df = pd.DataFrame({
+                "_time": pd.Timestamp(date, tz="UTC") + pd.to_timedelta(rng.uniform(0, 86_399, n), unit="s"),
+                "latitude": rng.uniform(-3, 3, n),
+                "longitude": rng.uniform(-3, 3, n),
+                "xco2": rng.uniform(400, 430, n),
+            })
+            df.loc[df.index[:100], "xco2"] = np.nan
+            loader.save_dataframe(df, f"{date.isoformat()}.gzip")
+            dfs.append(df)
+
+        analyse.monthly_avg_per_lat_lon(loader, workers=2)
+
+        # Reference implementation, concatenating all soundings.
+        expected_df = pd.concat(dfs)
+        expected_df["month"] = expected_df["_time"].dt.month
+        expected_df["year"] = expected_df["_time"].dt.year
+        expected_df["latitude"] = expected_df["latitude"].round()
+        expected_df["longitude"] = expected_df["longitude"].round()
+        expected_df = expected_df.drop(columns=["_time"]) \
+            .groupby(["year", "month", "latitude", "longitude"]).mean().reset_index()
+
+        df = loader.retrieve_dataframe("monthly_avg_per_lat_lon.gzip")
+        pd.testing.assert_frame_equal(df.drop(columns=["count"]), expected_df)
+        assert df["count"].sum() == 20_000
+
+        quantile_df = loader.retrieve_dataframe("monthly_quantiles_per_lat_lon.gzip")
+        expected_median = pd.concat(dfs).assign(
+            year=lambda x: x["_time"].dt.year,
+            month=lambda x: x["_time"].dt.month,
+            latitude=lambda x: x["latitude"].round(),
+            longitude=lambda x: x["longitude"].round(),
+        ).groupby(["year", "month", "latitude", "longitude"])["xco2"].median()
+        assert np.abs(quantile_df["xco2_q50"].to_numpy() - expected_median.to_numpy()).max() <= 0.25
+        yesterday = today - dt.timedelta(days=1)
+        loader.retrieved.clear()
+        median_df = analyse.monthly_quantiles(loader, [0.5], year=yesterday.year, month=yesterday.month)
+        assert len(median_df) > 0 and (median_df["month"] == yesterday.month).all()
+        assert loader.retrieved == [analyse.monthly_sketch_file_name(yesterday.year, yesterday.month)]
+        assert len(analyse.monthly_quantiles(loader, [0.5])) == len(quantile_df)
+
+        for cell_size in analyse.MONTHLY_GRID_PYRAMID:
+            level_df = loader.retrieve_dataframe(analyse.monthly_avg_file_name(cell_size))
+            assert len(level_df) < len(df)
+            assert level_df["count"].sum() == 20_000
+            assert np.allclose(level_df["latitude"] % cell_size, 0)
+
+
+class TestMonthlyClimatology:
+    def test_folds_closed_months(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        loader = LocalParquetLoader()
+        grid_df = pd.DataFrame({
+            "year": np.int32([2023, 2023, 2024, 2024, 2024]),
+            "month": np.int32([1, 2, 1, 1, 2]),
+            "latitude": [0.0, 0.0, 0.0, 1.0, 0.0],
+            "longitude": [0.0, 0.0, 0.0, 0.0, 0.0],
+            "xco2": [410.0, 411.0, 414.0, 420.0, 430.0],
+            "count": [10, 10, 10, 10, 10],
+        })
+        loader.save_dataframe(grid_df, analyse.monthly_avg_file_name())
+
+        assert analyse.monthly_climatology(loader, today=dt.date(2024, 2, 10)) == [(2023, 1), (2023, 2), (2024, 1)]
+        assert analyse.monthly_climatology(loader, today=dt.date(2024, 3, 1)) == []  # Not ingested yet.
+        assert analyse.monthly_climatology(loader, today=dt.date(2024, 3, 3)) == [(2024, 2)]
+        assert analyse.monthly_climatology(loader, today=dt.date(2024, 3, 3)) == []
+
+        df = loader.retrieve_dataframe("climatology_per_lat_lon.gzip")
+        january = df[(df["month"] == 1) & (df["latitude"] == 0)].iloc[0]
+        assert january["xco2_climatology"] == 412 and january["years"] == 2
+
+        anomaly_df = loader.retrieve_dataframe("monthly_anomaly_per_lat_lon.gzip")
+        assert anomaly_df["xco2_anomaly"].tolist() == [-2, -9.5, 2, 0, 9.5]
+
+
+class TestMonthlyTrends:
+    def test_trend_per_lat_lon(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        loader = LocalParquetLoader()
+        year, month = np.divmod(np.arange(2020 * 12, 2023 * 12), 12)
+        t = year + (month + 0.5) / 12
+        grid_df = pd.DataFrame({
+            "year": np.int32(year),
+            "month": np.int32(month + 1),
+            "latitude": 0.0,
+            "longitude": 0.0,
+            "xco2": 410 + 2.5 * (t - 2020) + 4 * np.cos(2 * np.pi * t),
+            "count": 10,
+        })
+        loader.save_dataframe(grid_df, analyse.monthly_avg_file_name())
+
+        analyse.monthly_trends(loader)
+
+        df = loader.retrieve_dataframe("trend_per_lat_lon.gzip")
+        assert df["xco2_slope"].tolist() == pytest.approx([2.5])
+        assert df["xco2_amplitude"].tolist() == pytest.approx([4])
+        assert df["xco2_months"].tolist() == [36]
+
+    def test_empty_grid(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        loader = LocalParquetLoader()
+        loader.save_dataframe(pd.DataFrame({
+            "year": pd.Series(dtype=np.int32),
+            "month": pd.Series(dtype=np.int32),
+            "latitude": pd.Series(dtype=np.float64),
+            "longitude": pd.Series(dtype=np.float64),
+            "xco2": pd.Series(dtype=np.float64),
+            "count": pd.Series(dtype=np.int64),
+        }), analyse.monthly_avg_file_name())
+
+        analyse.monthly_trends(loader)
+
+        df = loader.retrieve_dataframe("trend_per_lat_lon.gzip")
+        assert df.empty
+        assert {"latitude", "longitude", "xco2_slope", "xco2_amplitude"} <= set(df.columns)
+
+
+class TestMonthlyGapFilled:
+    def test_filled_per_month(self, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        loader = LocalParquetLoader()
+        grid_df = pd.DataFrame({
+            "year": np.int32([2024, 2024, 2024]),
+            "month": np.int32([1, 1, 2]),
+            "latitude": [0.0, 0.0, 10.0],
+            "longitude": [0.0, 2.0, 10.0],
+            "xco2": [410.0, 420.0, 430.0],
+            "count": [10, 10, 10],
+        })
+        loader.save_dataframe(grid_df, analyse.monthly_avg_file_name())
+
+        analyse.monthly_gap_filled(loader, max_distance_km=150)
+
+        df = loader.retrieve_dataframe("monthly_avg_per_lat_lon_filled.gzip")
+        assert (df.groupby("month")["filled"].sum() > 0).all()
+        february = df[df["month"] == 2]
+        assert february["xco2"].tolist() == pytest.approx([430] * len(february))
+        assert february["latitude"].between(9, 11).all()
+
+
+class TestStationsDailyAvg:
+    def test_stations_daily_avg(self, tmp_path, monkeypatch, noaa_event_file):
+        times = ["2024-01-01T10:00:00Z", "2024-01-01T22:00:00Z", "2024-01-02T10:00:00Z"]
+        noaa_event_file("co2_mlo_surface-flask_1_ccgg_event.nc", times, [420.0, 422.0, 430.0], ["...", "...", "..."])
+        noaa_event_file("co2_mlo_surface-pfp_1_ccgg_event.nc", times[:1], [424.0], ["..."], numeric_time=True)
+        noaa_event_file("co2_brw_surface-flask_1_ccgg_event.nc", times, [410.0, 411.0, 412.0], ["...", "*..", "..."])
+        monkeypatch.chdir(tmp_path)
+        loader = LocalParquetLoader()
+
+        analyse.stations_daily_avg(loader, str(tmp_path), workers=2)
+
+        df = loader.retrieve_dataframe("stations_daily_avg.gzip")
+        assert df.to_dict("list") == {
+            "station": ["brw", "brw", "mlo", "mlo"],
+            "_date": ["2024-01-01", "2024-01-02", "2024-01-01", "2024-01-02"],
+            "co2": [410.0, 412.0, 422.0, 430.0],
+            "count": [1, 1, 3, 1],
+        }
+
+    def test_no_files(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            analyse.stations_daily_avg(LocalParquetLoader(), str(tmp_path))
+
+    def test_mlo(self, tmp_path, monkeypatch, noaa_event_file):
+        noaa_event_file(
+            "co2_mlo_surface-flask_1_ccgg_event.nc",
+            ["1975-12-31T10:00:00Z", "1976-01-01T10:00:00Z", "1976-01-01T11:00:00Z"],
+            [330.0, 331.0, 332.0],
+            ["...", "...", "..."],
+        )
+        monkeypatch.chdir(tmp_path)
+        loader = LocalParquetLoader()
+
+        analyse.mlo(loader)
+
+        df = loader.retrieve_dataframe("mlo.gzip")
+        assert df.to_dict("list") == {"_date": ["1976-01-01"], "co2": [331.5]}
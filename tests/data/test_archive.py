@@ -0,0 +1,87 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.archive import INDEX_FILE_NAME, Archive, month_range
+from data.loaders.local_parquet_loader import LocalParquetLoader
+from data.utils.parquet import ParquetOptions
+
+
+class TestArchive:
+    @pytest.fixture
+    def daily_dfs(self, tmp_path, monkeypatch) -> dict[dt.date, pd.DataFrame]:
+        monkeypatch.chdir(tmp_path)
+        rng = np.random.default_rng(42)
+        loader = LocalParquetLoader(spatial_sort=True)
+        dfs = {}
+        for date in pd.date_range("2024-01-30", "2024-02-02").date:
+            if date == dt.date(2024, 1, 31):
+                continue  # Missing daily file.
+            n = 200
+            df = pd.DataFrame({
+                "_time": pd.Timestamp(date, tz="UTC") + pd.to_timedelta(rng.uniform(0, 86_399, n), unit="s"),
+                "latitude": rng.uniform(-90, 90, n),
+                "longitude": rng.uniform(-180, 180, n),
+                "xco2": rng.uniform(400, 430, n),
+            })
+            loader.save_dataframe(df, f"{date.isoformat()}.gzip")
+            dfs[date] = loader.retrieve_dataframe(f"{date.isoformat()}.gzip")
+        return dfs
+
+    @pytest.fixture
+    def archive(self, daily_dfs) -> Archive:
+        return Archive(LocalParquetLoader(), monthly_loader=LocalParquetLoader(ParquetOptions(row_group_size=100)))
+
+    def test_month_range(self):
+        assert month_range(2024, 2) == (dt.date(2024, 2, 1), dt.date(2024, 2, 29))
+        assert month_range(2024, 12) == (dt.date(2024, 12, 1), dt.date(2024, 12, 31))
+
+    def test_iter_daily_dataframes_without_index(self, archive, daily_dfs):
+        loaded = dict(archive.iter_daily_dataframes(dt.date(2024, 1, 30), dt.date(2024, 2, 3)))
+
+        assert list(loaded) == list(daily_dfs)
+        for date, df in loaded.items():
+            pd.testing.assert_frame_equal(df, daily_dfs[date])
+
+    def test_compact_month(self, archive, daily_dfs):
+        assert archive.compact_month(2024, 1)
+        assert not archive.compact_month(2024, 1)  # Already compacted.
+
+        index = archive.retrieve_index()
+        assert index["date"].tolist() == ["2024-01-30"]
+        monthly_df = LocalParquetLoader().retrieve_dataframe(index["file_name"].iloc[0])
+        assert monthly_df["_time"].is_monotonic_increasing
+
+        loaded = dict(archive.iter_daily_dataframes(dt.date(2024, 1, 30), dt.date(2024, 2, 3)))
+        assert list(loaded) == list(daily_dfs)
+        # Compacted dates are sorted by time, daily files are sorted spatially.
+        pd.testing.assert_frame_equal(
+            loaded[dt.date(2024, 1, 30)],
+            daily_dfs[dt.date(2024, 1, 30)].sort_values("_time", ignore_index=True),
+        )
+        for date in (dt.date(2024, 2, 1), dt.date(2024, 2, 2)):
+            pd.testing.assert_frame_equal(loaded[date], daily_dfs[date])
+
+    def test_compact_month_force(self, archive, daily_dfs):
+        archive.compact_month(2024, 2)
+        file_name = archive.retrieve_index()["file_name"].iloc[0]
+
+        LocalParquetLoader().save_dataframe(daily_dfs[dt.date(2024, 2, 1)].head(10), "2024-02-01.gzip")
+        assert archive.compact_month(2024, 2, force=True)
+
+        index = archive.retrieve_index()
+        assert index["row_end"].tolist() == [10, 210]
+        loaded = dict(archive.iter_daily_dataframes(dt.date(2024, 2, 1), dt.date(2024, 2, 2)))
+        assert len(loaded[dt.date(2024, 2, 1)]) == 10
+        # Previous monthly file is kept for readers holding the previous index.
+        assert LocalParquetLoader().retrieve_dataframe(file_name).shape[0] == 400
+
+    def test_compact_closed_months(self, archive, daily_dfs):
+        assert archive.compact_closed_months(dt.date(2024, 1, 1), today=dt.date(2024, 2, 2)) == []
+        assert archive.compact_closed_months(dt.date(2024, 1, 1), today=dt.date(2024, 2, 3)) == ["2024-01"]
+        assert archive.compact_closed_months(dt.date(2024, 1, 1), today=dt.date(2024, 3, 3)) == ["2024-02"]
+        assert LocalParquetLoader().retrieve_dataframe(INDEX_FILE_NAME)["date"].tolist() == [
+            "2024-01-30", "2024-02-01", "2024-02-02",
+        ]
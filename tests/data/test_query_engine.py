@@ -0,0 +1,84 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.loaders.local_parquet_loader import LocalParquetLoader
+from data.query_engine import QueryEngine
+from data.utils.geo import BoundingBox
+from data.utils.parquet import ParquetOptions
+
+
+class TestQueryEngine:
+    @pytest.fixture
+    def archive(self, tmp_path) -> dict[dt.date, pd.DataFrame]:
+        rng = np.random.default_rng(42)
+        loader = LocalParquetLoader(ParquetOptions(row_group_size=100), spatial_sort=True)
+        archive = {}
+        for date in (dt.date(2024, 1, 31), dt.date(2024, 2, 1), dt.date(2024, 2, 2)):
+            n = 500
+            df = pd.DataFrame({
+                "_time": pd.Timestamp(date, tz="UTC") + pd.to_timedelta(rng.uniform(0, 86_399, n), unit="s"),
+                "latitude": rng.uniform(-90, 90, n),
+                "longitude": rng.uniform(-180, 180, n),
+                "xco2": rng.uniform(400, 430, n),
+            })
+            loader.save_dataframe(df, str(tmp_path / f"{date.isoformat()}.gzip"))
+            archive[date] = df
+
+        # Derived datasets in the same directory must not be picked up.
+        LocalParquetLoader().save_dataframe(
+            pd.DataFrame({"_date": ["2024-01-31"], "xco2": [0.0]}),
+            str(tmp_path / "oco2_daily_avg.gzip"),
+        )
+        return archive
+
+    def test_daily_avg(self, archive, tmp_path):
+        bbox = BoundingBox(lat_min=36, lat_max=71, lon_min=9, lon_max=45)
+        expected = [
+            _df.loc[bbox.mask(_df["latitude"], _df["longitude"]), "xco2"].mean()
+            for _date, _df in archive.items() if _date >= dt.date(2024, 2, 1)
+        ]
+
+        with QueryEngine(str(tmp_path)) as engine:
+            df = engine.daily_avg(dt.date(2024, 2, 1), dt.date(2024, 2, 2), bbox=bbox)
+
+        assert df["_date"].dt.date.tolist() == [dt.date(2024, 2, 1), dt.date(2024, 2, 2)]
+        np.testing.assert_allclose(df["xco2"], expected)
+
+    def test_grid_mean(self, archive, tmp_path):
+        df = pd.concat(archive.values(), ignore_index=True)
+        df = df.assign(
+            year=df["_time"].dt.year,
+            month=df["_time"].dt.month,
+            latitude=(df["latitude"] / 10).round() * 10,
+            longitude=(df["longitude"] / 10).round() * 10,
+        )
+        expected = df \
+            .groupby(["year", "month", "latitude", "longitude"])["xco2"] \
+            .agg(["mean", "count"]) \
+            .reset_index()
+
+        with QueryEngine(str(tmp_path)) as engine:
+            grid_df = engine.grid_mean(dt.date(2024, 1, 1), dt.date(2024, 2, 29), cell_size=10)
+
+        assert len(grid_df) == len(expected)
+        np.testing.assert_allclose(grid_df["xco2"], expected["mean"])
+        np.testing.assert_array_equal(grid_df["count"], expected["count"])
+        np.testing.assert_allclose(grid_df["latitude"], expected["latitude"])
+
+    def test_quoted_source(self, tmp_path):
+        source = tmp_path / "it's"
+        source.mkdir()
+        LocalParquetLoader().save_dataframe(pd.DataFrame({
+            "_time": pd.to_datetime(["2024-02-01T12:00"], utc=True),
+            "latitude": [48.0],
+            "longitude": [17.0],
+            "xco2": [420.0],
+        }), str(source / "2024-02-01.gzip"))
+
+        with QueryEngine(str(source)) as engine:
+            df = engine.daily_avg(dt.date(2024, 2, 1), dt.date(2024, 2, 1))
+
+        assert df["xco2"].tolist() == [420.0]
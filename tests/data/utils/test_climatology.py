@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.climatology import ClimatologyStore
+
+
+class TestClimatologyStore:
+    @pytest.fixture
+    def grid_df(self) -> pd.DataFrame:
+        rng = np.random.default_rng(42)
+        latitude, longitude = np.meshgrid(np.arange(-3.0, 4.0), np.arange(10.0, 15.0), indexing="ij")
+        dfs = []
+        for year in range(2015, 2024):
+            for month in (1, 2, 7):
+                df = pd.DataFrame({
+                    "year": np.int32(year),
+                    "month": np.int32(month),
+                    "latitude": latitude.ravel(),
+                    "longitude": longitude.ravel(),
+                    "xco2": 400 + 2.5 * (year - 2015) + month + rng.normal(0, 1, latitude.size),
+                })
+                dfs.append(df.sample(frac=0.8, random_state=year * 12 + month))  # Cells missing in some months.
+        return pd.concat(dfs, ignore_index=True)
+
+    def test_statistics(self, grid_df):
+        store = ClimatologyStore()
+        store.fold_grids(grid_df)
+
+        df = store.statistics()
+
+        expected_df = grid_df.groupby(["month", "latitude", "longitude"])["xco2"] \
+            .agg(xco2_climatology="mean", xco2_std="std", years="size").reset_index()
+        pd.testing.assert_frame_equal(df, expected_df, check_dtype=False)
+
+    def test_fold_once(self, grid_df):
+        store = ClimatologyStore()
+        assert len(store.fold_grids(grid_df)) == 27
+        assert store.fold_grids(grid_df) == []
+        assert store.statistics()["years"].max() == 9
+
+    def test_incremental_matches_full(self, grid_df):
+        full = ClimatologyStore()
+        full.fold_grids(grid_df)
+
+        store = ClimatologyStore()
+        store.fold_grids(grid_df[grid_df["year"] < 2020])
+        other = ClimatologyStore()
+        other.fold_grids(grid_df[grid_df["year"] >= 2022])
+        state_df, folded_df = store.merge(other).to_dataframes()
+        store = ClimatologyStore.from_dataframes(state_df, folded_df)
+        store.fold_grids(grid_df)
+
+        assert store.folded == full.folded
+        pd.testing.assert_frame_equal(store.statistics(), full.statistics())
+
+    def test_merge_overlapping(self, grid_df):
+        store = ClimatologyStore()
+        store.fold_grids(grid_df)
+        with pytest.raises(ValueError):
+            store.merge(store)
+
+    def test_anomalies(self, grid_df):
+        store = ClimatologyStore()
+        store.fold_grids(grid_df)
+
+        df = store.anomalies(grid_df)
+
+        assert len(df) == len(grid_df)
+        assert df.groupby(["month", "latitude", "longitude"])["xco2_anomaly"].sum().abs().max() < 1e-9
+        assert np.allclose(df["xco2_zscore"], df["xco2_anomaly"] / df["xco2_std"])
+
+    def test_empty(self):
+        state_df, folded_df = ClimatologyStore().to_dataframes()
+        store = ClimatologyStore.from_dataframes(state_df, folded_df)
+        assert store.folded == []
+        assert store.statistics().empty
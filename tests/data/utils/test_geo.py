@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+
+from data.utils.geo import BoundingBox, morton_key, sort_spatially
+
+
+class TestBoundingBox:
+
+    def test_mask(self):
+        bbox = BoundingBox(lat_min=47.7, lat_max=49.6, lon_min=16.8, lon_max=22.6)
+        latitude = pd.Series([47.7, 48.0, 50.0, 48.0])
+        longitude = pd.Series([22.6, 10.0, 20.0, 17.0])
+
+        mask = bbox.mask(latitude, longitude)
+
+        assert mask.tolist() == [True, False, False, True]
+
+
+def test_morton_key__neighbouring_cells_are_close():
+    keys = morton_key(np.array([0.1, 0.6, 0.1, 60.0]), np.array([0.1, 0.1, 0.6, 100.0]), cell_size=0.5)
+
+    assert keys[0] < keys[1] < keys[3]
+    assert keys[0] < keys[2] < keys[3]
+    assert abs(int(keys[1]) - int(keys[0])) == 1
+    assert abs(int(keys[2]) - int(keys[0])) == 2
+
+
+def test_sort_spatially(dummy_df):
+    df = pd.concat([dummy_df, dummy_df.assign(latitude=60.0, longitude=100.0)], ignore_index=True)
+    df = df.iloc[::-1]
+
+    sorted_df = sort_spatially(df)
+
+    assert len(sorted_df) == len(df)
+    assert (sorted_df["latitude"].iloc[-3:] == 60.0).all()
+    assert sorted_df.index.tolist() == list(range(len(df)))
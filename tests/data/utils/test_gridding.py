@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.gridding import GridAggregator
+
+
+class TestGridAggregator:
+    @pytest.fixture
+    def soundings_df(self) -> pd.DataFrame:
+        n = 50_000
+        rng = np.random.default_rng(42)
+        df = pd.DataFrame({
+            "latitude": rng.uniform(-5, 5, n),
+            "longitude": rng.uniform(175, 180, n),
+            "xco2": rng.normal(420, 2, n),
+            "xco2_uncertainty": rng.uniform(0, 1, n),
+        })
+        df.loc[df.index[::11], "xco2"] = np.nan
+        df.loc[df.index[:5], "latitude"] = np.nan
+        return df
+
+    @staticmethod
+    def groupby(df: pd.DataFrame, cell_size: float) -> pd.DataFrame:
+        df = df.dropna(subset=["latitude", "longitude"]).copy()
+        df["latitude"] = (df["latitude"] / cell_size).round() * cell_size
+        df["longitude"] = (df["longitude"] / cell_size).round() * cell_size
+        grouped = df.groupby(["latitude", "longitude"])
+        expected_df = grouped.agg(["mean", "std", "min", "max"])
+        expected_df.columns = [c if s == "mean" else f"{c}_{s}" for c, s in expected_df.columns]
+        expected_df["count"] = grouped.size()
+        return expected_df.reset_index()
+
+    @pytest.mark.parametrize("cell_size", [0.25, 0.5, 1.0, 2.0])
+    def test_matches_groupby(self, soundings_df, cell_size):
+        grid = GridAggregator(["xco2", "xco2_uncertainty"], cell_size=cell_size)
+        grid.update(soundings_df)
+
+        df = grid.to_dataframe(statistics=["mean", "std", "min", "max"])
+
+        expected_df = self.groupby(soundings_df, cell_size)
+        pd.testing.assert_frame_equal(df, expected_df[df.columns], check_dtype=False)
+
+    def test_merge(self, soundings_df):
+        grid = GridAggregator(["xco2"], cell_size=0.5)
+        for chunk in np.array_split(np.arange(len(soundings_df)), 7):
+            grid.merge(GridAggregator(["xco2"], cell_size=0.5).update(soundings_df.iloc[chunk]))
+
+        expected_grid = GridAggregator(["xco2"], cell_size=0.5).update(soundings_df)
+        pd.testing.assert_frame_equal(
+            grid.to_dataframe(statistics=["mean", "std", "min", "max"]),
+            expected_grid.to_dataframe(statistics=["mean", "std", "min", "max"]),
+        )
+
+    def test_update_in_batches(self, soundings_df):
+        grid = GridAggregator(["xco2"], cell_size=0.5)
+        for chunk in np.array_split(np.arange(len(soundings_df)), 50):
+            grid.update(soundings_df.iloc[chunk])
+
+        expected_grid = GridAggregator(["xco2"], cell_size=0.5).update(soundings_df)
+        pd.testing.assert_frame_equal(
+            grid.to_dataframe(statistics=["mean", "std", "min", "max"]),
+            expected_grid.to_dataframe(statistics=["mean", "std", "min", "max"]),
+        )
+        np.testing.assert_array_equal(grid.flush().cells, expected_grid.flush().cells)
+
+    @pytest.mark.parametrize("cell_size, coarse_cell_size", [(0.5, 1.0), (1.0, 2.0), (1.0, 5.0)])
+    def test_coarsen(self, soundings_df, cell_size, coarse_cell_size):
+        grid = GridAggregator(["xco2"], cell_size=cell_size).update(soundings_df)
+
+        df = grid.coarsen(coarse_cell_size).to_dataframe(statistics=["mean", "std", "min", "max"])
+
+        # Fine cell centers, rounded half up to coarse cells.
+        expected_df = soundings_df.dropna(subset=["latitude", "longitude"]).drop(columns=["xco2_uncertainty"])
+        for column in ("latitude", "longitude"):
+            fine = (expected_df[column] / cell_size).round() * cell_size
+            expected_df[column] = np.floor(fine / coarse_cell_size + 0.5) * coarse_cell_size
+        expected_df["longitude"] = expected_df["longitude"].clip(upper=180)
+        expected_df = self.groupby(expected_df, coarse_cell_size)
+        pd.testing.assert_frame_equal(df, expected_df[df.columns], check_dtype=False)
+
+    def test_coarsen_invalid_cell_size(self):
+        with pytest.raises(ValueError):
+            GridAggregator(["xco2"], cell_size=2.0).coarsen(5.0)
+
+    def test_cell_index(self):
+        grid = GridAggregator(["xco2"], cell_size=1.0)
+        index = grid.cell_index(
+            np.array([-90.0, 90.0, 0.5, 1.5, np.nan, 91.0]),
+            np.array([-180.0, 180.0, 0.0, 0.0, 0.0, 0.0]),
+        )
+
+        assert index[0] == 0 and index[1] == 181 * 361 - 1
+        # Half to even.
+        assert grid.cell_coordinates(index[2:4]) == (pytest.approx([0.0, 2.0]), pytest.approx([0.0, 0.0]))
+        assert index[4] == index[5] == -1
+
+    def test_invalid_cell_size(self):
+        with pytest.raises(ValueError):
+            GridAggregator(["xco2"], cell_size=0.7)
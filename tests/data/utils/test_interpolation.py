@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.interpolation import SphericalInterpolator, fill_grid, grid_coordinates
+
+
+class TestSphericalInterpolator:
+    @pytest.mark.parametrize("weighting", ["idw", "gaussian"])
+    def test_constant_field(self, weighting):
+        rng = np.random.default_rng(42)
+        interpolator = SphericalInterpolator(
+            rng.uniform(-80, 80, 500), rng.uniform(-180, 180, 500), np.full(500, 415.0), weighting=weighting,
+            max_distance_km=5000,
+        )
+
+        values, distance = interpolator(rng.uniform(-80, 80, 100), rng.uniform(-180, 180, 100))
+
+        assert values == pytest.approx(np.full(100, 415.0))
+        assert (distance >= 0).all() and (distance < 5000).all()
+
+    def test_antimeridian(self):
+        interpolator = SphericalInterpolator([0, 0], [179.5, 0], [1.0, 2.0], neighbours=1)
+
+        values, distance = interpolator([0], [-179.5])
+
+        assert values.tolist() == [1.0]
+        assert distance[0] == pytest.approx(111.2, abs=0.1)
+
+    def test_idw_closer_weighs_more(self):
+        interpolator = SphericalInterpolator([0, 0], [0, 3], [400.0, 430.0], max_distance_km=1000)
+
+        values, _ = interpolator([0], [1])
+
+        # Distances 1 and 2 degrees, weights 1 and 1/4.
+        assert values[0] == pytest.approx((400 + 430 / 4) / 1.25)
+
+    def test_too_far(self):
+        interpolator = SphericalInterpolator([0], [0], [400.0], max_distance_km=100)
+
+        values, distance = interpolator([0, 0], [0.5, 2])
+
+        assert values[0] == 400 and np.isnan(values[1]) and np.isnan(distance[1])
+
+
+class TestFillGrid:
+    def test_fill_grid(self):
+        df = pd.DataFrame({
+            "latitude": [0.0, 0.0, 2.0],
+            "longitude": [0.0, 2.0, 0.0],
+            "xco2": [410.0, 420.0, np.nan],
+        })
+
+        filled_df = fill_grid(df, max_distance_km=200)
+
+        assert filled_df[~filled_df["filled"]].reset_index(drop=True).equals(df.assign(filled=False, distance=0.0))
+        filled = filled_df[filled_df["filled"]].set_index(["latitude", "longitude"])
+        assert filled.loc[(0.0, 1.0), "xco2"] == pytest.approx(415)
+        assert ((filled["xco2"] > 410 - 1e-9) & (filled["xco2"] < 420 + 1e-9)).all()
+        assert (filled["distance"] <= 200).all()
+        assert (2.0, 0.0) not in filled.index  # Occupied, even if its value is missing.
+
+    def test_grid_coordinates(self):
+        latitude, longitude = grid_coordinates(0.5)
+        assert len(latitude) == 361 * 721
+        assert latitude.min() == -90 and longitude.max() == 180
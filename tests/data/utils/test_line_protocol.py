@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+from influxdb_client.client.write.dataframe_serializer import data_frame_to_list_of_points
+from influxdb_client.client.write_api import PointSettings
+
+from data.utils.line_protocol import encode_line_protocol
+
+
+def serialize_with_influxdb_client(df: pd.DataFrame, file_name: str) -> bytes:
+    df = df.set_index("_time")
+    df["file_name"] = file_name
+    lines = data_frame_to_list_of_points(
+        df,
+        PointSettings(),
+        data_frame_measurement_name="xco2",
+        data_frame_tag_columns=["file_name"],
+    )
+    return "\n".join(lines).encode()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 100])
+def test_encode_line_protocol__matches_influxdb_client_serializer(chunk_size):
+    df = pd.DataFrame({
+        "_time": pd.to_datetime(["2024-01-01T01:00:00.123456789", "2024-01-01T02:00:00.0", "2024-01-01T03:00:00.0"], utc=True),
+        "latitude": np.array([-0.1, np.nan, 48.5], dtype=np.float32),
+        "longitude": [0.1, 1e-7, 17.25],
+        "xco2": [420.1, 1e20, 419.0],
+        "count": [1, 2, 3],
+        "label": ['a "b"', "c,d", "e f"],
+        "flag": [True, False, True],
+    })
+    expected = serialize_with_influxdb_client(df, file_name="2024 01,01=x")
+
+    payloads = list(encode_line_protocol(df, "xco2", tags={"file_name": "2024 01,01=x"}, chunk_size=chunk_size))
+
+    assert b"\n".join(payloads) == expected
+    assert all(_p.count(b"\n") < chunk_size for _p in payloads)
+
+
+def test_encode_line_protocol__skips_points_without_fields(dummy_df):
+    dummy_df.loc[1, ["latitude", "longitude", "xco2"]] = np.nan
+
+    payloads = list(encode_line_protocol(dummy_df, "xco2", tags={"file_name": "2024-01-01"}))
+
+    assert b"\n".join(payloads) == serialize_with_influxdb_client(dummy_df, file_name="2024-01-01")
+    assert b"\n".join(payloads).count(b"\n") == 1
+
+
+def test_encode_line_protocol__tag_columns(dummy_df):
+    dummy_df["station"] = ["mlo", "", "b r w"]
+
+    payload = b"\n".join(encode_line_protocol(dummy_df, "co2", tag_columns=["station"]))
+
+    assert payload.splitlines()[0].startswith(b"co2,station=mlo latitude=")
+    assert payload.splitlines()[1].startswith(b"co2 latitude=")
+    assert payload.splitlines()[2].startswith(b"co2,station=b\\ r\\ w latitude=")
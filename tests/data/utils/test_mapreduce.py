@@ -0,0 +1,24 @@
+import functools
+import operator
+
+from data.utils.mapreduce import map_reduce
+
+
+def square(x: int) -> list[int]:
+    return [x * x]
+
+
+class TestMapReduce:
+    def test_map_reduce(self):
+        assert map_reduce(square, [1, 2, 3], operator.add, []) == [1, 4, 9]
+
+    def test_map_reduce_in_processes(self):
+        # List concatenation is associative but not commutative, order of items must be kept.
+        assert map_reduce(square, list(range(20)), operator.add, [], workers=3) == [x * x for x in range(20)]
+
+    def test_map_reduce_partial(self):
+        mapper = functools.partial(operator.mul, 2)
+        assert map_reduce(mapper, [1, 2, 3], operator.add, 0, workers=2) == 12
+
+    def test_map_reduce_no_items(self):
+        assert map_reduce(square, [], operator.add, [], workers=2) == []
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.noaa import decode_char_times, event_file_daily_sums, read_event_file
+
+
+TIMES = ["2024-01-01T10:00:00Z", "2024-01-01T22:30:00Z", "2024-01-02T00:00:01Z", "2024-01-03T12:00:00Z"]
+
+
+def test_decode_char_times():
+    chars = np.array([list(t.encode()) for t in TIMES], dtype=np.uint8).view("S1")
+
+    times = decode_char_times(chars)
+
+    assert times.tolist() == pd.to_datetime(TIMES).tz_localize(None).to_pydatetime().tolist()
+
+
+@pytest.mark.parametrize("numeric_time", [False, True])
+def test_read_event_file(noaa_event_file, numeric_time):
+    path = noaa_event_file(
+        "co2_mlo_surface-flask_1_ccgg_event.nc",
+        TIMES,
+        [420.0, 421.0, np.nan, 425.0],
+        ["...", "..P", "...", "A.."],
+        numeric_time=numeric_time,
+    )
+
+    df = read_event_file(path)
+
+    assert df["station"].tolist() == ["mlo", "mlo"]
+    assert df["_time"].tolist() == pd.to_datetime(TIMES[:2], utc=True).tolist()
+    assert df["co2"].tolist() == [420.0, 421.0]
+
+
+def test_site_code_attribute(noaa_event_file):
+    path = noaa_event_file("event.nc", TIMES[:1], [420.0], ["..."], site_code="BRW")
+    assert read_event_file(path)["station"].tolist() == ["brw"]
+
+
+def test_station_unknown(noaa_event_file):
+    path = noaa_event_file("event.nc", TIMES[:1], [420.0], ["..."])
+    with pytest.raises(ValueError, match="event.nc"):
+        read_event_file(path)
+
+
+def test_event_file_daily_sums(noaa_event_file):
+    path = noaa_event_file(
+        "co2_spo_surface-flask_1_ccgg_event.nc", TIMES, [420.0, 421.0, 422.0, 425.0], ["..."] * 4,
+    )
+
+    df = event_file_daily_sums(path)
+
+    assert df["station"].tolist() == ["spo"] * 3
+    assert df["_date"].dt.strftime("%Y-%m-%d").tolist() == ["2024-01-01", "2024-01-02", "2024-01-03"]
+    assert df["sum"].tolist() == [841.0, 422.0, 425.0]
+    assert df["count"].tolist() == [2, 1, 1]
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from data.utils.geo import BoundingBox, Polygon
+from data.utils.regions import Region, RegionRegistry
+
+
+class TestRegionRegistry:
+    @pytest.fixture
+    def regions(self) -> list[Region]:
+        return [
+            Region("sk", BoundingBox(lat_min=47.7, lat_max=49.6, lon_min=16.8, lon_max=22.6)),
+            Region("eu", BoundingBox(lat_min=36, lat_max=71, lon_min=9, lon_max=45)),
+            Region("triangle", Polygon(((40.0, 0.0), (60.0, 10.0), (40.0, 20.0)))),
+            Region("thin", Polygon(((-10.0, 100.0), (-10.05, 140.0), (-10.1, 100.0)))),  # Thinner than a cell.
+        ]
+
+    @pytest.fixture
+    def coordinates(self) -> tuple[np.ndarray, np.ndarray]:
+        n = 200_000
+        rng = np.random.default_rng(42)
+        latitude = np.concatenate([rng.uniform(-90, 90, n), rng.uniform(-10.2, -9.9, n), [np.nan, 90.0, 47.7]])
+        longitude = np.concatenate([rng.uniform(-180, 180, n), rng.uniform(99, 141, n), [0.0, 180.0, 22.6]])
+        return latitude, longitude
+
+    def test_membership_matches_shapes(self, regions, coordinates):
+        registry = RegionRegistry(regions)
+
+        membership = registry.membership(*coordinates)
+
+        assert registry.names == ["sk", "eu", "triangle", "thin"]
+        for i, region in enumerate(regions):
+            np.testing.assert_array_equal(membership[:, i], region.shape.mask(*coordinates))
+            assert membership[:, i].any()
+
+    def test_sums(self, regions, coordinates):
+        registry = RegionRegistry(regions)
+        values = np.linspace(400, 430, len(coordinates[0]))
+        values[::7] = np.nan
+
+        sums, counts = registry.sums(*coordinates, values)
+
+        for i, region in enumerate(regions):
+            mask = region.shape.mask(*coordinates) & ~np.isnan(values)
+            assert counts[i] == mask.sum()
+            assert sums[i] == pytest.approx(values[mask].sum())
+
+    def test_unique_names(self, regions):
+        with pytest.raises(ValueError):
+            RegionRegistry([*regions, regions[0]])
+
+
+def test_polygon_mask():
+    square = Polygon(((0.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, 0.0)))
+
+    assert square.mask(np.array([0.5, 1.5, 0.5]), np.array([0.5, 0.5, -0.5])).tolist() == [True, False, False]
+    assert square.bounds() == BoundingBox(0.0, 1.0, 0.0, 1.0)
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.geo import BoundingBox
+from data.utils.parquet import ParquetOptions, read_parquet_bbox, write_parquet
+from data.utils.remote_parquet import coalesce_ranges, open_remote_parquet, read_parquet_remote
+
+
+class TestRemoteParquet:
+    @pytest.fixture
+    def parquet_bytes(self, tmp_path) -> bytes:
+        n = 20_000
+        rng = np.random.default_rng(42)
+        df = pd.DataFrame({
+            "_time": pd.date_range("2024-01-01", periods=n, freq="s", tz="UTC"),
+            "latitude": rng.uniform(-90, 90, n),
+            "longitude": rng.uniform(-180, 180, n),
+            "xco2": rng.uniform(400, 430, n),
+        })
+        path = str(tmp_path / "2024-01-01.gzip")
+        write_parquet(df, path, ParquetOptions(row_group_size=1_000), spatial_sort=True)
+        with open(path, "rb") as f:
+            return f.read()
+
+    @pytest.fixture
+    def fetches(self) -> list[tuple[int, int]]:
+        return []
+
+    @pytest.fixture
+    def fetch(self, parquet_bytes, fetches):
+        def _fetch(start: int, end: int) -> bytes:
+            fetches.append((start, end))
+            return parquet_bytes[start:end]
+        return _fetch
+
+    def test_coalesce_ranges(self):
+        assert coalesce_ranges([(20, 30), (0, 10), (12, 15), (100, 120)], gap=4) == [(0, 15), (20, 30), (100, 120)]
+        assert coalesce_ranges([(0, 10), (10, 20), (20, 30)], gap=0, max_size=20) == [(0, 20), (20, 30)]
+
+    def test_read_columns(self, parquet_bytes, fetch, fetches, tmp_path):
+        df = read_parquet_remote(len(parquet_bytes), fetch, columns=["_time", "xco2"], coalesce_gap=0)
+
+        expected_df = pd.read_parquet(tmp_path / "2024-01-01.gzip", engine="fastparquet", columns=["_time", "xco2"])
+        pd.testing.assert_frame_equal(df, expected_df)
+        assert sum(end - start for start, end in fetches) < len(parquet_bytes) * 0.75
+
+    def test_read_bbox(self, parquet_bytes, fetch, fetches, tmp_path):
+        bbox = BoundingBox(lat_min=47.7, lat_max=49.6, lon_min=16.8, lon_max=22.6)
+        df = read_parquet_remote(len(parquet_bytes), fetch, bbox=bbox, coalesce_gap=0)
+
+        pd.testing.assert_frame_equal(df, read_parquet_bbox(str(tmp_path / "2024-01-01.gzip"), bbox))
+        assert len(df) > 0
+        assert sum(end - start for start, end in fetches) < len(parquet_bytes) * 0.25
+
+    def test_read_coalesced(self, parquet_bytes, fetch, fetches, tmp_path):
+        df = read_parquet_remote(len(parquet_bytes), fetch)
+
+        pd.testing.assert_frame_equal(df, pd.read_parquet(tmp_path / "2024-01-01.gzip", engine="fastparquet"))
+        assert len(fetches) == 2  # Footer and everything else in one request.
+
+    def test_footer_larger_than_prefetch(self, parquet_bytes, fetch, fetches):
+        f = open_remote_parquet(len(parquet_bytes), fetch, footer_prefetch_size=16)
+        f.seek(-8, 2)
+        footer_size = int.from_bytes(f.read(4), "little")
+        f.seek(-(footer_size + 8), 2)
+        f.read(footer_size)
+
+        assert len(fetches) == 2
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.sketch import HistogramSketch
+
+
+class TestHistogramSketch:
+    @pytest.fixture
+    def soundings_df(self) -> pd.DataFrame:
+        n = 30_000
+        rng = np.random.default_rng(42)
+        return pd.DataFrame({
+            "latitude": rng.uniform(-2, 2, n),
+            "longitude": rng.uniform(-2, 2, n),
+            "xco2": np.concatenate([rng.normal(420, 2, n - 300), rng.normal(440, 5, 300)]),  # Outliers.
+        })
+
+    def test_quantiles(self, soundings_df):
+        sketch = HistogramSketch(bin_width=0.25).update(
+            soundings_df["latitude"], soundings_df["longitude"], soundings_df["xco2"],
+        )
+
+        df = sketch.quantiles([0, 0.1, 0.5, 0.9, 1])
+
+        expected = soundings_df.assign(
+            latitude=soundings_df["latitude"].round(),
+            longitude=soundings_df["longitude"].round(),
+        ).groupby(["latitude", "longitude"])["xco2"]
+        expected_df = expected.quantile([0, 0.1, 0.5, 0.9, 1]).unstack().reset_index()
+        assert df[["latitude", "longitude"]].values.tolist() == expected_df[["latitude", "longitude"]].values.tolist()
+        for q in (0, 0.1, 0.5, 0.9, 1):
+            assert np.abs(df[f"q{q * 100:g}"] - expected_df[q]).max() <= 0.25
+        assert df["count"].tolist() == expected.size().tolist()
+
+    def test_merge(self, soundings_df):
+        sketch = HistogramSketch()
+        for chunk in np.array_split(np.arange(len(soundings_df)), 5):
+            chunk_df = soundings_df.iloc[chunk]
+            sketch.merge(HistogramSketch().update(chunk_df["latitude"], chunk_df["longitude"], chunk_df["xco2"]))
+
+        expected = HistogramSketch().update(soundings_df["latitude"], soundings_df["longitude"], soundings_df["xco2"])
+        np.testing.assert_array_equal(sketch.keys, expected.keys)
+        np.testing.assert_array_equal(sketch.counts, expected.counts)
+
+    def test_state_frame(self, soundings_df):
+        sketch = HistogramSketch(cell_size=0.5, bin_width=0.1)
+        sketch.update(soundings_df["latitude"], soundings_df["longitude"], soundings_df["xco2"])
+
+        restored = HistogramSketch.from_state_frame(sketch.to_state_frame(), cell_size=0.5, bin_width=0.1)
+
+        pd.testing.assert_frame_equal(restored.quantiles([0.5]), sketch.quantiles([0.5]))
+
+    def test_out_of_range_and_nan(self):
+        sketch = HistogramSketch(lower=400, upper=410, bin_width=1)
+        sketch.update(np.zeros(4), np.zeros(4), np.array([300, 405.5, np.nan, 500]))
+
+        df = sketch.quantiles([0, 1])
+
+        assert df["count"].tolist() == [3]
+        assert df["q0"].tolist() == [400] and df["q100"].tolist() == [410]
+
+    def test_empty(self):
+        assert HistogramSketch().quantiles([0.5]).empty
+
+    def test_merge_different_bins(self):
+        with pytest.raises(ValueError):
+            HistogramSketch(bin_width=0.1).merge(HistogramSketch(bin_width=0.2))
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.utils.trends import GridCube, design_matrix, fit_trends, grid_cube, trend_maps
+
+
+class TestTrends:
+    @pytest.fixture
+    def grid_df(self) -> pd.DataFrame:
+        rng = np.random.default_rng(42)
+        dfs = []
+        for year in range(2019, 2024):
+            for month in range(1, 13):
+                t = year + (month - 0.5) / 12
+                latitude = np.array([0.0, 0.0, 1.0, 2.0])
+                df = pd.DataFrame({
+                    "year": year,
+                    "month": month,
+                    "latitude": latitude,
+                    "longitude": [0.0, 1.0, 0.0, 0.0],
+                    "xco2": 410 + (2 + latitude) * (t - 2019) + (3 + latitude) * np.sin(2 * np.pi * t + 0.5),
+                })
+                df["xco2"] += rng.normal(0, 0.1, len(df))
+                dfs.append(df[rng.random(len(df)) > 0.3])  # Missing months.
+        return pd.concat(dfs, ignore_index=True)
+
+    def test_grid_cube(self, grid_df):
+        cube = grid_cube(grid_df)
+
+        assert cube.values.shape == (4, grid_df.groupby(["year", "month"]).ngroups)
+        assert np.count_nonzero(~np.isnan(cube.values)) == len(grid_df)
+        assert cube.time[0] == pytest.approx(2019 + 0.5 / 12)
+
+    def test_matches_lstsq(self, grid_df):
+        cube = grid_cube(grid_df)
+
+        trend_fit = fit_trends(cube, harmonics=2)
+
+        x = design_matrix(cube.time, harmonics=2)
+        for i, values in enumerate(cube.values):
+            notna = ~np.isnan(values)
+            expected, *_ = np.linalg.lstsq(x[notna], values[notna], rcond=None)
+            assert trend_fit.coefficients[i] == pytest.approx(expected)
+            assert trend_fit.months[i] == notna.sum()
+
+    def test_trend_maps(self, grid_df):
+        df = trend_maps(grid_df)
+
+        assert df["xco2_slope"].to_numpy() == pytest.approx(2 + df["latitude"], abs=0.05)
+        assert df["xco2_amplitude"].to_numpy() == pytest.approx(3 + df["latitude"], abs=0.05)
+        assert (df["xco2_rmse"] < 0.2).all()
+
+    def test_not_enough_months(self):
+        time = 2020 + (np.arange(36) + 0.5) / 12
+        values = np.full((3, 36), 410.0)
+        values[0, 24:] = np.nan  # 24 months.
+        values[1, 4:] = np.nan  # Fewer months than parameters and one.
+        values[2, ~np.isin(np.arange(36) % 12, [0])] = np.nan  # Only Januaries, seasonal cycle undetermined.
+
+        trend_fit = fit_trends(GridCube(np.zeros(3), np.arange(3.0), time, values), min_months=3)
+
+        assert not np.isnan(trend_fit.slope[0])
+        assert np.isnan(trend_fit.slope[1:]).all()
+
+    def test_empty(self):
+        trend_fit = fit_trends(GridCube(np.zeros(0), np.zeros(0), np.zeros(0), np.zeros((0, 0))))
+
+        assert trend_fit.coefficients.shape == (0, 4)